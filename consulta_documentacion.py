@@ -8,6 +8,13 @@ import os
 import sys
 import textwrap
 
+# Añadir el directorio utils al path para importar utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+utils_dir = os.path.join(current_dir, 'utils')
+sys.path.append(utils_dir)
+
+from utils import get_docs_watcher, load_document, reload_document
+
 
 def clear_screen():
     """Limpia la pantalla de la consola."""
@@ -33,28 +40,22 @@ def get_base_config():
 
 
 def load_documentation(path):
-    """Carga DOCUMENTACION.md y devuelve (texto_completo, secciones_dict)."""
-    if not os.path.exists(path):
-        return '', {}
-    
-    with open(path, 'r', encoding='utf-8') as f:
-        text = f.read()
-    
-    sections = {}
-    current = None
-    
-    for line in text.splitlines():
-        if line.startswith('## '):
-            current = line[3:].strip()
-            sections[current] = []
-        else:
-            if current is not None:
-                sections[current].append(line)
-    
-    for k in list(sections.keys()):
-        sections[k] = '\n'.join(sections[k]).strip()
-    
-    return text, sections
+    """Carga DOCUMENTACION.md y devuelve el documento (texto, árbol y secciones), o None."""
+    # Un solo parseo: el árbol completo ignora los '##' dentro de bloques de código
+    document = load_document(path)
+    if document is None or not document.content:
+        return None
+    return document
+
+
+def refresh_documentation(document):
+    """Recarga el documento si se editó en disco; solo se reparsean las secciones cambiadas."""
+    updated, changes = reload_document(document)
+    if updated is None:
+        return document
+    if changes:
+        print(f"\n 🔄 Documentación actualizada: {len(changes.affected)} secciones con cambios")
+    return updated
 
 
 def display_section_formatted(title, content):
@@ -115,8 +116,8 @@ def run_interactive():
     base_dir, doc_path = get_base_config()
     
     # Cargar documentación
-    text, sections = load_documentation(doc_path)
-    if not text:
+    document = load_documentation(doc_path)
+    if document is None:
         print(f"   Error: No se encontró el archivo de documentación.")
         print(f"   Ruta esperada: {doc_path}")
         print(f"   Directorio base: {base_dir}")
@@ -124,11 +125,18 @@ def run_interactive():
     
     print(f"   Documentación cargada exitosamente desde:")
     print(f"   {doc_path}")
-    print(f"   Secciones encontradas: {len(sections)}")
+    print(f"   Secciones encontradas: {len(document.outline.sections())}")
     
-    section_list = list(sections.keys())
+    # Si se edita el archivo mientras el menú está abierto, se recarga sin reiniciar
+    watcher = get_docs_watcher(os.path.dirname(doc_path))
+    seen_version = watcher.version
     
     while True:
+        if watcher.version != seen_version:
+            seen_version = watcher.version
+            document = refresh_documentation(document)
+        sections = document.outline.sections()
+        section_list = list(sections.keys())
         display_menu(sections)
         
         try:
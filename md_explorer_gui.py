@@ -2,13 +2,275 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import os
+import queue
 import re
+import sys
+from itertools import islice
+from typing import Any, Dict, List, NamedTuple, Optional
 try:
     from PIL import Image, ImageTk
     PIL_AVAILABLE = True
 except ImportError:
     PIL_AVAILABLE = False
 
+# Añadir el directorio utils al path para importar utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+utils_dir = os.path.join(current_dir, 'utils')
+sys.path.append(utils_dir)
+
+from utils import (
+    build_search_index,
+    discover_markdown_files,
+    is_large_markdown,
+    load_document,
+    open_markdown_stream,
+    reload_document,
+    section_stats,
+    update_search_index,
+    get_docs_watcher,
+    fold_text
+)
+from doc_catalog import get_default_catalog
+from image_assets import AssetIndex, get_default_image_cache
+from background_loader import BackgroundLoader
+
+# Caja en la que se muestran las imágenes (ancho x alto máximos)
+IMAGE_MAX_WIDTH, IMAGE_MAX_HEIGHT = 800, 600
+# Cada cuánto se revisan las cargas terminadas en segundo plano (ms)
+LOADER_POLL_MS = 50
+# Canales del cargador: abrir documentos, recargar el abierto cuando cambia en disco
+# y armar el índice de búsqueda de un documento en streaming
+DOCUMENT_CHANNEL = 'documento'
+RELOAD_CHANNEL = 'recarga'
+SEARCH_CHANNEL = 'busqueda'
+# Lista de secciones: filas visibles (los únicos botones que existen), alto de cada una
+# y espera tras la última tecla antes de filtrar (ms)
+SECTION_LIST_ROWS = 6
+SECTION_ROW_HEIGHT = 35
+SECTION_FILTER_DELAY_MS = 120
+# Secciones que se listan en el texto de bienvenida (el resto está en la barra lateral)
+WELCOME_SECTION_NAMES = 20
+
+
+class DocumentLoad(NamedTuple):
+    """Documento leído y parseado en segundo plano, listo para mostrar."""
+    path: str
+    document: Any                   # LoadedDocument o StreamedDocument
+    streaming: bool
+    sections: Dict[str, str]
+    search_index: Optional[Any]     # None en modo streaming (se arma en la primera búsqueda)
+    asset_index: AssetIndex
+
+
+class DocumentReload(NamedTuple):
+    """Documento abierto vuelto a leer en segundo plano tras un cambio en disco."""
+    previous: Any                   # LoadedDocument sobre el que se pidió la recarga
+    document: Optional[Any]         # None si el archivo ya no se puede leer
+    changes: Optional[Any]          # OutlineChanges; None si el archivo no cambió
+    sections: Dict[str, str]
+    asset_index: Optional[AssetIndex]
+
+
+def build_asset_index(file_path: str, content: str) -> AssetIndex:
+    """Resolver una sola vez las imágenes del documento (rutas relativas a su carpeta)."""
+    return AssetIndex((os.path.dirname(os.path.abspath(file_path)), current_dir), content)
+
+
+def load_document_data(file_path: str) -> DocumentLoad:
+    """
+    Lee y parsea un documento; se ejecuta en un hilo del cargador, así que no toca la interfaz.
+    
+    Args:
+        file_path (str): Ruta del documento
+        
+    Returns:
+        DocumentLoad: Documento, secciones, índice de búsqueda e índice de imágenes
+    """
+    streaming = is_large_markdown(file_path)
+    if streaming:
+        document = open_markdown_stream(file_path)
+    else:
+        # Árbol de secciones desde la caché en disco si el archivo no cambió
+        document = load_document(file_path)
+    if document is None:
+        raise Exception("No se pudo leer el archivo")
+        
+    sections = document.outline.sections()
+    # En modo streaming el índice se arma en la primera búsqueda,
+    # porque requiere decodificar todo el archivo
+    search_index = None if streaming else build_search_index(sections)
+    # Imágenes resueltas una sola vez (en streaming, al mostrar cada sección)
+    asset_index = build_asset_index(file_path, getattr(document, 'content', ""))
+    return DocumentLoad(file_path, document, streaming, sections, search_index, asset_index)
+
+
+def reload_document_data(previous) -> DocumentReload:
+    """
+    Relee el documento abierto reparseando solo las secciones editadas (en un hilo del cargador).
+    
+    Args:
+        previous (LoadedDocument): Documento que muestra la interfaz
+        
+    Returns:
+        DocumentReload: Documento actualizado con sus secciones e índice de imágenes
+    """
+    document, changes = reload_document(previous)
+    if document is None or not changes:
+        return DocumentReload(previous, document, changes, {}, None)
+    return DocumentReload(previous, document, changes, document.outline.sections(),
+                          build_asset_index(document.path, document.content))
+
+
+def discard_document_load(load: DocumentLoad):
+    """Liberar una carga que quedó obsoleta (cierra el mmap de los documentos en streaming)."""
+    if load.streaming:
+        load.document.close()
+
+
+class VirtualSectionList(ctk.CTkFrame):
+    """
+    Lista de secciones virtualizada con filtro por texto.
+    
+    Solo existen los botones de las filas visibles: al desplazarse se
+    reutilizan cambiando su texto, así que cargar un documento con miles de
+    secciones cuesta lo mismo que uno con diez.
+    """
+    
+    def __init__(self, master, command, rows=SECTION_LIST_ROWS, row_height=SECTION_ROW_HEIGHT, width=280):
+        super().__init__(master, fg_color="transparent")
+        self.command = command
+        self.rows = rows
+        self.row_height = row_height
+        self.items: List[str] = []
+        self.visible: List[str] = []
+        self.folded: Optional[List[str]] = None  # Nombres normalizados, calculados al primer filtro
+        self.first = 0
+        self.selected = None
+        self.filter_job = None
+        
+        # CTkEntry no muestra el placeholder si tiene textvariable: el texto se lee con get()
+        self.filter_entry = ctk.CTkEntry(self, placeholder_text="🔎 Filtrar secciones...", width=width)
+        self.filter_entry.pack(fill="x", pady=(0, 5))
+        self.filter_entry.bind("<KeyRelease>", self.schedule_filter)
+        
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="x")
+        self.rows_frame = ctk.CTkFrame(body, fg_color="transparent", width=width - 30,
+                                       height=rows * (row_height + 6))
+        # Margen lateral de las filas: CTk no admite width/height en place(), así que los botones
+        # ocupan todo el ancho (relwidth) de este marco con padding
+        self.rows_frame.pack(side="left", fill="x", expand=True, padx=5)
+        self.rows_frame.pack_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(body, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.count_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=10))
+        self.count_label.pack(anchor="w", padx=5)
+        
+        font = ctk.CTkFont(size=11)
+        self.default_color = ctk.ThemeManager.theme["CTkButton"]["fg_color"]
+        self.selected_color = ctk.ThemeManager.theme["CTkButton"]["hover_color"]
+        self.buttons = []
+        self.shown = [None] * rows  # (nombre, seleccionado) que muestra cada botón
+        for row in range(rows):
+            button = ctk.CTkButton(self.rows_frame, text="", anchor="w", height=row_height, font=font,
+                                   command=lambda r=row: self.on_click(r))
+            self.buttons.append(button)
+            
+        for widget in [self.rows_frame] + self.buttons:
+            widget.bind("<MouseWheel>", self.on_mouse_wheel, add="+")
+            widget.bind("<Button-4>", self.on_mouse_wheel, add="+")
+            widget.bind("<Button-5>", self.on_mouse_wheel, add="+")
+            
+    def set_items(self, names, reset=True):
+        """Reemplazar las secciones; con reset se limpia el filtro y se vuelve al inicio."""
+        self.items = list(names)
+        self.folded = None
+        if reset:
+            self.filter_entry.delete(0, "end")
+            self.first = 0
+            self.selected = None
+        self.apply_filter()
+        
+    def set_selected(self, name):
+        """Marcar la sección mostrada (solo se reconfiguran las filas visibles)."""
+        self.selected = name
+        self.render()
+        
+    def schedule_filter(self, event=None):
+        """Filtrar poco después de la última tecla, no en cada una."""
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(SECTION_FILTER_DELAY_MS, self.apply_filter)
+        
+    def apply_filter(self):
+        """Quedarse con las secciones que contienen todas las palabras del filtro (sin acentos)."""
+        self.filter_job = None
+        terms = fold_text(self.filter_entry.get()).split()
+        if terms:
+            if self.folded is None:
+                self.folded = [fold_text(name) for name in self.items]
+            self.visible = [name for name, folded in zip(self.items, self.folded)
+                            if all(term in folded for term in terms)]
+            self.count_label.configure(text=f"{len(self.visible)} de {len(self.items)} secciones")
+        else:
+            self.visible = self.items
+            self.count_label.configure(text=f"{len(self.items)} secciones")
+        self.render()
+        
+    def render(self):
+        """Mostrar en los botones existentes las filas desde self.first."""
+        total = len(self.visible)
+        self.first = max(0, min(self.first, total - self.rows))
+        for row, button in enumerate(self.buttons):
+            index = self.first + row
+            if index >= total:
+                if self.shown[row] is not None:
+                    button.place_forget()
+                    self.shown[row] = None
+                continue
+            name = self.visible[index]
+            state = (name, name == self.selected)
+            if self.shown[row] == state:
+                continue
+            # Truncar nombres largos
+            display_name = name if len(name) <= 35 else name[:32] + "..."
+            button.configure(text=f"📄 {display_name}",
+                             fg_color=self.selected_color if state[1] else self.default_color)
+            if self.shown[row] is None:
+                button.place(x=0, y=row * (self.row_height + 6) + 3, relwidth=1.0)
+            self.shown[row] = state
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+            
+    def scroll_to(self, first):
+        if first != self.first:
+            self.first = first
+            self.render()
+            
+    def on_scrollbar(self, *args):
+        """Protocolo yview de Tk: ('moveto', fracción) o ('scroll', n, 'units'|'pages')."""
+        if args and args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.visible)))
+        elif args and args[0] == 'scroll':
+            step = self.rows if args[2] == 'pages' else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+            
+    def on_mouse_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
+        
+    def on_click(self, row):
+        index = self.first + row
+        if index < len(self.visible):
+            self.command(self.visible[index])
+            
+            
 class DocumentationExplorerGUI:
     def __init__(self):
         # Configurar tema moderno
@@ -25,15 +287,35 @@ class DocumentationExplorerGUI:
         
         # Variables de estado
         self.current_sections = {}
+        self.current_outline = None
+        self.current_stream = None
+        self.current_document = None
+        self.current_section_name = None
+        self.search_index = None
+        self.pending_search = None  # Término a buscar cuando termine de armarse el índice
         self.current_title = ""
         self.search_results = []
         self.current_image = None
         self.current_image_path = None
         self.image_window = None
+        self.asset_index = None
+        self.photo_images = {}  # Ruta de la variante -> PhotoImage ya decodificada
+        
+        # Lectura y parseo de documentos fuera del hilo de Tk
+        self.loader = BackgroundLoader()
+        self.loading_label = None
         
-        # Configurar la aplicación
+        # Configurar la aplicación (la ventana aparece antes de terminar la primera carga)
         self.setup_layout()
         self.load_documentation()
+        self.root.after(LOADER_POLL_MS, self.process_load_results)
+        
+        # Vigilar docs/: el hilo del vigilante deja los cambios en una cola
+        # que se procesa desde el hilo de Tk
+        self.file_changes = queue.Queue()
+        self.watcher = get_docs_watcher(self.docs_dir)
+        self.watcher.subscribe(self.file_changes.put)
+        self.root.after(500, self.process_file_changes)
         
     def setup_layout(self):
         """Crear el layout principal de la aplicación."""
@@ -104,9 +386,9 @@ class DocumentationExplorerGUI:
         nav_label = ctk.CTkLabel(nav_frame, text="🧭 Navegación - Secciones encontradas", font=ctk.CTkFont(size=14, weight="bold"))
         nav_label.pack(pady=(10, 5))
         
-        # Frame scrolleable para las secciones (más pequeño ahora)
-        self.sections_scrollframe = ctk.CTkScrollableFrame(nav_frame, width=280, height=200)
-        self.sections_scrollframe.pack(fill="x", padx=10, pady=(0, 10))
+        # Lista virtualizada de secciones, con filtro
+        self.section_list = VirtualSectionList(nav_frame, command=self.show_section)
+        self.section_list.pack(fill="x", padx=10, pady=(0, 10))
         
         # Botones de acción
         action_frame = ctk.CTkFrame(self.sidebar_scroll, corner_radius=8)
@@ -118,12 +400,20 @@ class DocumentationExplorerGUI:
         # Campo de búsqueda
         self.search_entry = ctk.CTkEntry(
             action_frame,
-            placeholder_text="🔍 Buscar en el documento actual...",
+            placeholder_text="🔍 Buscar (\"frase\", prefijo*)...",
             width=280
         )
         self.search_entry.pack(pady=(0, 5), padx=10)
         self.search_entry.bind("<Return>", self.search_documentation)
         
+        self.search_all_var = tk.BooleanVar(value=False)
+        search_all_check = ctk.CTkCheckBox(
+            action_frame,
+            text="🌐 Buscar en todos los documentos",
+            variable=self.search_all_var
+        )
+        search_all_check.pack(pady=(0, 5), padx=10, anchor="w")
+        
         search_btn = ctk.CTkButton(
             action_frame,
             text="🔍 Buscar",
@@ -212,6 +502,9 @@ class DocumentationExplorerGUI:
         )
         self.status_label.pack(side="left", padx=10, pady=5)
         
+        # Indicador de carga en curso (visible solo mientras se lee un documento)
+        self.progress_bar = ctk.CTkProgressBar(self.status_frame, mode="indeterminate", width=160)
+        
     def discover_markdown_files(self):
         """Buscar archivos Markdown en el directorio docs/."""
         # Buscar en la carpeta docs del proyecto
@@ -219,17 +512,9 @@ class DocumentationExplorerGUI:
         if not os.path.exists(docs_dir):
             docs_dir = os.getcwd()  # fallback a la raíz si no existe docs
             
-        md_files = []
-        extensions = ['.md', '.markdown', '.MD', '.Markdown']
-        
-        try:
-            for file in os.listdir(docs_dir):
-                if any(file.endswith(ext) for ext in extensions):
-                    full_path = os.path.join(docs_dir, file)
-                    if os.path.isfile(full_path):
-                        md_files.append(full_path)
-        except PermissionError:
-            pass
+        self.docs_dir = docs_dir
+        # Recorrido recursivo compartido; en la raíz del proyecto solo el primer nivel
+        md_files = discover_markdown_files(docs_dir, recursive=docs_dir != os.getcwd())
         
         # Ordenar con prioridad para documentacion.md
         def sort_priority(file_path):
@@ -248,45 +533,18 @@ class DocumentationExplorerGUI:
         md_files = self.discover_markdown_files()
         
         if md_files:
-            file_names = [os.path.basename(f) for f in md_files]
+            # Ruta relativa a docs/ para distinguir archivos de subcarpetas
+            file_names = [os.path.relpath(f, self.docs_dir) for f in md_files]
             self.file_dropdown.configure(values=file_names)
             self.file_dropdown.set(file_names[0])
-            self.file_paths = {os.path.basename(f): f for f in md_files}
+            self.file_paths = dict(zip(file_names, md_files))
             self.on_file_change(file_names[0])
         else:
             self.file_dropdown.configure(values=["No hay archivos .md"])
             self.update_status("❌ No se encontraron archivos Markdown")
             
-    def parse_markdown_sections(self, content):
-        """Parsear las secciones del markdown."""
-        lines = content.split('\n')
-        title = ""
-        sections = {}
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            # Título principal (primer #)
-            if line.startswith('# ') and not title:
-                title = line[2:].strip()
-            # Secciones principales (##)
-            elif line.startswith('## '):
-                if current_section and current_content:
-                    sections[current_section] = '\n'.join(current_content).strip()
-                current_section = line[3:].strip()
-                current_content = []
-            else:
-                if current_section:
-                    current_content.append(line)
-                    
-        # Agregar la última sección
-        if current_section and current_content:
-            sections[current_section] = '\n'.join(current_content).strip()
-            
-        return title, sections
-        
     def on_file_change(self, selected_file):
-        """Manejar cambio de archivo seleccionado."""
+        """Manejar cambio de archivo seleccionado: la lectura se hace en segundo plano."""
         if selected_file == "No hay archivos .md":
             return
             
@@ -294,38 +552,82 @@ class DocumentationExplorerGUI:
         if not file_path:
             return
             
-        try:
-            # Intentar cargar con UTF-8 primero
-            encodings = ['utf-8', 'latin-1', 'cp1252']
-            content = None
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    break
-                except UnicodeDecodeError:
-                    continue
-                    
-            if content is None:
-                raise Exception("No se pudo decodificar el archivo")
-                
-            # Parsear el contenido
-            self.current_title, self.current_sections = self.parse_markdown_sections(content)
+        self.start_loading(file_path, selected_file)
+        
+    def start_loading(self, file_path, label):
+        """Pedir la carga de un documento; si había otra en curso, queda descartada."""
+        self.loading_label = label
+        # Una recarga o un índice en curso del documento anterior ya no sirven
+        self.loader.cancel(RELOAD_CHANNEL)
+        self.loader.cancel(SEARCH_CHANNEL)
+        self.loader.submit(DOCUMENT_CHANNEL, load_document_data, file_path, discard=discard_document_load)
+        self.progress_bar.pack(side="right", padx=10, pady=5)
+        self.progress_bar.start()
+        self.update_status(f"⏳ Cargando {label}...")
+        
+    def process_load_results(self):
+        """Aplicar las cargas terminadas (se ejecuta en el hilo de Tk)."""
+        for result in self.loader.poll():
+            self.finish_loading(result)
+        self.root.after(LOADER_POLL_MS, self.process_load_results)
+        
+    def finish_loading(self, result):
+        """Mostrar un documento ya parseado: recién ahora se actualiza la barra lateral."""
+        if result.channel == RELOAD_CHANNEL:
+            self.apply_reload(result)
+            return
+        if result.channel == SEARCH_CHANNEL:
+            self.finish_search_index(result)
+            return
             
-            # Actualizar la interfaz
-            self.update_sections_list()
-            self.update_status(f"✅ Cargado: {selected_file} ({len(self.current_sections)} secciones)")
+        self.progress_bar.stop()
+        self.progress_bar.pack_forget()
+        selected_file = self.loading_label
+        
+        if result.error is not None:
+            messagebox.showerror("Error", f"No se pudo cargar el archivo:\n{str(result.error)}")
+            self.update_status(f"❌ Error cargando {selected_file}")
+            return
             
-            # Mostrar información del archivo
-            if self.current_title:
-                self.content_header.configure(text=f"📖 {self.current_title}")
-                welcome_text = f"""📄 ARCHIVO CARGADO: {selected_file}
+        load = result.value
+        # Liberar el mapeo en memoria del documento anterior, si lo había
+        if self.current_stream is not None:
+            self.current_stream.close()
+        self.current_stream = load.document if load.streaming else None
+        
+        self.current_document = load.document
+        self.current_section_name = None
+        self.current_outline = load.document.outline
+        self.current_title = load.document.outline.title
+        self.current_sections = load.sections
+        self.search_index = load.search_index
+        # Un índice pedido mientras se cargaba este documento sería del anterior
+        self.loader.cancel(SEARCH_CHANNEL)
+        self.pending_search = None
+        self.asset_index = load.asset_index
+        self.photo_images = {}
+        
+        # Actualizar la interfaz
+        self.update_sections_list()
+        self.update_status(
+            f"✅ Cargado: {selected_file} ({len(self.current_sections)} secciones, "
+            f"{load.document.encoding}, {result.seconds:.2f} s)"
+        )
+        
+        # Mostrar información del archivo
+        if self.current_title:
+            self.content_header.configure(text=f"📖 {self.current_title}")
+            # Solo las primeras secciones: con miles, el texto sería enorme
+            section_names = list(islice(self.current_sections.keys(), WELCOME_SECTION_NAMES))
+            remaining = len(self.current_sections) - len(section_names)
+            if remaining > 0:
+                section_names.append(f"... y {remaining} más (usa el filtro de la barra lateral)")
+            welcome_text = f"""📄 ARCHIVO CARGADO: {selected_file}
 
 📋 TÍTULO: {self.current_title}
 
 🔖 SECCIONES DISPONIBLES: {len(self.current_sections)}
-{chr(10).join([f"  • {section}" for section in self.current_sections.keys()])}
+{chr(10).join([f"  • {section}" for section in section_names])}
 
 👈 Selecciona una sección de la barra lateral para comenzar a explorar.
 
@@ -334,42 +636,21 @@ class DocumentationExplorerGUI:
   💾 Exportar secciones a archivo
   📂 Cargar otros archivos Markdown
 """
-                self.content_text.delete("1.0", "end")
-                self.content_text.insert("1.0", welcome_text)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo cargar el archivo:\n{str(e)}")
-            self.update_status(f"❌ Error cargando {selected_file}")
-            
-    def update_sections_list(self):
-        """Actualizar la lista de secciones en la sidebar."""
-        # Limpiar secciones anteriores
-        for widget in self.sections_scrollframe.winfo_children():
-            widget.destroy()
-            
-        # Crear botones para cada sección
-        for section_name in self.current_sections.keys():
-            # Truncar nombres largos
-            display_name = section_name
-            if len(display_name) > 35:
-                display_name = display_name[:32] + "..."
-                
-            btn = ctk.CTkButton(
-                self.sections_scrollframe,
-                text=f"📄 {display_name}",
-                command=lambda s=section_name: self.show_section(s),
-                anchor="w",
-                width=260,
-                height=35,
-                font=ctk.CTkFont(size=11)
-            )
-            btn.pack(pady=3, padx=5, fill="x")
+            self.content_text.delete("1.0", "end")
+            self.content_text.insert("1.0", welcome_text)
             
+    def update_sections_list(self, reset=True):
+        """Actualizar la lista de secciones en la sidebar (no crea un widget por sección)."""
+        self.section_list.set_items(self.current_sections.keys(), reset)
+        
     def show_section(self, section_name):
         """Mostrar el contenido de una sección."""
         content = self.current_sections.get(section_name, "")
         
         if content:
+            self.current_section_name = section_name
+            self.section_list.set_selected(section_name)
+            
             # Limpiar imagen anterior y ocultar botón de imagen por defecto
             self.clear_current_image()
             self.image_button_frame.grid_remove()
@@ -389,9 +670,12 @@ class DocumentationExplorerGUI:
                 self.add_view_image_button()
             
             # Actualizar status
-            words = len(content.split())
-            lines = len(content.split('\n'))
-            self.update_status(f"📖 Mostrando: {section_name} ({words} palabras, {lines} líneas)")
+            stats = section_stats(self.current_outline, section_name) if self.current_outline is not None else None
+            if stats:
+                self.update_status(f"📖 Mostrando: {section_name} ({stats['words']} palabras, "
+                                   f"{stats['lines']} líneas, ~{stats['reading_time']} min)")
+            else:
+                self.update_status(f"📖 Mostrando: {section_name}")
         else:
             messagebox.showwarning("Sección vacía", f"La sección '{section_name}' está vacía.")
     
@@ -455,36 +739,25 @@ class DocumentationExplorerGUI:
     def try_display_image(self, image_path, alt_text):
         """Intentar mostrar una imagen en el área de contenido."""
         try:
-            # Resolver ruta relativa desde el directorio del proyecto
-            if not os.path.isabs(image_path):
-                base_dir = os.getcwd()
-                
-                # Si la ruta empieza con ../ es relativa desde docs/
-                if image_path.startswith('../'):
-                    # Remover ../ y usar desde la raíz del proyecto
-                    clean_path = image_path[3:]  # Quitar ../
-                    full_path = os.path.join(base_dir, clean_path)
-                else:
-                    # Ruta relativa normal desde la raíz
-                    full_path = os.path.join(base_dir, image_path)
-            else:
-                full_path = image_path
-            
-            print(f"Intentando cargar imagen: {full_path}")  # Debug
-            
-            if not os.path.exists(full_path):
-                print(f"Imagen no encontrada en: {full_path}")  # Debug
+            # Ruta resuelta por el índice de imágenes del documento
+            if self.asset_index is None:
+                return False
+            full_path = self.asset_index.resolve(image_path, alt_text).path
+            if full_path is None:
+                print(f"Imagen no encontrada: {image_path}")  # Debug
                 return False
             
-            # Cargar y redimensionar imagen
-            pil_image = Image.open(full_path)
-            
-            # Calcular tamaño para ajustar al área de contenido (máximo 800x600)
-            max_width, max_height = 800, 600
-            pil_image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+            # Variante ya reducida a la caja de visualización (caché en disco por mtime)
+            variant_path = get_default_image_cache().get_variant(full_path, IMAGE_MAX_WIDTH, IMAGE_MAX_HEIGHT)
+            if variant_path is None:
+                return False
             
-            # Convertir a formato compatible con tkinter
-            tk_image = ImageTk.PhotoImage(pil_image)
+            # Convertir a formato compatible con tkinter (una sola vez por variante)
+            tk_image = self.photo_images.get(variant_path)
+            if tk_image is None:
+                with Image.open(variant_path) as pil_image:
+                    tk_image = ImageTk.PhotoImage(pil_image)
+                self.photo_images[variant_path] = tk_image
             
             # Crear label para la imagen y agregarlo al content_text
             # Nota: Como CTkTextbox no soporta imágenes, las mostraremos como texto indicativo
@@ -554,6 +827,95 @@ class DocumentationExplorerGUI:
                                     width=100)
         close_button.pack(pady=(0, 10))
         
+    def process_file_changes(self):
+        """Aplicar los cambios detectados en docs/ (se ejecuta en el hilo de Tk)."""
+        changes = []
+        while True:
+            try:
+                changes.extend(self.file_changes.get_nowait())
+            except queue.Empty:
+                break
+                
+        if any(change.kind != 'modified' for change in changes):
+            self.refresh_file_list()
+            
+        document = self.current_document
+        # Mientras se abre otro archivo o ya hay una recarga en curso no se pide otra
+        busy = self.loader.pending(DOCUMENT_CHANNEL) or self.loader.pending(RELOAD_CHANNEL)
+        if document is not None and not busy:
+            changed_paths = {os.path.abspath(change.path) for change in changes}
+            external = not os.path.abspath(document.path).startswith(os.path.abspath(self.docs_dir) + os.sep)
+            if os.path.abspath(document.path) in changed_paths:
+                if self.current_stream is not None:
+                    self.reload_stream()
+                else:
+                    self.start_reload()
+            elif external and self.current_stream is None:
+                # Los archivos externos no están vigilados: basta con comparar su stat
+                self.start_reload()
+                    
+        self.root.after(500, self.process_file_changes)
+        
+    def start_reload(self):
+        """Pedir en segundo plano la recarga del documento abierto (sin bloquear la ventana)."""
+        self.loader.submit(RELOAD_CHANNEL, reload_document_data, self.current_document)
+        
+    def apply_reload(self, result):
+        """Aplicar una recarga terminada: solo se redibuja lo que cambió."""
+        if result.error is not None:
+            self.update_status(f"❌ Error recargando: {str(result.error)}")
+            return
+        reload = result.value
+        if reload.previous is not self.current_document:
+            # Mientras tanto se abrió otro documento
+            return
+        previous, document, changes = reload.previous, reload.document, reload.changes
+        if document is None:
+            self.current_document = None
+            self.update_status(f"⚠️ El archivo ya no está disponible: {os.path.basename(previous.path)}")
+            return
+        if not changes:
+            self.current_document = document
+            return
+            
+        self.current_document = document
+        self.current_outline = document.outline
+        self.current_title = document.outline.title
+        self.current_sections = reload.sections
+        self.asset_index = reload.asset_index
+        self.photo_images = {}
+        if self.search_index is not None:
+            update_search_index(self.search_index, self.current_sections, changes)
+            
+        # La barra lateral solo se redibuja si cambió la lista de secciones
+        if changes.added or changes.removed:
+            self.update_sections_list(reset=False)
+        if self.current_section_name in changes.changed:
+            self.show_section(self.current_section_name)
+        elif self.current_section_name in changes.removed:
+            self.current_section_name = None
+            
+        self.update_status(
+            f"🔄 Recargado: {os.path.basename(document.path)} ({len(changes.affected)} secciones con cambios)"
+        )
+        
+    def reload_stream(self):
+        """Reabrir un documento en modo streaming cuyo archivo cambió."""
+        selected_file = self.file_dropdown.get()
+        self.on_file_change(selected_file)
+        
+    def refresh_file_list(self):
+        """Actualizar la lista de archivos tras crear o eliminar documentos en docs/."""
+        md_files = self.discover_markdown_files()
+        file_names = [os.path.relpath(f, self.docs_dir) for f in md_files]
+        # Conservar los archivos externos cargados a mano
+        external = {name: path for name, path in getattr(self, 'file_paths', {}).items()
+                    if path not in md_files and os.path.exists(path)
+                    and not os.path.abspath(path).startswith(os.path.abspath(self.docs_dir) + os.sep)}
+        self.file_paths = dict(zip(file_names, md_files))
+        self.file_paths.update(external)
+        self.file_dropdown.configure(values=list(self.file_paths) or ["No hay archivos .md"])
+        
     def search_documentation(self, event=None):
         """Buscar texto en la documentación."""
         search_term = self.search_entry.get().strip()
@@ -561,21 +923,48 @@ class DocumentationExplorerGUI:
             messagebox.showinfo("Búsqueda", "Ingresa un término de búsqueda")
             return
             
-        results = []
-        for section_name, content in self.current_sections.items():
-            lines = content.split('\n')
-            for line_num, line in enumerate(lines, 1):
-                if search_term.lower() in line.lower():
-                    results.append((section_name, line_num, line.strip()))
+        if self.search_all_var.get():
+            self.search_all_documents(search_term)
+            return
+            
+        if self.search_index is None:
+            # Documento en streaming: el índice se arma en segundo plano y la búsqueda
+            # se hace cuando llega (ver finish_search_index)
+            self.pending_search = search_term
+            if not self.loader.pending(SEARCH_CHANNEL):
+                self.loader.submit(SEARCH_CHANNEL, build_search_index, self.current_sections)
+                self.progress_bar.pack(side="right", padx=10, pady=5)
+                self.progress_bar.start()
+            self.update_status(f"⏳ Preparando el índice de búsqueda para '{search_term}'...")
+            return
+            
+        self.show_search_results(search_term)
+        
+    def finish_search_index(self, result):
+        """Guardar el índice armado en segundo plano y hacer la búsqueda que lo pidió."""
+        if not self.loader.pending(DOCUMENT_CHANNEL):
+            self.progress_bar.stop()
+            self.progress_bar.pack_forget()
+        search_term, self.pending_search = self.pending_search, None
+        if result.error is not None:
+            self.update_status(f"❌ Error preparando la búsqueda: {str(result.error)}")
+            return
+        self.search_index = result.value
+        if search_term:
+            self.show_search_results(search_term)
+            
+    def show_search_results(self, search_term):
+        """Buscar en el índice del documento abierto y mostrar los resultados."""
+        results = self.search_index.search(search_term, limit=50, highlight=("«", "»"))
                     
         if results:
             # Mostrar resultados
             results_text = f"🔍 RESULTADOS DE BÚSQUEDA: '{search_term}'\n\n"
-            results_text += f"Se encontraron {len(results)} coincidencias:\n\n"
+            results_text += f"Se encontraron {len(results)} secciones (ordenadas por relevancia):\n\n"
             
-            for section, line_num, line in results:
-                results_text += f"📄 {section} (línea {line_num}):\n"
-                results_text += f"   {line}\n\n"
+            for hit in results:
+                results_text += f"📄 {hit.section} (línea {hit.line}):\n"
+                results_text += f"   {hit.snippet}\n\n"
                 
             self.content_header.configure(text=f"🔍 Resultados: '{search_term}'")
             self.content_text.delete("1.0", "end")
@@ -585,6 +974,33 @@ class DocumentationExplorerGUI:
             messagebox.showinfo("Búsqueda", f"No se encontraron resultados para '{search_term}'")
             self.update_status(f"🔍 Sin resultados para '{search_term}'")
             
+    def search_all_documents(self, search_term):
+        """Buscar en todos los documentos usando el catálogo persistente."""
+        catalog = get_default_catalog()
+        if not catalog.available:
+            messagebox.showwarning("Búsqueda", "La búsqueda global no está disponible (SQLite sin FTS5)")
+            return
+            
+        # Solo se reindexan los archivos que cambiaron desde la última búsqueda
+        catalog.update(getattr(self, 'file_paths', {}).values())
+        results = catalog.search(search_term, limit=50, highlight=("«", "»"))
+        
+        if results:
+            results_text = f"🌐 RESULTADOS EN TODOS LOS DOCUMENTOS: '{search_term}'\n\n"
+            results_text += f"Se encontraron {len(results)} secciones (ordenadas por relevancia):\n\n"
+            
+            for hit in results:
+                results_text += f"📚 {os.path.basename(hit.path)} › {hit.section}:\n"
+                results_text += f"   {hit.snippet}\n\n"
+                
+            self.content_header.configure(text=f"🌐 Resultados: '{search_term}'")
+            self.content_text.delete("1.0", "end")
+            self.content_text.insert("1.0", results_text)
+            self.update_status(f"🌐 Búsqueda global: {len(results)} resultados para '{search_term}'")
+        else:
+            messagebox.showinfo("Búsqueda", f"No se encontraron resultados para '{search_term}' en los documentos")
+            self.update_status(f"🌐 Sin resultados para '{search_term}'")
+            
     def export_section(self):
         """Exportar la sección actual a archivo."""
         current_title = self.content_header.cget("text")
@@ -624,43 +1040,16 @@ class DocumentationExplorerGUI:
         )
         
         if file_path:
-            try:
-                # Intentar cargar el archivo
-                encodings = ['utf-8', 'latin-1', 'cp1252']
-                content = None
-                
-                for encoding in encodings:
-                    try:
-                        with open(file_path, 'r', encoding=encoding) as f:
-                            content = f.read()
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                        
-                if content is None:
-                    raise Exception("No se pudo decodificar el archivo")
-                    
-                # Parsear y cargar
-                self.current_title, self.current_sections = self.parse_markdown_sections(content)
+            # Actualizar dropdown; el documento se lee en segundo plano como los de docs/
+            file_name = os.path.basename(file_path)
+            current_values = list(self.file_dropdown.cget("values"))
+            if file_name not in current_values:
+                current_values.append(file_name)
+                self.file_dropdown.configure(values=current_values)
+            self.file_paths[file_name] = file_path
                 
-                # Actualizar dropdown
-                file_name = os.path.basename(file_path)
-                current_values = list(self.file_dropdown.cget("values"))
-                if file_name not in current_values:
-                    current_values.append(file_name)
-                    self.file_dropdown.configure(values=current_values)
-                    self.file_paths[file_name] = file_path
-                    
-                self.file_dropdown.set(file_name)
-                self.update_sections_list()
-                self.update_status(f"✅ Archivo externo cargado: {file_name}")
-                
-                # Mostrar información
-                if self.current_title:
-                    self.content_header.configure(text=f"📖 {self.current_title}")
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo cargar el archivo:\n{str(e)}")
+            self.file_dropdown.set(file_name)
+            self.start_loading(file_path, file_name)
                 
     def toggle_theme(self):
         """Alternar entre tema claro y oscuro."""
@@ -686,6 +1075,7 @@ class DocumentationExplorerGUI:
     def run(self):
         """Ejecutar la aplicación."""
         self.root.mainloop()
+        self.loader.shutdown()
 
 def main():
     """Función principal."""
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""Configuración de pytest: los módulos de utils/ se importan como en los frontends."""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'utils'))
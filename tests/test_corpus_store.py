@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""El almacén compartido descarta los documentos usados hace más tiempo al pasar su presupuesto."""
+
+import os
+
+import pytest
+
+import parse_cache
+from corpus_store import CorpusStore, _document_size
+from parse_cache import ParseCache
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    """Cinco documentos de ~10 KB, con la caché en disco en la carpeta temporal."""
+    monkeypatch.setattr(parse_cache, '_default_cache', ParseCache(str(tmp_path / 'parse')))
+    paths = []
+    for number in range(5):
+        path = tmp_path / f'doc{number}.md'
+        path.write_text(f'# Doc {number}\n' + ''.join(f'## Sección {k}\n' + 'palabra ' * 120 + '\n'
+                                                      for k in range(10)), encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+def test_document_cap_evicts_least_recently_used(docs):
+    store = CorpusStore(max_documents=3)
+    for path in docs[:3]:
+        store.document(path)
+    store.document(docs[0])  # docs[1] pasa a ser el más antiguo
+    store.document(docs[3])
+    assert len(store) == 3
+    assert docs[1] not in store
+    assert all(path in store for path in (docs[0], docs[2], docs[3]))
+    assert store.evictions == 1
+
+
+def test_byte_budget_counts_search_indexes(docs):
+    one = _document_size(CorpusStore().document(docs[0]), indexed=False)
+    indexed = _document_size(CorpusStore().document(docs[0]), indexed=True)
+    store = CorpusStore(max_bytes=indexed + 2 * one)
+    documents = [store.document(path) for path in docs[:4]]
+    assert len(store) == 4
+    assert store.size == sum(_document_size(document, indexed=False) for document in documents)
+
+    # El índice hace pasar el presupuesto: se descarta el más antiguo, no el que se busca
+    index = store.search_index(documents[1])
+    assert docs[0] not in store
+    assert all(path in store for path in docs[1:4])
+    assert store.search_index(documents[1]) is index
+    assert store.size <= store.max_bytes
+    assert store.evictions == 1
+
+
+def test_evicted_document_is_reloaded(docs):
+    store = CorpusStore(max_documents=1)
+    first = store.document(docs[0])
+    store.document(docs[1])
+    assert docs[0] not in store
+    again = store.document(docs[0])
+    assert again is not first
+    assert again.content == first.content
+    assert store.search_index(again).search('palabra')
+
+
+def test_forget_releases_the_size(docs):
+    store = CorpusStore()
+    document = store.document(docs[0])
+    store.search_index(document)
+    assert store.size > 0
+    store.forget(docs[0])
+    assert store.size == 0 and len(store) == 0
+    os.remove(docs[1])
+    assert store.document(docs[1]) is None
+    assert store.size == 0
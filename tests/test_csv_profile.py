@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""El perfil por bloques debe coincidir con pandas leyendo el archivo entero."""
+
+import os
+import shutil
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from conftest import DATA_DIR
+from csv_profile import EXACT_DISTINCT_LIMIT, _TOP_CAPACITY, get_csv_profile, load_csv_profile, profile_csv
+
+
+def expected_top(series, k):
+    counts = series.dropna().value_counts()
+    return sorted(((value, int(count)) for value, count in counts.items()),
+                  key=lambda item: (-item[1], str(item[0])))[:k]
+
+
+def assert_matches_pandas(profile, frame):
+    assert profile.rows == len(frame)
+    assert [column.name for column in profile.columns] == list(frame.columns)
+    for column in profile.columns:
+        series = frame[column.name]
+        assert column.nulls == series.isna().sum(), column.name
+        assert column.distinct_exact
+        assert column.distinct == series.nunique(), column.name
+        if column.kind == 'numérico':
+            assert column.minimum == series.min()
+            assert column.maximum == series.max()
+            assert column.mean == pytest.approx(series.mean())
+        else:
+            assert column.minimum == series.dropna().astype(str).min()
+            assert column.maximum == series.dropna().astype(str).max()
+        assert column.top == expected_top(series, len(column.top)), column.name
+
+
+@pytest.mark.parametrize('name', sorted(f for f in os.listdir(DATA_DIR) if f.endswith('.csv')))
+def test_repo_csvs_match_pandas(tmp_path, name):
+    path = shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+    # Bloques chicos para que el resultado salga de combinar varios
+    profile = profile_csv(str(path), chunk_rows=17)
+    assert_matches_pandas(profile, pd.read_csv(path))
+
+
+def test_nulls_and_late_text_values_across_chunks(tmp_path):
+    rng = np.random.default_rng(5)
+    n = 5000
+    frame = pd.DataFrame({
+        'entero': rng.integers(0, 50, n).astype(float),
+        'real': rng.normal(size=n),
+        'texto': rng.choice(['a', 'b', 'ñandú', 'c d'], n),
+        'mixta': np.arange(n).astype(str),
+    })
+    frame.loc[rng.choice(n, 300, replace=False), 'entero'] = np.nan
+    frame.loc[rng.choice(n, 50, replace=False), 'texto'] = None
+    # Números hasta el último bloque, que trae un texto: la columna pasa a ser de texto
+    frame.loc[n - 1, 'mixta'] = 'x'
+    path = tmp_path / 'mezcla.csv'
+    frame.to_csv(path, index=False)
+
+    profile = profile_csv(str(path), chunk_rows=700)
+    expected = pd.read_csv(path)
+    columns = {column.name: column for column in profile.columns}
+    assert columns['entero'].kind == 'numérico'
+    assert isinstance(columns['entero'].minimum, int)
+    assert columns['mixta'].kind == 'texto'
+    assert_matches_pandas(profile, expected.astype({'mixta': str}))
+
+
+def test_high_cardinality_column_is_estimated(tmp_path):
+    rng = np.random.default_rng(9)
+    n = 150_000
+    values = rng.integers(0, 10 ** 9, n)
+    values[rng.random(n) < 0.3] = 7  # Un valor muy frecuente
+    path = tmp_path / 'grande.csv'
+    pd.DataFrame({'id': values}).to_csv(path, index=False)
+
+    column = profile_csv(str(path), chunk_rows=20_000).columns[0]
+    series = pd.read_csv(path)['id']
+    true_distinct = series.nunique()
+    assert true_distinct > EXACT_DISTINCT_LIMIT
+    assert not column.distinct_exact
+    assert abs(column.distinct - true_distinct) / true_distinct < 0.03
+    # Misra-Gries: el valor frecuente aparece, con una cota inferior de su conteo
+    value, count = column.top[0]
+    true_count = int((series == 7).sum())
+    assert value == 7
+    assert true_count - n / _TOP_CAPACITY <= count <= true_count
+
+
+def test_sidecar_is_reused_until_the_file_changes(tmp_path):
+    path = str(shutil.copy(os.path.join(DATA_DIR, 'productos.csv'), tmp_path / 'productos.csv'))
+    profile = get_csv_profile(path)
+    cached = load_csv_profile(path)
+    assert cached is not None and cached.from_cache
+    assert cached.rows == profile.rows and cached.columns == profile.columns
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n101,Nuevo,Bebidas,10')
+    assert load_csv_profile(path) is None
+    assert get_csv_profile(path).rows == profile.rows + 1
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""El índice de filas por byte debe cortar igual que pandas, también con saltos de línea entre comillas."""
+
+import os
+import shutil
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+import csv_rows
+from conftest import DATA_DIR
+from csv_rows import build_row_index, get_row_index, load_row_index, read_rows
+
+
+def quoted_csv(path, rows=5000):
+    """CSV con campos entre comillas que contienen saltos de línea, comillas escapadas y comas."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('id,texto\n')
+        for k in range(rows):
+            if k % 3 == 0:
+                f.write(f'{k},"línea\n{k}"\n')
+            elif k % 3 == 1:
+                f.write(f'{k},"dice ""{k}"", y sigue"\n')
+            else:
+                f.write(f'{k},simple\n')
+        # Última fila sin salto de línea final
+        f.write(f'{rows},fin')
+    return pd.read_csv(path)
+
+
+def assert_pages(index, expected, starts, count=5):
+    for start in starts:
+        assert read_rows(index, start, count).equals(expected.iloc[start:start + count]), start
+
+
+@pytest.mark.parametrize('name', sorted(f for f in os.listdir(DATA_DIR) if f.endswith('.csv')))
+def test_repo_csvs(tmp_path, name):
+    path = str(shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name))
+    expected = pd.read_csv(path)
+    index = build_row_index(path, stride=16)
+    assert index.rows == len(expected)
+    assert_pages(index, expected, [0, 1, 15, 16, 17, len(expected) - 3], count=7)
+    assert read_rows(index, len(expected), 7).empty
+
+
+@pytest.mark.parametrize('stride', [1, 2, 7, 1024])
+def test_quoted_newlines(tmp_path, stride):
+    path = str(tmp_path / 'comillas.csv')
+    expected = quoted_csv(path)
+    index = build_row_index(path, stride=stride)
+    assert index.rows == len(expected) == 5001
+    assert_pages(index, expected, [0, 1, 6, 7, 8, 2048, 4999, 5000])
+
+
+def test_quotes_split_across_scan_blocks(tmp_path, monkeypatch):
+    path = str(tmp_path / 'comillas.csv')
+    expected = quoted_csv(path)
+    # Bloques de lectura diminutos: comillas y saltos quedan partidos entre bloques
+    monkeypatch.setattr(csv_rows, '_SCAN_BLOCK_BYTES', 10)
+    index = build_row_index(path, stride=7)
+    assert index.rows == len(expected)
+    assert_pages(index, expected, range(0, 5001, 97), count=3)
+
+
+def test_header_only_file(tmp_path):
+    path = tmp_path / 'vacio.csv'
+    path.write_text('a,b')
+    assert build_row_index(str(path)).rows == 0
+
+
+def test_saved_index_is_reused_until_the_file_changes(tmp_path):
+    path = str(tmp_path / 'comillas.csv')
+    quoted_csv(path, rows=300)
+    index = get_row_index(path)
+    saved = load_row_index(path)
+    assert saved is not None
+    assert saved.rows == index.rows and np.array_equal(saved.offsets, index.offsets)
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n301,"otra\nfila"\n')
+    assert load_row_index(path) is None
+    updated = get_row_index(path)
+    assert updated.rows == index.rows + 1
+    assert read_rows(updated, updated.rows - 1, 1)['texto'].tolist() == ['otra\nfila']
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""El catálogo cierra cada conexión que abre, también cuando una operación falla."""
+
+import sqlite3
+
+import pytest
+
+import doc_catalog
+from doc_catalog import DocumentCatalog
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Registra todas las conexiones que abre el catálogo."""
+    opened = []
+    connect = DocumentCatalog._connect
+
+    def tracking_connect(self):
+        conn = connect(self)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(DocumentCatalog, '_connect', tracking_connect)
+    return opened
+
+
+def assert_closed(opened):
+    assert opened
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+
+
+def test_connections_are_closed(tmp_path, connections):
+    catalog = DocumentCatalog(str(tmp_path / 'catalogo.sqlite3'))
+    if not catalog.available:
+        pytest.skip('SQLite sin FTS5')
+    doc = tmp_path / 'guia.md'
+    doc.write_text('# Guía\n## Ventas\nIngresos por categoría\n## Clientes\nCiudades\n', encoding='utf-8')
+
+    assert catalog.update([str(doc)]) == (1, 0)
+    hits = catalog.search('categoria')
+    assert [hit.section for hit in hits] == ['Ventas']
+    # Sin cambios no se reindexa, y un archivo eliminado sale del catálogo
+    assert catalog.update([str(doc)]) == (0, 0)
+    doc.unlink()
+    assert catalog.update([]) == (0, 1)
+    assert catalog.search('categoria') == []
+    assert_closed(connections)
+
+
+def test_connection_is_closed_after_an_error(tmp_path, connections, monkeypatch):
+    catalog = DocumentCatalog(str(tmp_path / 'catalogo.sqlite3'))
+    if not catalog.available:
+        pytest.skip('SQLite sin FTS5')
+    connections.clear()
+    # Consulta que FTS5 rechaza: la búsqueda devuelve una lista vacía
+    monkeypatch.setattr(doc_catalog, 'to_fts_query', lambda query: 'NEAR(')
+    assert catalog.search('a') == []
+    assert_closed(connections)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""El descubrimiento reutiliza la foto de cada carpeta sin hacer un stat por archivo."""
+
+import os
+
+import file_discovery
+from file_discovery import DirectoryScanner
+from utils import get_file_info
+
+
+def make_tree(root):
+    (root / 'docs' / 'sub').mkdir(parents=True)
+    (root / 'docs' / '.oculta').mkdir()
+    (root / 'docs' / 'a.md').write_text('# A\n', encoding='utf-8')
+    (root / 'docs' / 'B.MD').write_text('# B\n', encoding='utf-8')
+    (root / 'docs' / 'notas.txt').write_text('x', encoding='utf-8')
+    (root / 'docs' / 'sub' / 'c.md').write_text('# C\n', encoding='utf-8')
+    (root / 'docs' / '.oculta' / 'd.md').write_text('# D\n', encoding='utf-8')
+    return str(root / 'docs')
+
+
+def names(entries):
+    return [os.path.relpath(entry.path) for entry in entries]
+
+
+def test_scan_filters_and_reuses_snapshots(tmp_path, monkeypatch):
+    docs = make_tree(tmp_path)
+    monkeypatch.chdir(docs)
+    scanner = DirectoryScanner()
+    assert names(scanner.scan(docs, ('*.md',))) == ['B.MD', 'a.md', os.path.join('sub', 'c.md')]
+    assert names(scanner.scan(docs, ('*.md',), recursive=False)) == ['B.MD', 'a.md']
+
+    # Sin cambios en las carpetas no se vuelven a listar
+    monkeypatch.setattr(file_discovery, '_RACY_WINDOW_NS', 0)
+    scanner.clear()
+    scanner.scan(docs, ('*.md',))
+    listed = []
+    scandir = os.scandir
+    monkeypatch.setattr(file_discovery.os, 'scandir', lambda path: (listed.append(path), scandir(path))[1])
+    scanner.scan(docs, ('*.md',))
+    assert listed == []
+
+    os.remove(os.path.join(docs, 'sub', 'c.md'))
+    assert names(scanner.scan(docs, ('*.md',))) == ['B.MD', 'a.md']
+    assert listed == [os.path.join(docs, 'sub')]
+
+
+def test_file_info_sees_in_place_edits(tmp_path):
+    docs = make_tree(tmp_path)
+    path = os.path.join(docs, 'a.md')
+    DirectoryScanner().scan(docs, ('*.md',))
+    assert get_file_info(path) == {'name': 'a.md', 'size': '4 bytes', 'exists': 'Sí'}
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('texto\n')
+    assert get_file_info(path)['size'] == '10 bytes'
+    assert get_file_info(os.path.join(docs, 'no.md'))['exists'] == 'No'
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+El árbol de encabezados compartido debe dar las mismas secciones que el
+parser original (línea por línea con regex) en todo documento sin bloques
+de código ni secuencias de cierre (## Título ##), que son los dos casos en
+los que se corrigió a propósito.
+"""
+
+import random
+import re
+
+import pytest
+
+from markdown_outline import outline_from_records, parse_outline, parse_outline_bytes, reparse_outline
+from utils import parse_markdown_sections
+
+
+def legacy_parse_markdown_sections(content):
+    """Parser de secciones anterior al árbol compartido (referencia)."""
+    if not content.strip():
+        return "", {}
+
+    lines = content.split('\n')
+    main_title = ""
+    title_pattern = re.compile(r'^#\s+(.+)$')
+    for line in lines:
+        match = title_pattern.match(line.strip())
+        if match:
+            main_title = match.group(1).strip()
+            break
+    if not main_title:
+        main_title = "Documento"
+
+    sections = {}
+    current_section = None
+    current_content = []
+    section_pattern = re.compile(r'^##\s+(.+)$')
+    for line in lines:
+        section_match = section_pattern.match(line.strip())
+        if section_match:
+            if current_section is not None:
+                sections[current_section] = '\n'.join(current_content).strip()
+            current_section = section_match.group(1).strip()
+            current_content = []
+        elif current_section is not None:
+            current_content.append(line)
+    if current_section is not None:
+        sections[current_section] = '\n'.join(current_content).strip()
+
+    if not sections:
+        content_lines = []
+        skip_first_title = False
+        for line in lines:
+            if not skip_first_title and title_pattern.match(line.strip()):
+                skip_first_title = True
+                continue
+            content_lines.append(line)
+        sections["Contenido"] = '\n'.join(content_lines).strip()
+
+    return main_title, sections
+
+
+CASES = [
+    "",
+    "   \n",
+    "# T\n\nbody",
+    "# T\n## A\nx\n## B\ny",
+    "#T\n## A\nx",
+    "  ## indented\nx",
+    "# T\n## A\n### sub\ntext\n## A\nagain",
+    "intro\n# T\nbody\n",
+    "##\tTab\nx",
+    "# T\n##   \nx\n## B\n",
+    "﻿# BOM\n## A\nx",
+    "## A\r\nline\r\n## B\r\n",
+    "# \n## A\n",
+    "# Título con acentos\n## Sección ñandú\n- item\n* otro\n",
+]
+
+LINE_POOL = [
+    "# Título", "# Otro título", "## Ventas", "## Clientes", "## Productos", "##  Espacios  ",
+    "### Detalle", "#### Nivel 4", "texto común", "", "   ", "- viñeta", "#etiqueta", "##sin espacio",
+    "  ## sangría", "| a | b |", "![img](images/x.png)", "## Ventas",
+]
+
+
+def random_document(rng):
+    return '\n'.join(rng.choice(LINE_POOL) for _ in range(rng.randint(0, 60)))
+
+
+@pytest.mark.parametrize('content', CASES)
+def test_sections_match_legacy_parser(content):
+    assert parse_markdown_sections(content) == legacy_parse_markdown_sections(content)
+
+
+def test_random_documents_match_legacy_parser():
+    rng = random.Random(20240601)
+    for _ in range(500):
+        content = random_document(rng)
+        expected = legacy_parse_markdown_sections(content)
+        assert parse_markdown_sections(content) == expected, content
+        title, lazy = parse_markdown_sections(content, lazy=True)
+        assert (title, dict(lazy.items())) == expected, content
+
+
+def test_headings_inside_code_fences_are_content():
+    content = "## A\n```\n## no es sección\n```\n~~~\n## tampoco\n~~~\n## B\nz"
+    title, sections = parse_markdown_sections(content)
+    assert list(sections) == ['A', 'B']
+    assert sections['A'] == "```\n## no es sección\n```\n~~~\n## tampoco\n~~~"
+
+
+def test_closing_hash_sequence_is_removed():
+    assert parse_markdown_sections("## A ##\nx\n## B #\ny")[1] == {'A': 'x', 'B': 'y'}
+
+
+def test_outline_from_records_rebuilds_the_same_sections():
+    rng = random.Random(7)
+    for _ in range(100):
+        content = random_document(rng)
+        outline = parse_outline(content)
+        rebuilt = outline_from_records(content, outline.title, outline.to_records())
+        assert rebuilt.sections().to_dict() == outline.sections().to_dict()
+
+
+def test_byte_outline_matches_text_outline():
+    rng = random.Random(11)
+    for _ in range(100):
+        content = random_document(rng).replace('\r', '')
+        expected = parse_outline(content).sections()
+        outline = parse_outline_bytes(content.encode('utf-8'), 'utf-8')
+        assert outline.title == expected.title
+        assert outline.sections().to_dict() == expected.to_dict(), content
+
+
+def test_reparse_after_edit_matches_full_parse():
+    rng = random.Random(3)
+    for _ in range(200):
+        old = random_document(rng)
+        lines = old.split('\n')
+        position = rng.randint(0, len(lines))
+        new = '\n'.join(lines[:position] + [rng.choice(LINE_POOL)] + lines[position + 1:])
+        outline, changes = reparse_outline(parse_outline(old), new)
+        assert outline.sections().to_dict() == parse_outline(new).sections().to_dict(), (old, new)
+        old_sections = parse_outline(old).sections().to_dict()
+        new_sections = outline.sections().to_dict()
+        assert set(changes.added) == set(new_sections) - set(old_sections)
+        assert set(changes.removed) == set(old_sections) - set(new_sections)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Las estadísticas deben ser las mismas si se pasa el texto o su árbol ya parseado."""
+
+import pytest
+
+from markdown_outline import parse_outline
+from utils import get_markdown_stats
+
+DOCUMENTS = [
+    'Texto sin encabezados.\n\nSegunda línea con más palabras.\n',
+    '```python\nprint("hola")\n```\n| a | b |\n|---|---|\n| 1 | 2 |\n',
+    '# Título\nIntro\n## Uno\nuno dos\n### Sub\n![img](a.png)\n## Dos\n',
+]
+
+
+@pytest.mark.parametrize('content', DOCUMENTS)
+def test_outline_and_text_give_the_same_stats(content):
+    assert get_markdown_stats(parse_outline(content)) == get_markdown_stats(content)
+
+
+def test_headingless_outline_is_counted():
+    outline = parse_outline(DOCUMENTS[0])
+    assert len(outline) == 0
+    stats = get_markdown_stats(outline)
+    assert stats['words'] == 8
+    assert stats['lines'] == 4
+    assert stats['characters'] == len(DOCUMENTS[0])
+    assert stats['sections'] == 0
+
+
+@pytest.mark.parametrize('content', ['', None])
+def test_empty_input(content):
+    stats = get_markdown_stats(content)
+    assert stats['words'] == stats['lines'] == stats['characters'] == 0
+    assert get_markdown_stats(parse_outline(''))['words'] == 0
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Presupuesto de la caché en disco: se respeta sin recorrer la carpeta en cada escritura."""
+
+import os
+
+import parse_cache
+from parse_cache import ParseCache, hash_bytes
+
+
+def entries_size(cache_dir):
+    return sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith('.mdxc'))
+
+
+def test_artifacts_round_trip(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    key = hash_bytes(b'## A\nhola')
+    assert cache.get_artifact('clean', key) is None
+    cache.put_artifact('clean', key, 'hola')
+    assert cache.get_artifact('clean', key) == 'hola'
+    assert cache.get_artifact('otro', key) is None
+
+
+def test_budget_is_kept_with_few_directory_scans(tmp_path, monkeypatch):
+    scans = []
+    evict = ParseCache.evict
+    monkeypatch.setattr(ParseCache, 'evict', lambda self, keep=None: (scans.append(keep), evict(self, keep))[1])
+
+    cache = ParseCache(str(tmp_path), max_bytes=200_000)
+    for number in range(1000):
+        cache.put_artifact('clean', hash_bytes(str(number).encode()), os.urandom(1000).hex())
+        assert entries_size(str(tmp_path)) <= 200_000 + 3000
+
+    # Un recorrido inicial y luego solo al pasar el presupuesto (se libera un 20 %)
+    # o cada _RESCAN_WRITES, no uno por escritura
+    assert len(scans) < 1000 // 20
+    # La entrada recién escrita nunca se elimina
+    assert cache.get_artifact('clean', hash_bytes(b'999')) is not None
+
+
+def test_rescan_picks_up_entries_written_by_other_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache, '_RESCAN_WRITES', 10)
+    cache = ParseCache(str(tmp_path), max_bytes=50_000)
+    other = ParseCache(str(tmp_path), max_bytes=10 ** 9)
+    cache.put_artifact('clean', hash_bytes(b'inicio'), 'x')
+    for number in range(100):
+        other.put_artifact('clean', hash_bytes(str(number).encode()), os.urandom(1000).hex())
+    for number in range(10):
+        cache.put_artifact('clean', hash_bytes(b'propio %d' % number), 'x')
+    assert entries_size(str(tmp_path)) <= 50_000
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+El cubo de ventas debe dar lo mismo que cruzar las cuatro tablas con pandas,
+tanto al construirse como después de cada actualización incremental o
+reconstrucción.
+"""
+
+import os
+import shutil
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+import csv_columnar
+from conftest import DATA_DIR
+from sales_analytics import MISSING_LABEL
+from sales_cube import SalesCube
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Copia de data/ con la caché columnar en la carpeta temporal."""
+    monkeypatch.setattr(csv_columnar, '_default_cache_dir', lambda: str(tmp_path / 'columnar'))
+    target = tmp_path / 'data'
+    target.mkdir()
+    for name in ('clientes.csv', 'productos.csv', 'ventas.csv', 'detalle_ventas.csv'):
+        shutil.copy(os.path.join(DATA_DIR, name), target / name)
+    return str(target)
+
+
+@pytest.fixture
+def cube(data_dir, tmp_path):
+    cube = SalesCube(data_dir, cache_path=str(tmp_path / 'cubo.pkl'))
+    assert cube.refresh()
+    assert cube.last_refresh == 'completa'
+    return cube
+
+
+def append(data_dir, name, text):
+    with open(os.path.join(data_dir, name), 'a', encoding='utf-8') as f:
+        f.write(text)
+
+
+def pandas_totals(data_dir):
+    """Indicadores calculados cruzando las tablas completas con pandas (referencia)."""
+    def read(name):
+        return pd.read_csv(os.path.join(data_dir, name))
+
+    lines = (read('detalle_ventas.csv')[['id_venta', 'id_producto', 'cantidad', 'importe']]
+             .merge(read('productos.csv')[['id_producto', 'categoria']], on='id_producto', how='left')
+             .merge(read('ventas.csv')[['id_venta', 'fecha', 'id_cliente', 'medio_pago']], on='id_venta', how='left')
+             .merge(read('clientes.csv')[['id_cliente', 'ciudad']], on='id_cliente', how='left'))
+    lines['mes'] = pd.to_datetime(lines['fecha'], errors='coerce').dt.strftime('%Y-%m')
+
+    def grouped(column):
+        totals = lines.fillna({column: MISSING_LABEL}).groupby(column)['importe'].sum()
+        return {key: value for key, value in totals.items() if value != 0}
+
+    return {
+        'revenue': lines['importe'].sum(),
+        'units': lines['cantidad'].sum(),
+        'orders': lines['id_venta'].nunique(),
+        'categoria': grouped('categoria'),
+        'ciudad': grouped('ciudad'),
+        'medio_pago': grouped('medio_pago'),
+        'mes': grouped('mes'),
+    }
+
+
+def assert_matches_pandas(cube, data_dir):
+    summary = cube.summary()
+    expected = pandas_totals(data_dir)
+    assert summary.revenue == pytest.approx(expected['revenue'])
+    assert summary.units == expected['units']
+    assert summary.orders == expected['orders']
+    for frame, column in ((summary.by_category, 'categoria'), (summary.by_city, 'ciudad'),
+                          (summary.by_payment, 'medio_pago'), (summary.by_month, 'mes')):
+        assert dict(zip(frame[column], frame['ingresos'])) == pytest.approx(expected[column]), column
+
+
+def test_full_build_matches_pandas(cube, data_dir):
+    assert_matches_pandas(cube, data_dir)
+    assert cube.refresh()
+    assert cube.last_refresh == 'sin cambios'
+
+
+def test_appended_rows_are_added_incrementally(cube, data_dir):
+    # Los CSV de data/ no terminan en salto de línea
+    append(data_dir, 'ventas.csv', '\n121,2024-07-02,5,X,x@x,cripto\n122,2024-07-03,999,Y,y@y,qr\n')
+    append(data_dir, 'detalle_ventas.csv', '\n121,3,Prod,2,100,200\n122,999,Nada,1,50,50\n')
+    assert cube.refresh()
+    assert cube.last_refresh == 'incremental'
+    assert_matches_pandas(cube, data_dir)
+
+
+def test_unterminated_last_row(cube, data_dir):
+    append(data_dir, 'detalle_ventas.csv', '\n1,1,P,1,10,10')
+    assert cube.refresh()
+    assert cube.last_refresh == 'incremental'
+    assert_matches_pandas(cube, data_dir)
+
+    # La fila terminó de escribirse tal cual: lo que sigue empieza con un salto de línea
+    append(data_dir, 'detalle_ventas.csv', '\n2,1,P,1,10,10')
+    assert cube.refresh()
+    assert cube.last_refresh == 'incremental'
+    assert_matches_pandas(cube, data_dir)
+
+    # La fila estaba a medio escribir ('...,10' era '...,100'): hay que reconstruir
+    append(data_dir, 'detalle_ventas.csv', '0\n')
+    assert cube.refresh()
+    assert cube.last_refresh == 'completa'
+    assert_matches_pandas(cube, data_dir)
+
+
+def test_sale_after_its_orphan_detail_lines_rebuilds(cube, data_dir):
+    append(data_dir, 'detalle_ventas.csv', '\n130,1,P,1,10,10\n')
+    assert cube.refresh()
+    assert cube.last_refresh == 'incremental'
+    assert dict(zip(cube.summary().by_city['ciudad'], cube.summary().by_city['ingresos']))[MISSING_LABEL] == 10
+    assert_matches_pandas(cube, data_dir)
+
+    append(data_dir, 'ventas.csv', '\n130,2024-07-09,5,X,x@x,qr\n')
+    assert cube.refresh()
+    assert cube.last_refresh == 'completa'
+    assert MISSING_LABEL not in set(cube.summary().by_city['ciudad'])
+    assert_matches_pandas(cube, data_dir)
+
+
+def test_same_size_edit_of_read_bytes_rebuilds_and_changes_version(cube, data_dir):
+    path = os.path.join(data_dir, 'detalle_ventas.csv')
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    first_row = content.split('\n')[1]
+    assert first_row.endswith(',2902')
+    version = cube.version
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content.replace(first_row, first_row[:-4] + '9902', 1))
+
+    assert cube.refresh()
+    assert cube.last_refresh == 'completa'
+    assert cube.version != version
+    assert_matches_pandas(cube, data_dir)
+
+
+def test_dimension_change_rebuilds(cube, data_dir):
+    append(data_dir, 'productos.csv', '\n101,Nuevo,Bebidas,10')
+    append(data_dir, 'detalle_ventas.csv', '\n1,101,Nuevo,3,10,30')
+    assert cube.refresh()
+    assert cube.last_refresh == 'completa'
+    assert_matches_pandas(cube, data_dir)
+
+
+def test_reload_from_pickle(cube, data_dir, tmp_path):
+    append(data_dir, 'ventas.csv', '\n121,2024-07-02,5,X,x@x,cripto')
+    append(data_dir, 'detalle_ventas.csv', '\n121,3,Prod,2,100,200')
+    assert cube.refresh()
+
+    reloaded = SalesCube(data_dir, cache_path=str(tmp_path / 'cubo.pkl'))
+    assert reloaded.refresh()
+    assert reloaded.last_refresh == 'sin cambios'
+    assert reloaded.version == cube.version
+    assert_matches_pandas(reloaded, data_dir)
+
+    # Y sigue incorporando filas nuevas sin reconstruir
+    append(data_dir, 'detalle_ventas.csv', '\n121,4,Prod,1,70,70\n')
+    assert reloaded.refresh()
+    assert reloaded.last_refresh == 'incremental'
+    assert_matches_pandas(reloaded, data_dir)
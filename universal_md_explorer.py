@@ -14,7 +14,6 @@ Uso:
 import streamlit as st
 import os
 import sys
-import re
 
 # Añadir el directorio utils al path para importar utils
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -23,14 +22,44 @@ sys.path.append(utils_dir)
 
 from utils import (
     get_project_paths,
-    load_markdown,
     parse_markdown_sections,
+    parse_outline,
     discover_markdown_files,
     discover_csv_files,
     get_file_info,
     clean_markdown_content,
-    get_markdown_stats
+    get_markdown_stats,
+    section_stats,
+    load_section_artifact,
+    save_section_artifact,
+    is_large_markdown,
+    open_markdown_stream,
+    STREAMING_THRESHOLD,
+    build_search_index,
+    get_docs_watcher,
+    get_memory_cache,
+    content_key,
+    paginate_markdown,
+    page_label,
+    PAGE_SIZE_BUDGET
 )
+from doc_catalog import get_default_catalog
+from corpus_store import CorpusStore
+from upload_store import StoredUpload, UploadStore
+from image_assets import AssetIndex, IMAGE_PATTERN, find_images, get_default_image_cache
+
+
+# Vistas del área principal
+DOCUMENT_VIEW = "📖 Contenido del Documento"
+CSV_VIEW = "📊 Explorar Datos CSV"
+DASHBOARD_VIEW = "📈 Tablero de Ventas"
+
+# Hasta este tamaño el perfil completo, el índice de filas y la caché columnar de un CSV se calculan al abrirlo
+CSV_AUTO_PROFILE_BYTES = 64 * 1024 * 1024
+# Filas por página en el recorrido de la tabla completa
+CSV_PAGE_ROWS = 100
+# Ancho de la variante que se envía a st.image: el máximo que Streamlit envía sin redimensionar
+IMAGE_DISPLAY_WIDTH = 1460
 
 
 def setup_page_config():
@@ -144,8 +173,154 @@ def render_main_header(title: str):
 #         st.sidebar.markdown(info)
 
 
+def get_csv_preview(path: str):
+    """
+    Primeras filas de un CSV, leídas una sola vez por versión del archivo.
+    
+    Se leen desde la caché columnar (que se crea aquí si el archivo no es
+    grande). pandas y pyarrow se importan recién aquí, la primera vez que se
+    abre la vista de datos.
+    
+    Args:
+        path (str): Ruta al archivo CSV
+        
+    Returns:
+        DataFrame: Vista previa
+    """
+    from csv_columnar import read_csv_frame
+    
+    st_result = os.stat(path)
+    return get_memory_cache().get_or_compute(
+        'csv', (path, st_result.st_size, st_result.st_mtime_ns),
+        lambda: read_csv_frame(path, nrows=10, build=st_result.st_size <= CSV_AUTO_PROFILE_BYTES),
+        size=sys.getsizeof
+    )
+
+
+def get_session_csv_profile(path: str):
+    """
+    Perfil completo de un CSV: desde memoria, desde el archivo guardado junto al CSV o recorriéndolo.
+    
+    Los archivos grandes solo se recorren cuando el usuario lo pide, con barra de progreso.
+    
+    Args:
+        path (str): Ruta al archivo CSV
+        
+    Returns:
+        CsvProfile: Perfil, o None si todavía no se calculó (o no se pudo)
+    """
+    from csv_profile import get_csv_profile, load_csv_profile
+    
+    st_result = os.stat(path)
+    key = (path, st_result.st_size, st_result.st_mtime_ns)
+    cache = get_memory_cache()
+    
+    profile = cache.get('profile', key)
+    if profile is None:
+        profile = load_csv_profile(path)
+    if profile is None:
+        if st_result.st_size > CSV_AUTO_PROFILE_BYTES and not st.button("🔬 Perfilar archivo completo"):
+            st.caption("El archivo es grande: el perfil completo se calcula a pedido y queda guardado.")
+            return None
+        progress_bar = st.progress(0.0, text="Perfilando archivo completo...")
+        profile = get_csv_profile(
+            path, refresh=True,
+            progress=lambda fraction: progress_bar.progress(fraction, text=f"Perfilando archivo completo... {fraction:.0%}")
+        )
+        progress_bar.empty()
+    if profile is not None:
+        cache.put('profile', key, profile)
+    return profile
+
+
+def get_session_row_index(path: str):
+    """
+    Índice de filas de un CSV (para contar filas y saltar a cualquier página).
+    
+    Se arma en una sola pasada por el archivo, con barra de progreso, y queda
+    guardado junto al CSV. Los archivos grandes solo se recorren cuando el
+    usuario lo pide.
+    
+    Args:
+        path (str): Ruta al archivo CSV
+        
+    Returns:
+        RowIndex: Índice, o None si todavía no se construyó (o no se pudo)
+    """
+    from csv_rows import get_row_index, load_row_index
+    
+    st_result = os.stat(path)
+    key = (path, st_result.st_size, st_result.st_mtime_ns)
+    cache = get_memory_cache()
+    
+    row_index = cache.get('rows', key)
+    if row_index is None:
+        row_index = load_row_index(path)
+    if row_index is None:
+        if st_result.st_size > CSV_AUTO_PROFILE_BYTES and not st.button("📑 Indexar filas para recorrer la tabla"):
+            st.caption("El archivo es grande: el índice de filas se arma a pedido y queda guardado.")
+            return None
+        progress_bar = st.progress(0.0, text="Indexando filas...")
+        row_index = get_row_index(
+            path, progress=lambda fraction: progress_bar.progress(fraction, text=f"Indexando filas... {fraction:.0%}")
+        )
+        progress_bar.empty()
+    if row_index is not None:
+        cache.put('rows', key, row_index, size=row_index.offsets.nbytes)
+    return row_index
+
+
+def render_csv_browser(row_index, label: str):
+    """
+    Recorre la tabla completa por páginas, leyendo del archivo solo la página elegida.
+    
+    Args:
+        row_index (RowIndex): Índice de filas del CSV
+        label (str): Nombre del CSV (distingue la página elegida de cada archivo)
+    """
+    from csv_rows import read_rows
+    
+    pages = max(1, -(-row_index.rows // CSV_PAGE_ROWS))
+    page = st.number_input(
+        f"Página (de {pages:,})", min_value=1, max_value=pages, value=1, step=1,
+        key=f"csv_page_{label}"
+    )
+    start = (int(page) - 1) * CSV_PAGE_ROWS
+    st.dataframe(read_rows(row_index, start, CSV_PAGE_ROWS), width='stretch')
+    st.caption(f"Filas {start + 1:,}–{min(start + CSV_PAGE_ROWS, row_index.rows):,} de {row_index.rows:,}")
+
+
+def _profile_table(profile):
+    """Tabla con una fila por columna del perfil (valores como texto para mezclar tipos)."""
+    import pandas as pd
+    
+    def show(value):
+        if value is None:
+            return ""
+        return f"{value:,.2f}" if isinstance(value, float) else str(value)
+    
+    return pd.DataFrame([{
+        'Columna': column.name,
+        'Tipo': column.kind,
+        'Nulos': column.nulls,
+        'Valores únicos': f"{column.distinct:,}" if column.distinct_exact else f"≈{column.distinct:,}",
+        'Mín': show(column.minimum),
+        'Máx': show(column.maximum),
+        'Media': show(column.mean),
+        'Más frecuentes': ", ".join(
+            f"{value} ({count:,})" if column.distinct_exact else f"{value} (≥{count:,})"
+            for value, count in column.top
+        ),
+    } for column in profile.columns])
+
+
+@st.fragment
 def display_csv_explorer():
-    """Muestra el explorador de archivos CSV."""
+    """
+    Muestra el explorador de archivos CSV.
+    
+    Es un fragmento: elegir otro CSV solo vuelve a ejecutar esta vista, no el documento.
+    """
     st.markdown("## 📊 Explorador de Datos CSV")
     
     # Aclaración sobre los datos
@@ -163,15 +338,11 @@ def display_csv_explorer():
         return
     
     # Selector de archivo CSV
-    csv_names = [os.path.basename(f) for f in csv_files]
-    selected_csv = st.selectbox("Seleccionar archivo CSV:", csv_names)
+    csv_labels = {os.path.relpath(f, data_dir): f for f in csv_files}
+    selected_csv = st.selectbox("Seleccionar archivo CSV:", list(csv_labels))
     
     if selected_csv:
-        selected_path = None
-        for path in csv_files:
-            if os.path.basename(path) == selected_csv:
-                selected_path = path
-                break
+        selected_path = csv_labels.get(selected_csv)
         
         if selected_path:
             file_info = get_file_info(selected_path)
@@ -186,34 +357,38 @@ def display_csv_explorer():
             
             # Mostrar primeras líneas del CSV
             try:
-                import pandas as pd
-                df = pd.read_csv(selected_path, nrows=10)
+                df = get_csv_preview(selected_path)
                 
                 st.markdown("**Vista previa (primeras 10 filas):**")
                 st.dataframe(df, width='stretch')
                 
+                row_index = get_session_row_index(selected_path)
+                profile = get_session_csv_profile(selected_path)
+                
                 st.markdown("**Información del dataset:**")
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     st.metric("📋 Columnas", len(df.columns))
                 with col2:
-                    st.metric("📊 Filas (muestra)", len(df))
+                    if row_index is not None:
+                        st.metric("📊 Filas", f"{row_index.rows:,}")
+                    elif profile is not None:
+                        st.metric("📊 Filas", f"{profile.rows:,}")
+                    else:
+                        st.metric("📊 Filas (muestra)", len(df))
                 with col3:
                     st.metric("🔢 Tipos únicos", df.dtypes.nunique())
                 
-                # Mostrar esquema
-                with st.expander("🔍 Ver esquema completo"):
-                    schema_data = []
-                    for col in df.columns:
-                        schema_data.append({
-                            'Columna': col,
-                            'Tipo': str(df[col].dtype),
-                            'Valores únicos': df[col].nunique(),
-                            'Nulos': df[col].isnull().sum()
-                        })
-                    
-                    schema_df = pd.DataFrame(schema_data)
-                    st.dataframe(schema_df, width='stretch')
+                # Perfil de todas las filas (o esquema de la muestra si aún no se calculó)
+                if profile is not None:
+                    with st.expander("🔍 Ver perfil completo", expanded=True):
+                        st.dataframe(_profile_table(profile), width='stretch', hide_index=True)
+                        if not all(column.distinct_exact for column in profile.columns):
+                            st.caption("≈ Valores únicos estimados (HyperLogLog, error típico < 1 %); ≥ conteos mínimos garantizados.")
+                
+                if row_index is not None:
+                    with st.expander("📑 Recorrer tabla completa"):
+                        render_csv_browser(row_index, selected_csv)
                     
             except ImportError:
                 st.info("💡 Instala pandas para ver vista previa: `pip install pandas`")
@@ -221,50 +396,228 @@ def display_csv_explorer():
                 st.error(f"❌ Error al leer CSV: {str(e)}")
 
 
-def detect_and_process_images(content: str) -> tuple:
+@st.cache_resource
+def get_sales_cube(data_dir: str):
+    """Cubo de ventas de la carpeta de datos, compartido por todas las sesiones del servidor."""
+    from sales_cube import SalesCube
+    return SalesCube(data_dir)
+
+
+def get_sales_summary(data_dir: str):
+    """
+    Indicadores de ventas consultados sobre el cubo preagregado.
+    
+    Antes de consultar se incorporan las filas agregadas a ventas y detalle
+    desde la última vez (o se reconstruye el cubo si cambió algo anterior).
+    
+    Args:
+        data_dir (str): Carpeta con los CSV
+        
+    Returns:
+        SalesSummary: Resumen, o None si falta pandas o alguna tabla
+    """
+    cube = get_sales_cube(data_dir)
+    if not cube.refresh():
+        return None
+    return get_memory_cache().get_or_compute('sales', cube.version, cube.summary)
+
+
+@st.fragment
+def display_sales_dashboard():
+    """
+    Muestra el tablero de ventas (ingresos por categoría, ciudad, medio de pago y mes).
+    
+    Es un fragmento, igual que el explorador de CSV: sus controles no vuelven a ejecutar el documento.
+    """
+    st.markdown("## 📈 Tablero de Ventas")
+    
+    _, data_dir, _, _ = get_project_paths()
+    with st.spinner("Calculando indicadores..."):
+        summary = get_sales_summary(data_dir)
+    
+    if summary is None:
+        st.warning(
+            "📭 No se pudieron calcular los indicadores: se necesitan `ventas.csv`, `detalle_ventas.csv`, "
+            "`productos.csv` y `clientes.csv` en la carpeta `data/` y pandas instalado (`pip install pandas`)."
+        )
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("💰 Ingresos", f"${summary.revenue:,.0f}")
+    with col2:
+        st.metric("🧾 Ventas", f"{summary.orders:,}")
+    with col3:
+        st.metric("🎫 Ticket promedio", f"${summary.average_ticket:,.0f}")
+    with col4:
+        st.metric("📦 Unidades", f"{summary.units:,}")
+    
+    st.markdown("**Ingresos por mes:**")
+    st.line_chart(summary.by_month, x='mes', y='ingresos')
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Ingresos por categoría:**")
+        st.bar_chart(summary.by_category, x='categoria', y='ingresos')
+    with col2:
+        st.markdown("**Ingresos por medio de pago:**")
+        st.bar_chart(summary.by_payment, x='medio_pago', y='ingresos')
+    
+    st.markdown("**Ingresos por ciudad:**")
+    st.bar_chart(summary.by_city, x='ciudad', y='ingresos')
+    
+    st.markdown("**Productos más vendidos:**")
+    st.dataframe(summary.top_products, width='stretch', hide_index=True)
+
+
+def get_asset_index(document_key, base_dirs: tuple, content: str = "") -> AssetIndex:
+    """
+    Índice de imágenes de un documento, armado una sola vez por versión (etapa 'assets').
+    
+    Args:
+        document_key: Clave de la versión del documento (hash o clave de streaming)
+        base_dirs (tuple): Carpetas para resolver rutas relativas (la del documento primero)
+        content (str): Texto del documento ("" en modo streaming: se resuelve por sección)
+    """
+    return get_memory_cache().get_or_compute(
+        'assets', (document_key, base_dirs), lambda: AssetIndex(base_dirs, content)
+    )
+
+
+def _find_image(content: str) -> tuple:
+    """Busca la primera imagen Markdown; devuelve (alt, ruta_escrita, contenido_sin_imagen) o (None, None, None)."""
+    images = find_images(content)
+    if not images:
+        return None, None, None
+    
+    alt_text, image_path = images[0]
+    # Remover la línea de imagen del contenido
+    return alt_text, image_path, IMAGE_PATTERN.sub('', content).strip()
+
+
+def detect_and_process_images(content: str, key=None, assets=None) -> tuple:
     """
     Detecta imágenes en el contenido Markdown y las procesa separadamente.
     
+    La búsqueda de la imagen se guarda en la caché en memoria (etapa 'images')
+    y la ruta se resuelve con el índice de imágenes del documento, que ya
+    comprobó qué archivos existen: no se vuelve a tocar el disco en cada ejecución.
+    
     Args:
         content (str): Contenido Markdown
+        key (Optional[bytes]): Hash del contenido, si ya se calculó
+        assets (Optional[AssetIndex]): Índice de imágenes del documento
         
     Returns:
         tuple: (tiene_imagen, ruta_imagen, contenido_sin_imagen)
     """
-    # Patrón para detectar imágenes markdown ![alt](path)
-    image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    image_match = re.search(image_pattern, content)
+    if key is None:
+        key = content_key(content)
+    alt_text, image_path, content_without_image = get_memory_cache().get_or_compute(
+        'images', key, lambda: _find_image(content)
+    )
+    if image_path is None:
+        return False, None, content
     
-    if image_match:
-        alt_text, image_path = image_match.groups()
-        
-        # Resolver ruta relativa si es necesario
-        if image_path.startswith('../'):
-            # Ruta relativa desde docs hacia images
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            resolved_path = os.path.join(current_dir, image_path.replace('../', ''))
-        else:
-            resolved_path = image_path
-        
-        # Verificar si el archivo existe
-        if os.path.exists(resolved_path):
-            # Remover la línea de imagen del contenido
-            content_without_image = re.sub(image_pattern, '', content).strip()
-            return True, resolved_path, content_without_image
+    if assets is None:
+        # Sin documento de referencia: rutas relativas a docs/ o a la raíz del proyecto
+        base_dir, _, docs_dir, _ = get_project_paths()
+        assets = get_asset_index(None, (docs_dir, base_dir))
+    resolved_path = assets.resolve(image_path, alt_text).path
+    if resolved_path:
+        return True, resolved_path, content_without_image
     
     return False, None, content
 
 
-def render_section_content(section_content: str, selected_section: str):
+def get_clean_section(section_content: str, key=None) -> str:
+    """
+    Devuelve la sección limpia para renderizar.
+    
+    Primero se busca en la caché en memoria por el hash de la sección (etapa
+    'clean'); si falta, en su entrada de la caché en disco, que también se
+    identifica por ese hash.
+    
+    Args:
+        section_content (str): Contenido de la sección
+        key (Optional[bytes]): Hash del contenido de la sección, si ya se calculó
+    """
+    cache = get_memory_cache()
+    if key is None:
+        key = content_key(section_content)
+    clean_content = cache.get('clean', key)
+    if clean_content is not None:
+        return clean_content
+    
+    clean_content = load_section_artifact('clean', key)
+    if clean_content is None:
+        clean_content = clean_markdown_content(section_content)
+        save_section_artifact('clean', key, clean_content)
+    cache.put('clean', key, clean_content)
+    return clean_content
+
+
+def go_to_page(offset: int):
+    """Callback de los botones ◀ ▶: avanza o retrocede una página."""
+    st.session_state.section_page = st.session_state.get('section_page', 0) + offset
+
+
+def render_markdown_pages(content: str, key: bytes):
+    """
+    Renderiza un contenido largo por páginas: solo se envía al navegador la visible.
+    
+    Las páginas se calculan una sola vez por hash de la sección (etapa 'pages'
+    de la caché en memoria) cortando entre párrafos, tablas y bloques de código.
+    
+    Args:
+        content (str): Contenido ya limpio para renderizar
+        key (bytes): Hash de la sección de la que sale el contenido
+    """
+    pages = get_memory_cache().get_or_compute(
+        'pages', (key, PAGE_SIZE_BUDGET), lambda: tuple(paginate_markdown(content))
+    )
+    if len(pages) <= 1:
+        st.markdown(content, unsafe_allow_html=True)
+        return
+    
+    # Al cambiar de sección (o si la página ya no existe) se vuelve a la primera
+    if st.session_state.get('section_page_key') != key or st.session_state.get('section_page', 0) >= len(pages):
+        st.session_state.section_page_key = key
+        st.session_state.section_page = 0
+    page = st.session_state.get('section_page', 0)
+    
+    col1, col2, col3 = st.columns([1, 8, 1])
+    with col1:
+        st.button("◀", key="page_prev", on_click=go_to_page, args=(-1,), disabled=page == 0)
+    with col2:
+        st.selectbox(
+            "Ir a la página:",
+            range(len(pages)),
+            key="section_page",
+            format_func=lambda i: f"Página {i + 1} de {len(pages)} · {page_label(pages[i])}",
+            label_visibility="collapsed"
+        )
+    with col3:
+        st.button("▶", key="page_next", on_click=go_to_page, args=(1,), disabled=page == len(pages) - 1)
+    
+    st.markdown(pages[st.session_state.section_page], unsafe_allow_html=True)
+    st.caption(f"📄 Página {st.session_state.section_page + 1} de {len(pages)}")
+
+
+def render_section_content(section_content: str, selected_section: str, assets=None):
     """
     Renderiza el contenido de una sección, manejando imágenes de forma especial.
     
     Args:
         section_content (str): Contenido de la sección
         selected_section (str): Nombre de la sección seleccionada
+        assets (Optional[AssetIndex]): Índice de imágenes del documento
     """
+    # Un solo hash por ejecución para las etapas de imágenes y limpieza
+    section_key = content_key(section_content)
+    
     # Detectar si hay imagen en esta sección
-    has_image, image_path, text_content = detect_and_process_images(section_content)
+    has_image, image_path, text_content = detect_and_process_images(section_content, section_key, assets)
     
     if has_image and image_path:
         # Si hay imagen, mostrar solo la imagen (especialmente para PNG)
@@ -276,13 +629,16 @@ def render_section_content(section_content: str, selected_section: str):
             """, unsafe_allow_html=True)
             
             try:
-                # Mostrar la imagen centrada y con tamaño apropiado
-                st.image(image_path, caption=f"Diagrama: {selected_section}", use_column_width=True)
+                # Se envía la variante reducida de la caché en disco; en PNG Streamlit
+                # la pasa tal cual, sin volver a decodificarla ni codificarla
+                image_data = get_default_image_cache().get_variant_bytes(image_path, IMAGE_DISPLAY_WIDTH, fmt='png')
+                st.image(image_data or image_path, caption=f"Diagrama: {selected_section}",
+                         use_column_width=True, output_format='PNG')
                 
                 # Solo mostrar texto adicional si hay contenido significativo
                 if text_content and len(text_content.strip()) > 50:
                     st.markdown("### 📝 Descripción adicional:")
-                    clean_content = clean_markdown_content(text_content)
+                    clean_content = get_clean_section(text_content)
                     st.markdown(clean_content, unsafe_allow_html=True)
                     
             except Exception as e:
@@ -296,8 +652,8 @@ def render_section_content(section_content: str, selected_section: str):
             </div>
             """, unsafe_allow_html=True)
             
-            clean_content = clean_markdown_content(section_content)
-            st.markdown(clean_content, unsafe_allow_html=True)
+            clean_content = get_clean_section(section_content, section_key)
+            render_markdown_pages(clean_content, section_key)
     else:
         # Contenido normal sin imagen
         st.markdown(f"""
@@ -306,13 +662,261 @@ def render_section_content(section_content: str, selected_section: str):
         </div>
         """, unsafe_allow_html=True)
         
-        clean_content = clean_markdown_content(section_content)
+        clean_content = get_clean_section(section_content, section_key)
         if clean_content.strip():
-            st.markdown(clean_content, unsafe_allow_html=True)
+            render_markdown_pages(clean_content, section_key)
         else:
             st.info("Esta sección está vacía.")
 
 
+def _outline_size(outline) -> int:
+    """Bytes aproximados de un árbol: el texto (si no es un mmap) y sus nodos."""
+    size = len(outline.nodes) * 200
+    if isinstance(outline.buffer, str):
+        size += sys.getsizeof(outline.buffer)
+    return size
+
+
+@st.cache_resource
+def get_corpus_store() -> CorpusStore:
+    """Almacén de documentos compartido por todas las sesiones del servidor."""
+    return CorpusStore()
+
+
+def get_session_document(file_path: str):
+    """
+    Devuelve la versión vigente de un documento local desde el almacén compartido.
+    
+    El documento, su árbol y su índice de búsqueda viven una sola vez en el
+    proceso; la sesión solo guarda (ruta, hash) de la versión que mostró, para
+    avisar cuando el archivo se editó.
+    
+    Args:
+        file_path (str): Ruta del documento seleccionado
+    """
+    store = get_corpus_store()
+    document = store.document(file_path)
+    if document is None:
+        return None
+    
+    seen = st.session_state.get('document_version')
+    if seen is not None and seen[0] == document.path and seen[1] != document.content_hash:
+        changes = store.changes_since(document.path, seen[1])
+        if changes is not None:
+            st.toast(f"🔄 Documento actualizado: {len(changes.affected)} secciones con cambios")
+        else:
+            st.toast("🔄 Documento actualizado")
+    st.session_state.document_version = (document.path, document.content_hash)
+    return document
+
+
+def get_stream_document(file_path: str):
+    """
+    Devuelve un documento grande en modo streaming, abierto una sola vez por versión.
+    
+    La clave es (ruta, tamaño, mtime): si el archivo cambia, la entrada
+    anterior deja de usarse y termina descartada por el LRU.
+    
+    Args:
+        file_path (str): Ruta del documento seleccionado
+        
+    Returns:
+        tuple: (clave_de_la_versión, documento o None)
+    """
+    try:
+        st_result = os.stat(file_path)
+    except OSError:
+        return None, None
+    key = (file_path, st_result.st_size, st_result.st_mtime_ns)
+    document = get_memory_cache().get_or_compute(
+        'stream', key, lambda: open_markdown_stream(file_path),
+        size=lambda document: _outline_size(document.outline)
+    )
+    return key, document
+
+
+@st.cache_resource
+def get_upload_store() -> UploadStore:
+    """Archivos subidos compartidos por todas las sesiones del servidor."""
+    return UploadStore()
+
+
+def get_stored_upload(uploaded_file) -> StoredUpload:
+    """
+    Guarda un archivo subido en el almacén, hasheándolo una sola vez.
+    
+    La sesión recuerda (file_id, hash) del archivo adjunto: mientras no se
+    suba otro, las siguientes ejecuciones no vuelven a leer ni hashear los bytes.
+    
+    Args:
+        uploaded_file (UploadedFile): Archivo de st.file_uploader
+    """
+    store = get_upload_store()
+    seen = st.session_state.get('upload_ref')
+    if seen is not None and seen[0] == uploaded_file.file_id:
+        stored = store.get(seen[1])
+        if stored is not None:
+            return stored
+    # Archivo nuevo, o descartado del almacén por su presupuesto: se vuelve a agregar
+    stored = store.add(uploaded_file.getvalue(), uploaded_file.name)
+    st.session_state.upload_ref = (uploaded_file.file_id, stored.content_hash)
+    return stored
+
+
+def get_uploaded_document(stored: StoredUpload):
+    """
+    Decodifica un archivo subido y obtiene su árbol, una sola vez por contenido.
+    
+    Args:
+        stored (StoredUpload): Entrada del almacén de archivos subidos
+        
+    Returns:
+        tuple: (contenido, encoding, árbol), o None si no se pudo leer
+    """
+    cache = get_memory_cache()
+    key = stored.content_hash
+    text = cache.get_or_compute('load', key, lambda: get_upload_store().read_text(stored),
+                                size=lambda text: sys.getsizeof(text[0]))
+    if text is None:
+        return None
+    content, encoding = text
+    outline = cache.get_or_compute('parse', key, lambda: parse_outline(content), size=_outline_size)
+    return content, encoding, outline
+
+
+def get_uploaded_stream(stored: StoredUpload):
+    """
+    Abre en modo streaming un archivo subido muy grande (ya volcado a disco).
+    
+    Args:
+        stored (StoredUpload): Entrada del almacén, con su archivo temporal
+    """
+    # Sin caché en disco: el archivo temporal no sobrevive al proceso
+    return get_memory_cache().get_or_compute(
+        'stream', stored.content_hash, lambda: open_markdown_stream(stored.path, use_cache=False),
+        size=lambda document: _outline_size(document.outline)
+    )
+
+
+def render_cache_stats():
+    """Muestra en la barra lateral los aciertos y fallos de la caché en memoria."""
+    cache = get_memory_cache()
+    stage_stats = cache.stats()
+    if not stage_stats:
+        return
+    with st.sidebar.expander("⚙️ Caché en memoria"):
+        st.caption(f"{len(cache)} entradas · {cache.size / (1024 * 1024):.1f} MB")
+        for stage, counters in sorted(stage_stats.items()):
+            st.caption(
+                f"**{stage}**: {counters.hits} aciertos / {counters.misses} fallos "
+                f"({counters.hit_rate:.0%}) · {counters.entries} entradas"
+            )
+
+
+@st.fragment(run_every=2)
+def watch_docs_folder(docs_dir: str):
+    """Se re-ejecuta cada 2 s: si algo cambió en docs/, vuelve a ejecutar la app."""
+    watcher = get_docs_watcher(docs_dir)
+    seen = st.session_state.get('docs_version')
+    st.session_state.docs_version = watcher.version
+    if seen is not None and seen != watcher.version:
+        st.rerun()
+
+
+def get_search_index(document_key, sections, document=None, text_size: int = 0):
+    """
+    Devuelve el índice de búsqueda del documento actual, construyéndolo una sola vez.
+    
+    Los documentos locales usan el índice del almacén compartido; los subidos
+    y los abiertos en streaming, la caché en memoria (etapa 'search').
+    
+    Args:
+        document_key: Identificador del contenido (hash) del documento
+        sections (Mapping[str, str]): Secciones del documento
+        document (Optional[LoadedDocument]): Documento local, si lo es
+        text_size (int): Tamaño del texto, para estimar lo que ocupa el índice
+    """
+    if document is not None:
+        return get_corpus_store().search_index(document)
+    # El índice (palabras y posiciones) ocupa varias veces el texto original
+    return get_memory_cache().get_or_compute(
+        'search', document_key, lambda: build_search_index(sections),
+        size=lambda index: 8 * text_size
+    )
+
+
+def go_to_section(section_name: str):
+    """Callback de los resultados de búsqueda: salta a la sección indicada."""
+    st.session_state.current_section = section_name
+    st.session_state.section_radio = section_name
+
+
+def render_search_results(search_index, query: str):
+    """
+    Muestra los resultados de búsqueda con fragmentos resaltados.
+    
+    Args:
+        search_index (SearchIndex): Índice del documento actual
+        query (str): Consulta del usuario
+    """
+    hits = search_index.search(query, limit=20)
+    
+    if not hits:
+        st.info(f"🔍 Sin resultados para '{query}'")
+        return
+    
+    st.markdown(f"### 🔍 {len(hits)} resultados para '{query}'")
+    for i, hit in enumerate(hits):
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"**📄 {hit.section}** · línea {hit.line}")
+            st.markdown(hit.snippet)
+        with col2:
+            st.button("Ir ➜", key=f"search_hit_{i}", on_click=go_to_section, args=(hit.section,))
+    st.markdown("---")
+
+
+def open_catalog_hit(file_path: str, section_name: str):
+    """Callback de la búsqueda global: abre otro documento en la sección indicada."""
+    _, _, docs_dir, _ = get_project_paths()
+    st.session_state.file_selector = os.path.relpath(file_path, docs_dir)
+    st.session_state.current_document = file_path
+    st.session_state.current_section = section_name
+    st.session_state.section_radio = section_name
+
+
+def render_catalog_results(markdown_files, query: str):
+    """
+    Busca en todos los documentos de docs/ usando el catálogo persistente.
+    
+    Args:
+        markdown_files (List[str]): Archivos a mantener sincronizados en el catálogo
+        query (str): Consulta del usuario
+    """
+    catalog = get_default_catalog()
+    if not catalog.available:
+        st.warning("⚠️ La búsqueda global no está disponible (SQLite sin FTS5)")
+        return
+    # Solo se reindexan los archivos que cambiaron desde la última búsqueda
+    catalog.update(markdown_files)
+    hits = catalog.search(query, limit=30)
+    
+    if not hits:
+        st.info(f"🔍 Sin resultados para '{query}' en los documentos")
+        return
+    
+    st.markdown(f"### 🌐 {len(hits)} resultados para '{query}' en todos los documentos")
+    for i, hit in enumerate(hits):
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"**📚 {os.path.basename(hit.path)} › {hit.section}**")
+            st.markdown(hit.snippet)
+        with col2:
+            st.button("Abrir ➜", key=f"catalog_hit_{i}", on_click=open_catalog_hit,
+                      args=(hit.path, hit.section))
+    st.markdown("---")
+
+
 def on_section_change():
     """Callback para cuando cambia la sección seleccionada."""
     if 'section_radio' in st.session_state:
@@ -333,6 +937,9 @@ def main():
     # Obtener rutas del proyecto
     base_dir, data_dir, docs_dir, utils_dir = get_project_paths()
     
+    # Recargar la app cuando se edite, cree o elimine un documento
+    watch_docs_folder(docs_dir)
+    
     # Descubrir archivos Markdown en docs/
     markdown_files = discover_markdown_files(docs_dir)
     
@@ -343,10 +950,9 @@ def main():
     # Sección compacta: dropdown + upload en el mismo bloque
     with st.sidebar.container():
         if markdown_files:
-            # Crear opciones amigables (solo nombres de archivo)
-            file_options = ["Seleccionar documento..."] + [
-                os.path.basename(file) for file in markdown_files
-            ]
+            # Opciones amigables: ruta relativa a docs/ para distinguir archivos de subcarpetas
+            file_labels = {os.path.relpath(file, docs_dir): file for file in markdown_files}
+            file_options = ["Seleccionar documento..."] + list(file_labels)
             
             selected_file_name = st.selectbox(
                 "📚 Docs disponibles:",
@@ -355,12 +961,7 @@ def main():
             )
             
             # Encontrar la ruta completa del archivo seleccionado
-            selected_file_path = None
-            if selected_file_name != "Seleccionar documento...":
-                for file_path in markdown_files:
-                    if os.path.basename(file_path) == selected_file_name:
-                        selected_file_path = file_path
-                        break
+            selected_file_path = file_labels.get(selected_file_name)
         else:
             st.warning("📭 No se encontraron archivos .md en `docs/`")
             selected_file_path = None
@@ -375,22 +976,47 @@ def main():
     
     # Determinar qué contenido mostrar
     document_content = ""
+    loaded_document = None
+    streamed_document = None
     document_title = "Explorador de Documentos"
     is_uploaded = False
     
     if uploaded_file is not None:
         # Prioridad al archivo subido
         try:
-            document_content = uploaded_file.read().decode('utf-8')
-            document_title = f"📤 {uploaded_file.name}"
-            is_uploaded = True
-            st.sidebar.success(f"✅ Archivo cargado: {uploaded_file.name}")
+            stored_upload = get_stored_upload(uploaded_file)
+            upload_key = stored_upload.content_hash
+            if stored_upload.path and stored_upload.size >= STREAMING_THRESHOLD:
+                stream_key, streamed_document = upload_key, get_uploaded_stream(stored_upload)
+                upload_encoding = streamed_document.encoding if streamed_document is not None else None
+            else:
+                uploaded = get_uploaded_document(stored_upload)
+                if uploaded is not None:
+                    document_content, upload_encoding, upload_outline = uploaded
+            if document_content or streamed_document is not None:
+                document_title = f"📤 {uploaded_file.name}"
+                is_uploaded = True
+                st.sidebar.success(f"✅ Archivo cargado: {uploaded_file.name}")
+                st.sidebar.caption(f"🔤 Codificación detectada: {upload_encoding}")
+            else:
+                st.sidebar.error("❌ No se pudo leer el archivo subido")
         except Exception as e:
             st.sidebar.error(f"❌ Error al cargar: {str(e)}")
     elif selected_file_path:
         # Archivo local seleccionado
-        document_content = load_markdown(selected_file_path)
-        if not document_content:
+        if is_large_markdown(selected_file_path):
+            # Archivos muy grandes: solo índice de encabezados, secciones bajo demanda
+            stream_key, streamed_document = get_stream_document(selected_file_path)
+            if streamed_document is not None:
+                st.sidebar.caption(f"⚡ Modo streaming · 🔤 {streamed_document.encoding}")
+        else:
+            # Árbol y estadísticas salen de la caché en disco; si el archivo se
+            # editó desde la última ejecución, solo se reparsea la zona modificada
+            loaded_document = get_session_document(selected_file_path)
+            if loaded_document is not None:
+                document_content = loaded_document.content
+                st.sidebar.caption(f"🔤 Codificación detectada: {loaded_document.encoding}")
+        if not document_content and streamed_document is None:
             st.sidebar.error("❌ No se pudo cargar el archivo seleccionado")
         else:
             # Resetear sección si cambió el documento
@@ -399,15 +1025,23 @@ def main():
                 st.session_state.current_section = None
     
     # Procesar contenido si existe
-    if document_content:
-        title, sections = parse_markdown_sections(document_content)
+    if document_content or streamed_document is not None:
+        # Un único árbol por documento: las secciones son vistas sobre él
+        if streamed_document is not None:
+            outline = streamed_document.outline
+            # Contar palabras y líneas obligaría a leer todo el archivo
+            stats = {'words': None, 'lines': None, 'sections': len(outline.level_nodes(2))}
+        elif loaded_document is not None:
+            outline = loaded_document.outline
+            stats = loaded_document.stats
+        else:
+            outline = upload_outline
+            stats = get_memory_cache().get_or_compute('stats', upload_key, lambda: get_markdown_stats(outline))
+        title, sections = parse_markdown_sections(outline, lazy=True)
         
         if title:
             document_title = title
         
-        # Calcular estadísticas
-        stats = get_markdown_stats(document_content)
-        
         # Renderizar header principal
         render_main_header(document_title)
         
@@ -425,49 +1059,105 @@ def main():
             with col4:
                 st.metric("💾 Tamaño", file_info['size'])
         
-        # Navegación por pestañas
-        tab1, tab2 = st.tabs(["📖 Contenido del Documento", "📊 Explorar Datos CSV"])
+        # Vista principal: solo se ejecuta la elegida (st.tabs ejecuta siempre todas)
+        view = st.radio(
+            "Vista",
+            [DOCUMENT_VIEW, CSV_VIEW, DASHBOARD_VIEW],
+            key="main_view",
+            horizontal=True,
+            label_visibility="collapsed"
+        )
+        show_document = view == DOCUMENT_VIEW
         
-        with tab1:
-            if sections:
-                # Navegación lateral por secciones (inmediatamente después de selección de archivo)
-                st.sidebar.markdown("---")
-                st.sidebar.markdown("## 🧭 Navegación")
-                
-                section_options = list(sections.keys())
-                
-                # Inicializar sección por defecto si es necesario
-                if 'current_section' not in st.session_state or st.session_state.current_section not in section_options:
-                    st.session_state.current_section = section_options[0]
-                
-                # Radio button con callback - esto soluciona el problema del doble clic
-                current_index = section_options.index(st.session_state.current_section)
-                
-                st.sidebar.radio(
-                    "📄 Secciones:",
-                    section_options,
-                    index=current_index,
-                    key="section_radio",
-                    on_change=on_section_change
+        if sections:
+            # Los controles de la barra lateral se dibujan en ambas vistas para conservar su estado
+            # Búsqueda en el documento (índice construido una vez por documento)
+            search_query = st.sidebar.text_input(
+                "🔍 Buscar en el documento:",
+                key="search_query",
+                help='Palabras, "frase exacta" o prefijo*. No distingue acentos.'
+            )
+            search_all = st.sidebar.checkbox(
+                "🌐 Buscar en todos los documentos",
+                key="search_all",
+                disabled=is_uploaded
+            )
+            if show_document and search_query.strip() and search_all and not is_uploaded:
+                render_catalog_results(markdown_files, search_query)
+            elif show_document and search_query.strip():
+                if loaded_document is not None:
+                    document_key, text_size = loaded_document.content_hash, len(document_content)
+                elif streamed_document is not None:
+                    document_key, text_size = stream_key, streamed_document.size
+                else:
+                    document_key, text_size = upload_key, len(document_content)
+                render_search_results(
+                    get_search_index(document_key, sections, loaded_document, text_size), search_query
                 )
+            
+
+            # Navegación lateral por secciones (inmediatamente después de selección de archivo)
+            st.sidebar.markdown("---")
+            st.sidebar.markdown("## 🧭 Navegación")
+            
+            section_options = list(sections.keys())
+            
+            # Inicializar sección por defecto si es necesario
+            if 'current_section' not in st.session_state or st.session_state.current_section not in section_options:
+                st.session_state.current_section = section_options[0]
+            
+            # Radio button con callback - esto soluciona el problema del doble clic
+            current_index = section_options.index(st.session_state.current_section)
+            
+            st.sidebar.radio(
+                "📄 Secciones:",
+                section_options,
+                index=current_index,
+                key="section_radio",
+                on_change=on_section_change
+            )
+            
+            # Usar la sección actual del estado
+            selected_section = st.session_state.current_section
+            
+            # Mostrar contenido de la sección
+            if show_document and selected_section in sections:
+                section_content = sections[selected_section]
                 
-                # Usar la sección actual del estado
-                selected_section = st.session_state.current_section
+                # Estadísticas de la sección: sumas de segmentos ya contados
+                current_stats = section_stats(outline, selected_section)
+                if current_stats:
+                    st.caption(
+                        f"⏱️ {current_stats['reading_time']} min de lectura · "
+                        f"{current_stats['words']} palabras · "
+                        f"{current_stats['code_blocks']} bloques de código · "
+                        f"{current_stats['tables']} tablas · "
+                        f"{current_stats['images']} imágenes"
+                    )
                 
-                # Mostrar contenido de la sección
-                if selected_section in sections:
-                    section_content = sections[selected_section]
-                    
-                    # Usar la nueva función para renderizar contenido
-                    render_section_content(section_content, selected_section)
-            else:
-                # Sin secciones definidas
-                st.warning("⚠️ Este documento no tiene secciones definidas (##). Mostrando contenido completo:")
-                clean_content = clean_markdown_content(document_content)
-                st.markdown(clean_content, unsafe_allow_html=True)
+                # Índice de imágenes del documento (rutas relativas a su carpeta)
+                if loaded_document is not None:
+                    assets = get_asset_index(loaded_document.content_hash,
+                                             (os.path.dirname(loaded_document.path), base_dir), document_content)
+                elif streamed_document is not None and not is_uploaded:
+                    assets = get_asset_index(stream_key, (os.path.dirname(selected_file_path), base_dir))
+                elif streamed_document is not None:
+                    assets = get_asset_index(stream_key, (docs_dir, base_dir))
+                else:
+                    assets = get_asset_index(upload_key, (docs_dir, base_dir), document_content)
+                
+                # Usar la nueva función para renderizar contenido
+                render_section_content(section_content, selected_section, assets)
+        elif show_document:
+            # Sin secciones definidas
+            st.warning("⚠️ Este documento no tiene secciones definidas (##). Mostrando contenido completo:")
+            clean_content = get_clean_section(document_content)
+            st.markdown(clean_content, unsafe_allow_html=True)
         
-        with tab2:
+        if view == CSV_VIEW:
             display_csv_explorer()
+        elif view == DASHBOARD_VIEW:
+            display_sales_dashboard()
     
     else:
         # No hay contenido - mostrar página de bienvenida
@@ -544,16 +1234,19 @@ def main():
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            csv_count = len(discover_csv_files(data_dir)) if os.path.exists(data_dir) else 0
+            csv_count = len(discover_csv_files(data_dir))
             st.metric("📊 Archivos CSV", csv_count, help=f"En carpeta data/")
         
         with col2:
-            md_count = len(discover_markdown_files(docs_dir)) if os.path.exists(docs_dir) else 0
+            md_count = len(markdown_files)
             st.metric("📄 Archivos MD", md_count, help=f"En carpeta docs/")
         
         with col3:
             py_count = len([f for f in os.listdir(src_dir) if f.endswith('.py')]) if os.path.exists(src_dir) else 0
             st.metric("🐍 Archivos Python", py_count, help=f"En carpeta src/")
+    
+    # Aciertos y fallos de la caché en memoria, al final de la barra lateral
+    render_cache_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cargas en segundo plano con resultados por cola - Tienda Aurelion
+
+Las interfaces con un bucle de eventos propio (Tk) no pueden bloquearse
+leyendo y parseando un archivo grande. BackgroundLoader ejecuta esas
+cargas en un pool de hilos y deja cada resultado en una cola que la
+interfaz vacía desde su propio hilo (en Tk, con root.after).
+
+Cada carga pertenece a un canal ('documento', por ejemplo). Pedir una
+carga nueva en un canal deja obsoleta a la anterior: si todavía no empezó
+se cancela, y si ya estaba corriendo su resultado se descarta (y se
+libera con la función `discard`, si se indicó). Así la interfaz solo ve el
+resultado de lo último que pidió el usuario.
+
+Se usan hilos y no procesos: los documentos en streaming mantienen un
+mmap abierto y las cachés en memoria son del proceso, así que los
+resultados no se pueden enviar entre procesos.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+DEFAULT_LOADER_WORKERS = 2
+
+
+class LoadResult(NamedTuple):
+    """Resultado de una carga terminada."""
+    channel: str
+    ticket: int
+    value: Any
+    error: Optional[BaseException]
+    seconds: float
+
+
+class BackgroundLoader:
+    """
+    Pool de hilos para cargas que se consultan por sondeo.
+
+    submit() y cancel() se llaman desde el hilo de la interfaz; poll()
+    devuelve los resultados vigentes y también debe llamarse desde ese hilo.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_LOADER_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='background-loader')
+        self._results: 'queue.Queue[LoadResult]' = queue.Queue()
+        self._tickets = itertools.count(1)
+        self._latest: Dict[str, int] = {}
+        self._futures: Dict[str, Tuple[int, Future]] = {}
+        self._discard: Dict[int, Optional[Callable[[Any], None]]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, channel: str, fn: Callable[..., Any], *args,
+               discard: Optional[Callable[[Any], None]] = None, **kwargs) -> int:
+        """
+        Pide una carga en un canal, dejando obsoleta la anterior del mismo canal.
+
+        Args:
+            channel (str): Canal de la carga
+            fn (Callable): Función a ejecutar en un hilo del pool (no debe tocar la interfaz)
+            *args: Argumentos de fn
+            discard (Optional[Callable[[Any], None]]): Libera el resultado si queda obsoleto
+            **kwargs: Argumentos con nombre de fn
+
+        Returns:
+            int: Número de la carga (ticket)
+        """
+        with self._lock:
+            ticket = next(self._tickets)
+            self._latest[channel] = ticket
+            previous = self._futures.get(channel)
+            self._discard[ticket] = discard
+        self._cancel(previous)
+        future = self._executor.submit(self._run, channel, ticket, fn, args, kwargs)
+        with self._lock:
+            if self._latest.get(channel) == ticket:
+                self._futures[channel] = (ticket, future)
+        return ticket
+
+    def _cancel(self, entry: Optional[Tuple[int, Future]]):
+        # Solo tiene efecto si la carga todavía no empezó; si no, _run descarta el resultado
+        if entry is not None and entry[1].cancel():
+            self._release(entry[0], None)
+
+    def cancel(self, channel: str):
+        """Deja obsoleta la carga en curso de un canal (su resultado no se entregará)."""
+        with self._lock:
+            self._latest.pop(channel, None)
+            entry = self._futures.pop(channel, None)
+        self._cancel(entry)
+
+    def is_current(self, channel: str, ticket: int) -> bool:
+        """True si la carga es la última pedida en su canal."""
+        with self._lock:
+            return self._latest.get(channel) == ticket
+
+    def pending(self, channel: str) -> bool:
+        """True si el canal tiene una carga vigente que todavía no se entregó con poll()."""
+        with self._lock:
+            return channel in self._latest
+
+    def _release(self, ticket: int, value: Any):
+        with self._lock:
+            discard = self._discard.pop(ticket, None)
+        if discard is not None and value is not None:
+            try:
+                discard(value)
+            except Exception:
+                pass
+
+    def _run(self, channel: str, ticket: int, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        if not self.is_current(channel, ticket):
+            self._release(ticket, None)
+            return
+        started = time.perf_counter()
+        value, error = None, None
+        try:
+            value = fn(*args, **kwargs)
+        except Exception as e:
+            error = e
+        if self.is_current(channel, ticket):
+            self._results.put(LoadResult(channel, ticket, value, error, time.perf_counter() - started))
+        else:
+            self._release(ticket, value)
+
+    def poll(self) -> List[LoadResult]:
+        """
+        Devuelve los resultados terminados que siguen vigentes (sin bloquear).
+
+        Returns:
+            List[LoadResult]: Resultados en orden de llegada
+        """
+        results = []
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                current = self._latest.get(result.channel) == result.ticket
+                if current:
+                    # Entregado: el canal queda libre
+                    del self._latest[result.channel]
+                    self._futures.pop(result.channel, None)
+                    self._discard.pop(result.ticket, None)
+            if current:
+                results.append(result)
+            else:
+                # Se pidió otra carga después de que esta terminara
+                self._release(result.ticket, result.value)
+        return results
+
+    def shutdown(self):
+        """Cancela las cargas que no empezaron y libera el pool sin esperar a las que corren."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
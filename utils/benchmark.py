@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks del pipeline de parsing y de los caminos de CSV/análisis - Tienda Aurelion
+
+Mide, para cada tamaño de entrada (de 1 KB a 1 GB), cuánto tardan
+load_markdown, parse_markdown_sections, clean_markdown_content,
+get_markdown_stats, el descubrimiento de archivos, el perfil de CSV y el
+resumen de ventas. Para cada caso informa:
+
+- segundos: el mejor de varias repeticiones
+- MB/s: bytes de entrada por segundo
+- memoria: pico de tracemalloc (asignaciones de Python) y pico de RSS
+
+Cada caso corre en un proceso propio, así el RSS de uno no contamina al
+siguiente. Las entradas se generan con synthetic_data (siempre la misma
+semilla) y se guardan en .cache/benchmarks/entradas para reutilizarlas.
+Los resultados se guardan en JSON y se comparan contra una base: si un
+caso tarda o asigna más que la base por encima del umbral, el comando
+termina con código 1.
+
+Uso:
+    python utils/benchmark.py                              # tamaños por defecto
+    python utils/benchmark.py --tamanos 1KB,1MB,1GB --casos parse_markdown_sections
+    python utils/benchmark.py --guardar-base               # fija la base actual
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import (
+    clean_markdown_content,
+    discover_markdown_files,
+    get_markdown_stats,
+    get_project_paths,
+    load_markdown,
+    parse_markdown_sections
+)
+import file_discovery
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_SIZES = '1KB,100KB,10MB,100MB'
+DEFAULT_REPEATS = 3
+DEFAULT_THRESHOLD = 0.25
+# Diferencias menores a esto no cuentan como regresión (ruido del reloj en entradas chicas)
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA_MB = 1.0
+# Una vez superado este tiempo acumulado no se hacen más repeticiones
+REPEAT_TIME_BUDGET = 10.0
+# Archivos por carpeta y tamaño nominal de cada archivo en el árbol de descubrimiento
+DISCOVERY_FILES_PER_DIR = 100
+DISCOVERY_BYTES_PER_FILE = 16 * 1024
+DISCOVERY_MAX_FILES = 20_000
+# Bytes aproximados por línea de detalle_ventas.csv generada
+_DETAIL_ROW_BYTES = 44
+_UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'B': 1}
+
+
+class BenchmarkCase(NamedTuple):
+    """Un caso: qué entrada usa, cómo se prepara (sin medir) y qué se mide."""
+    input_kind: str                       # 'markdown', 'arbol' o 'ventas'
+    setup: Callable[[str], Any]           # Recibe la ruta de la entrada
+    run: Callable[[Any], Any]
+
+
+def _csv_profile(path: str):
+    from csv_profile import profile_csv
+    return profile_csv(os.path.join(path, 'detalle_ventas.csv'))
+
+
+def _sales_summary(path: str):
+    from sales_analytics import compute_sales_summary
+    return compute_sales_summary(path)
+
+
+def _cold_discovery(path: str):
+    # Sin fotos previas: se recorre cada carpeta con os.scandir
+    file_discovery._default_scanner = None
+    return discover_markdown_files(path)
+
+
+def _warm_setup(path: str) -> str:
+    discover_markdown_files(path)
+    return path
+
+
+CASES: Dict[str, BenchmarkCase] = {
+    'load_markdown': BenchmarkCase('markdown', lambda path: path, load_markdown),
+    'parse_markdown_sections': BenchmarkCase('markdown', load_markdown, parse_markdown_sections),
+    'clean_markdown_content': BenchmarkCase('markdown', load_markdown, clean_markdown_content),
+    'get_markdown_stats': BenchmarkCase('markdown', load_markdown, get_markdown_stats),
+    'discover_markdown_files': BenchmarkCase('arbol', lambda path: path, _cold_discovery),
+    'discover_markdown_files_cache': BenchmarkCase('arbol', _warm_setup, discover_markdown_files),
+    'profile_csv': BenchmarkCase('ventas', lambda path: path, _csv_profile),
+    # La primera llamada (sin medir) arma la caché columnar; se mide la consulta con la caché lista
+    'compute_sales_summary': BenchmarkCase('ventas', lambda path: (_sales_summary(path), path)[1],
+                                           _sales_summary),
+}
+
+
+def parse_size(text: str) -> int:
+    """
+    Convierte un tamaño como '1KB', '10MB' o '1GB' (potencias de 1024) a bytes.
+
+    Args:
+        text (str): Tamaño con unidad opcional
+
+    Returns:
+        int: Bytes (0 si el texto no es válido)
+    """
+    text = text.strip().upper()
+    for unit, factor in _UNITS.items():
+        if text.endswith(unit):
+            try:
+                return int(float(text[:-len(unit)]) * factor)
+            except ValueError:
+                return 0
+    return int(text) if text.isdigit() else 0
+
+
+def _size_label(size: int) -> str:
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _generate_input(kind: str, size: int, target: str):
+    """Genera una entrada de benchmark del tipo y tamaño pedidos en la carpeta target."""
+    # Importado acá para que los casos de Markdown no carguen numpy/pandas (y su RSS)
+    import synthetic_data
+
+    os.makedirs(target, exist_ok=True)
+    if kind == 'markdown':
+        synthetic_data.generate_markdown_file(os.path.join(target, 'documento.md'), size)
+    elif kind == 'arbol':
+        files = max(1, min(size // DISCOVERY_BYTES_PER_FILE, DISCOVERY_MAX_FILES))
+        for number in range(files):
+            folder = os.path.join(target, f'carpeta_{number // DISCOVERY_FILES_PER_DIR:04d}')
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f'documento_{number:05d}.md'), 'w', encoding='utf-8') as f:
+                f.write(f"# Documento {number}\n")
+    else:
+        synthetic_data.generate_sales_data(target, detail_rows=max(1, size // _DETAIL_ROW_BYTES))
+
+
+def prepare_input(kind: str, size: int, inputs_dir: str) -> Tuple[str, int]:
+    """
+    Devuelve la ruta de una entrada de benchmark, generándola si todavía no existe.
+
+    Se genera en una carpeta temporal que se renombra al terminar, así una
+    generación interrumpida nunca se reutiliza.
+
+    Args:
+        kind (str): 'markdown', 'arbol' o 'ventas'
+        size (int): Tamaño aproximado en bytes
+        inputs_dir (str): Carpeta donde se guardan las entradas
+
+    Returns:
+        Tuple[str, int]: (ruta a pasar al caso, bytes de entrada para calcular MB/s; 0 si no aplica)
+    """
+    target = os.path.join(inputs_dir, f"{kind}-{_size_label(size)}")
+    if not os.path.isdir(target):
+        partial = target + '.tmp'
+        shutil.rmtree(partial, ignore_errors=True)
+        _generate_input(kind, size, partial)
+        os.replace(partial, target)
+
+    if kind == 'markdown':
+        path = os.path.join(target, 'documento.md')
+        return path, os.path.getsize(path)
+    if kind == 'ventas':
+        return target, os.path.getsize(os.path.join(target, 'detalle_ventas.csv'))
+    # En el descubrimiento lo que importa es la cantidad de archivos, no sus bytes
+    return target, 0
+
+
+def _peak_rss_mb() -> Optional[float]:
+    # En Linux, ru_maxrss conserva el máximo del proceso padre anterior al exec;
+    # VmHWM corresponde solo a este proceso
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (IOError, OSError, ValueError):
+        pass
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(name: str, path: str, repeats: int, trace: bool) -> Dict[str, Any]:
+    """Corre un caso en el proceso actual y devuelve sus métricas."""
+    case = CASES[name]
+    argument = case.setup(path)
+    times = []
+    started = time.perf_counter()
+    for _ in range(max(1, repeats)):
+        begin = time.perf_counter()
+        case.run(argument)
+        times.append(time.perf_counter() - begin)
+        if time.perf_counter() - started > REPEAT_TIME_BUDGET:
+            break
+
+    traced_peak = None
+    if trace:
+        tracemalloc.start()
+        case.run(argument)
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return {'segundos': min(times), 'repeticiones': len(times),
+            'memoria_mb': traced_peak, 'rss_pico_mb': _peak_rss_mb()}
+
+
+def _child(name: str, path: str, repeats: int, trace: bool, queue):
+    try:
+        queue.put(_measure(name, path, repeats, trace))
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+def run_case(name: str, path: str, repeats: int = DEFAULT_REPEATS, trace: bool = True) -> Dict[str, Any]:
+    """
+    Corre un caso en un proceso nuevo (RSS limpio) y devuelve sus métricas.
+
+    Args:
+        name (str): Nombre del caso (clave de CASES)
+        path (str): Entrada devuelta por prepare_input()
+        repeats (int): Repeticiones cronometradas (se informa la mejor)
+        trace (bool): Si además se hace una corrida con tracemalloc
+
+    Returns:
+        Dict[str, Any]: segundos, repeticiones, memoria_mb, rss_pico_mb (o 'error')
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.SimpleQueue()
+    process = context.Process(target=_child, args=(name, path, repeats, trace, queue))
+    process.start()
+    process.join()
+    if queue.empty():
+        return {'error': f"el proceso terminó con código {process.exitcode}"}
+    return queue.get()
+
+
+def run_benchmarks(sizes: List[int], cases: List[str], inputs_dir: str,
+                   repeats: int = DEFAULT_REPEATS, trace: bool = True,
+                   report: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Corre todos los casos pedidos sobre cada tamaño de entrada.
+
+    Args:
+        sizes (List[int]): Tamaños de entrada en bytes
+        cases (List[str]): Nombres de los casos
+        inputs_dir (str): Carpeta de entradas generadas
+        repeats (int): Repeticiones por caso
+        trace (bool): Si se mide el pico de tracemalloc
+        report (Optional[Callable]): Recibe cada resultado apenas se obtiene
+
+    Returns:
+        Dict[str, Any]: Documento de resultados (versión, fecha, entorno y lista de resultados)
+    """
+    results = []
+    for size in sizes:
+        for name in cases:
+            path, input_bytes = prepare_input(CASES[name].input_kind, size, inputs_dir)
+            metrics = run_case(name, path, repeats, trace)
+            result = {'caso': name, 'tamano': _size_label(size), 'bytes': input_bytes, **metrics}
+            if 'segundos' in metrics:
+                result['mb_s'] = (input_bytes / (1024 * 1024) / metrics['segundos']
+                                  if input_bytes and metrics['segundos'] > 0 else None)
+            results.append(result)
+            if report is not None:
+                report(result)
+    return {
+        'version': RESULTS_FORMAT_VERSION,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': results,
+    }
+
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    """Lee un archivo de resultados; None si no existe o no es de esta versión."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    return data if data.get('version') == RESULTS_FORMAT_VERSION else None
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """Guarda los resultados en JSON de forma atómica."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compara resultados contra una base y devuelve las regresiones.
+
+    Un caso empeora si su tiempo o su pico de tracemalloc supera el de la
+    base en más de `threshold` (0.25 = 25 %) y además por más del mínimo
+    absoluto (MIN_TIME_DELTA, MIN_MEMORY_DELTA_MB).
+
+    Args:
+        current (Dict[str, Any]): Resultados actuales
+        baseline (Dict[str, Any]): Resultados de referencia
+        threshold (float): Empeoramiento relativo tolerado
+
+    Returns:
+        List[Dict[str, Any]]: caso, tamano, metrica, base, actual y cambio (relativo)
+    """
+    base = {(r['caso'], r['tamano']): r for r in baseline.get('resultados', [])}
+    regressions = []
+    for result in current.get('resultados', []):
+        reference = base.get((result['caso'], result['tamano']))
+        if reference is None:
+            continue
+        for metric, minimum in (('segundos', MIN_TIME_DELTA), ('memoria_mb', MIN_MEMORY_DELTA_MB)):
+            before, after = reference.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > minimum:
+                regressions.append({'caso': result['caso'], 'tamano': result['tamano'], 'metrica': metric,
+                                    'base': before, 'actual': after, 'cambio': after / before - 1})
+    return regressions
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    label = f"{result['caso']:<30} {result['tamano']:>6}"
+    if 'error' in result:
+        return f"{label}  ❌ {result['error']}"
+    throughput = f"{result['mb_s']:9.1f} MB/s" if result.get('mb_s') else ' ' * 14
+    memory = f"{result['memoria_mb']:9.1f} MB" if result.get('memoria_mb') is not None else ' ' * 12
+    rss = f"RSS {result['rss_pico_mb']:8.1f} MB" if result.get('rss_pico_mb') is not None else ''
+    return f"{label} {result['segundos']:10.4f} s {throughput} {memory}  {rss}"
+
+
+def main() -> int:
+    base_dir = get_project_paths()[0]
+    bench_dir = os.path.join(base_dir, '.cache', 'benchmarks')
+
+    parser = argparse.ArgumentParser(description="Benchmarks del parsing Markdown y del análisis de CSV")
+    parser.add_argument('--tamanos', default=DEFAULT_SIZES, help="Tamaños de entrada, p. ej. 1KB,10MB,1GB")
+    parser.add_argument('--casos', default=','.join(CASES), help="Casos a correr, separados por coma")
+    parser.add_argument('--repeticiones', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--sin-tracemalloc', action='store_true', help="No medir el pico de tracemalloc")
+    parser.add_argument('--salida', default=None, help="JSON de resultados (por defecto en .cache/benchmarks)")
+    parser.add_argument('--base', default=os.path.join(bench_dir, 'base.json'), help="JSON de referencia")
+    parser.add_argument('--umbral', type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento tolerado (0.25 = 25 %%)")
+    parser.add_argument('--guardar-base', action='store_true', help="Guardar estos resultados como base")
+    parser.add_argument('--entradas', default=os.path.join(bench_dir, 'entradas'),
+                        help="Carpeta de entradas generadas")
+    args = parser.parse_args()
+
+    sizes = [parse_size(text) for text in args.tamanos.split(',')]
+    cases = [name.strip() for name in args.casos.split(',') if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown or not all(sizes):
+        print(f"❌ Casos o tamaños no válidos. Casos disponibles: {', '.join(CASES)}")
+        return 2
+    from synthetic_data import PANDAS_AVAILABLE
+    if not PANDAS_AVAILABLE:
+        print("❌ Se necesitan numpy y pandas para generar las entradas: pip install pandas")
+        return 2
+
+    print(f"{'caso':<30} {'tamaño':>6} {'tiempo':>12} {'velocidad':>14} {'tracemalloc':>12}")
+    results = run_benchmarks(sizes, cases, args.entradas, args.repeticiones, not args.sin_tracemalloc,
+                             report=lambda result: print(_format_result(result), flush=True))
+
+    output = args.salida or os.path.join(bench_dir, f"resultados-{datetime.now():%Y%m%d-%H%M%S}.json")
+    save_results(results, output)
+    print(f"\n💾 Resultados: {output}")
+
+    if args.guardar_base:
+        save_results(results, args.base)
+        print(f"📌 Base actualizada: {args.base}")
+        return 0
+
+    baseline = load_results(args.base)
+    if baseline is None:
+        print("ℹ️ No hay base para comparar (usar --guardar-base para fijarla)")
+        return 0
+    regressions = compare_results(results, baseline, args.umbral)
+    if not regressions:
+        print(f"✅ Sin regresiones respecto de la base ({args.umbral:.0%} de tolerancia)")
+        return 0
+    print(f"⚠️ {len(regressions)} regresiones respecto de la base:")
+    for item in regressions:
+        print(f"   {item['caso']} {item['tamano']} {item['metrica']}: "
+              f"{item['base']:.4f} → {item['actual']:.4f} (+{item['cambio']:.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén de documentos compartido entre sesiones - Tienda Aurelion
+
+Con muchos usuarios sobre la misma carpeta docs/, cada sesión de Streamlit
+guardaba su propia copia de cada documento (texto, árbol, estadísticas e
+índice de búsqueda). Este almacén guarda una sola copia por archivo para
+todo el proceso; las sesiones solo recuerdan la ruta y el hash de la
+versión que mostraron.
+
+Los objetos publicados son de solo lectura: cuando un archivo cambia se
+crea una versión nueva del documento (reload_document) y el índice de
+búsqueda se actualiza sobre una copia, de modo que una sesión que está
+usando la versión anterior nunca la ve modificarse a medio camino.
+
+El almacén vive mientras vive el proceso, así que tiene un presupuesto de
+documentos y de bytes aproximados (texto, árbol e índice): al superarlo se
+descartan los documentos usados hace más tiempo (LRU), como en MemoryCache.
+Una sesión que vuelve a pedir un documento descartado lo recarga (el árbol
+sale de la caché en disco).
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from utils import (
+    LoadedDocument,
+    OutlineChanges,
+    SearchIndex,
+    build_search_index,
+    load_document,
+    reload_document,
+    update_search_index
+)
+
+
+DEFAULT_CORPUS_BYTES = 256 * 1024 * 1024  # 256 MB
+DEFAULT_CORPUS_DOCUMENTS = 64
+# El índice (palabras y posiciones) ocupa varias veces el texto original
+_INDEX_SIZE_FACTOR = 8
+
+
+def _document_size(document: LoadedDocument, indexed: bool) -> int:
+    """Bytes aproximados de un documento: texto, nodos del árbol y, si lo tiene, su índice."""
+    size = sys.getsizeof(document.content) + len(document.outline.nodes) * 200
+    if indexed:
+        size += _INDEX_SIZE_FACTOR * len(document.content)
+    return size
+
+
+class _Revision(NamedTuple):
+    """Último cambio de un documento: de qué versión a cuál y qué secciones."""
+    previous_hash: str
+    content_hash: str
+    changes: OutlineChanges
+
+
+class CorpusStore:
+    """
+    Documentos parseados e índices de búsqueda, compartidos por todo el proceso.
+
+    Es seguro usarlo desde varios hilos: cada archivo tiene su propio lock,
+    así que cargar un documento no bloquea a quien consulta otro.
+
+    Args:
+        max_bytes (int): Tamaño máximo aproximado de todos los documentos e índices
+        max_documents (int): Cantidad máxima de documentos
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CORPUS_BYTES, max_documents: int = DEFAULT_CORPUS_DOCUMENTS):
+        self.max_bytes = max_bytes
+        self.max_documents = max_documents
+        # Orden de uso (LRU): el más antiguo primero
+        self._documents: 'OrderedDict[str, LoadedDocument]' = OrderedDict()
+        self._indexes: Dict[str, SearchIndex] = {}     # ruta -> índice de la versión vigente
+        self._revisions: Dict[str, _Revision] = {}
+        self._sizes: Dict[str, int] = {}               # ruta -> bytes aproximados
+        self._size = 0
+        self.evictions = 0
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            lock = self._path_locks.get(path)
+            if lock is None:
+                lock = self._path_locks[path] = threading.Lock()
+            return lock
+
+    def document(self, path: str) -> Optional[LoadedDocument]:
+        """
+        Devuelve la versión vigente de un documento.
+
+        La primera sesión que lo pide lo carga; si el archivo cambió en disco,
+        la primera que lo nota lo recarga (solo las secciones afectadas) y las
+        demás reciben la versión nueva ya lista.
+
+        Args:
+            path (str): Ruta al archivo Markdown
+
+        Returns:
+            Optional[LoadedDocument]: Documento (no debe modificarse), o None si no se pudo leer
+        """
+        path = os.path.abspath(path)
+        with self._path_lock(path):
+            current = self._documents.get(path)
+            if current is None:
+                document = load_document(path)
+            else:
+                document, changes = reload_document(current)
+                if changes:
+                    self._revise(path, current, document, changes)
+
+            if document is None:
+                self.forget(path)
+            else:
+                self._store(path, document)
+            return document
+
+    def _store(self, path: str, document: LoadedDocument):
+        """Publica un documento como el más reciente y descarta los más antiguos si hace falta."""
+        with self._lock:
+            self._documents[path] = document
+            self._documents.move_to_end(path)
+            self._resize(path, document)
+            self._evict()
+
+    def _evict(self):
+        """Descarta los documentos más antiguos hasta respetar el presupuesto (con el lock tomado)."""
+        # El documento recién usado (el último) nunca se descarta
+        while ((self._size > self.max_bytes or len(self._documents) > self.max_documents)
+               and len(self._documents) > 1):
+            old_path, _ = self._documents.popitem(last=False)
+            self._drop(old_path)
+            self.evictions += 1
+
+    def _resize(self, path: str, document: LoadedDocument):
+        """Actualiza los bytes de un documento (con el lock tomado)."""
+        size = _document_size(document, path in self._indexes)
+        self._size += size - self._sizes.get(path, 0)
+        self._sizes[path] = size
+
+    def _drop(self, path: str):
+        """Olvida el índice, la revisión y el tamaño de un documento (con el lock tomado)."""
+        self._indexes.pop(path, None)
+        self._revisions.pop(path, None)
+        self._size -= self._sizes.pop(path, 0)
+
+    def _revise(self, path: str, current: LoadedDocument, document: Optional[LoadedDocument],
+                changes: OutlineChanges):
+        """Registra un cambio y actualiza el índice de búsqueda sobre una copia."""
+        if document is None:
+            return
+        self._revisions[path] = _Revision(current.content_hash, document.content_hash, changes)
+        index = self._indexes.get(path)
+        if index is not None:
+            self._indexes[path] = update_search_index(index.copy(), document.outline, changes)
+
+    def search_index(self, document: LoadedDocument) -> SearchIndex:
+        """
+        Índice de búsqueda de un documento, construido una sola vez por versión.
+
+        Args:
+            document (LoadedDocument): Documento devuelto por document()
+
+        Returns:
+            SearchIndex: Índice de esa versión (no debe modificarse)
+        """
+        path = os.path.abspath(document.path)
+        with self._path_lock(path):
+            index = self._indexes.get(path)
+            current = self._documents.get(path)
+            if index is None or current is not document:
+                index = build_search_index(document.outline)
+                if current is document:
+                    with self._lock:
+                        if self._documents.get(path) is document:
+                            self._indexes[path] = index
+                            self._documents.move_to_end(path)
+                            self._resize(path, document)
+                            self._evict()
+            return index
+
+    def changes_since(self, path: str, content_hash: str) -> Optional[OutlineChanges]:
+        """
+        Secciones afectadas por el último cambio, si se parte de la versión indicada.
+
+        Args:
+            path (str): Ruta al archivo Markdown
+            content_hash (str): Hash de la versión que la sesión mostró antes
+
+        Returns:
+            Optional[OutlineChanges]: Cambios, o None si la sesión venía de otra versión
+        """
+        revision = self._revisions.get(os.path.abspath(path))
+        if revision is None or revision.previous_hash != content_hash:
+            return None
+        return revision.changes
+
+    def forget(self, path: str):
+        """Descarta un documento (p. ej. porque se eliminó)."""
+        path = os.path.abspath(path)
+        with self._lock:
+            self._documents.pop(path, None)
+            self._drop(path)
+
+    @property
+    def size(self) -> int:
+        """Bytes aproximados ocupados por los documentos y sus índices."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.abspath(path) in self._documents
+
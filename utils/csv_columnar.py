@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché columnar de los CSV de datos - Tienda Aurelion
+
+Convierte cada CSV en un archivo Arrow IPC (Feather v2, sin compresión)
+con columnas tipadas: números, fechas y textos. Las columnas de texto con
+muchos valores repetidos (categoría, ciudad, medio de pago...) se guardan
+con codificación de diccionario, que en pandas llegan como Categorical.
+
+El archivo se abre con memory-map, así que leer unas pocas columnas solo
+toca las páginas de esas columnas y no vuelve a parsear texto. Cada
+archivo guarda en sus metadatos la huella del CSV de origen (tamaño, mtime
+y hash del inicio y del final) y solo se reconstruye cuando el CSV cambia.
+
+Requiere pyarrow; sin él las funciones devuelven None y quien llama
+vuelve a leer el CSV con pandas.
+"""
+
+import json
+import os
+import tempfile
+from typing import List, Optional
+
+from parse_cache import hash_bytes
+from utils import ENCODING_SAMPLE_SIZE, detect_encoding, discover_csv_files, get_project_paths
+from csv_profile import _quick_fingerprint
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+COLUMNAR_FORMAT_VERSION = 1
+# Una columna de texto se codifica con diccionario si tiene a lo sumo esta fracción de valores distintos
+DICTIONARY_MAX_RATIO = 0.5
+_METADATA_KEY = b'aurelion.source'
+
+
+def _default_cache_dir() -> str:
+    base_dir, _, _, _ = get_project_paths()
+    return os.path.join(base_dir, '.cache', 'columnar')
+
+
+def columnar_path(csv_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Ruta del archivo columnar de un CSV.
+
+    Args:
+        csv_path (str): Ruta al archivo CSV
+        cache_dir (Optional[str]): Carpeta de la caché (por defecto <proyecto>/.cache/columnar)
+
+    Returns:
+        str: Ruta del archivo .arrow (exista o no)
+    """
+    csv_path = os.path.abspath(csv_path)
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    # El hash de la ruta evita choques entre CSVs con el mismo nombre en distintas carpetas
+    suffix = hash_bytes(csv_path.encode('utf-8', 'surrogatepass')).hex()[:12]
+    return os.path.join(cache_dir or _default_cache_dir(), f"{name}-{suffix}.arrow")
+
+
+def _open_reader(path: str):
+    """Abre un archivo columnar con memory-map; None si no existe o está dañado."""
+    try:
+        return pa_ipc.open_file(pa.memory_map(path, 'r'))
+    except (IOError, OSError, pa.ArrowInvalid):
+        return None
+
+
+def _is_fresh(reader, csv_path: str) -> bool:
+    """Indica si el archivo columnar corresponde a la versión actual del CSV."""
+    metadata = reader.schema.metadata or {}
+    try:
+        stored = json.loads(metadata.get(_METADATA_KEY, b'{}'))
+    except ValueError:
+        return False
+    return (stored.get('version') == COLUMNAR_FORMAT_VERSION
+            and stored.get('fingerprint') == _quick_fingerprint(csv_path))
+
+
+def _encode_strings(table):
+    """Codifica con diccionario las columnas de texto con pocos valores distintos."""
+    columns = []
+    for column in table.columns:
+        if pa.types.is_string(column.type) and len(column):
+            distinct = pc.count_distinct(column).as_py()
+            if distinct <= len(column) * DICTIONARY_MAX_RATIO:
+                column = column.dictionary_encode()
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+
+def build_columnar_cache(csv_path: str, cache_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Convierte un CSV a su archivo columnar (siempre, aunque ya exista uno vigente).
+
+    La escritura es atómica: quien tenga abierta la versión anterior con
+    memory-map la sigue leyendo sin problemas.
+
+    Args:
+        csv_path (str): Ruta al archivo CSV
+        cache_dir (Optional[str]): Carpeta de la caché
+
+    Returns:
+        Optional[str]: Ruta del archivo columnar, o None si falta pyarrow o el CSV no se pudo leer
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+
+    fingerprint = _quick_fingerprint(csv_path)
+    if fingerprint is None:
+        return None
+    try:
+        with open(csv_path, 'rb') as f:
+            encoding = detect_encoding(f.read(ENCODING_SAMPLE_SIZE))
+        table = pa_csv.read_csv(csv_path, read_options=pa_csv.ReadOptions(encoding=encoding))
+    except (IOError, OSError, pa.ArrowInvalid, LookupError):
+        return None
+    if fingerprint != _quick_fingerprint(csv_path):
+        # El CSV cambió mientras se leía: la próxima lectura lo vuelve a intentar
+        return None
+
+    table = _encode_strings(table)
+    source = json.dumps({'version': COLUMNAR_FORMAT_VERSION, 'fingerprint': fingerprint,
+                         'encoding': encoding})
+    table = table.replace_schema_metadata({_METADATA_KEY: source.encode('utf-8')})
+
+    path = columnar_path(csv_path, cache_dir)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as sink:
+                options = pa_ipc.IpcWriteOptions(unify_dictionaries=True)
+                with pa_ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    except (IOError, OSError, pa.ArrowInvalid):
+        return None
+    return path
+
+
+def open_columnar(csv_path: str, columns: Optional[List[str]] = None, build: bool = True,
+                  cache_dir: Optional[str] = None):
+    """
+    Tabla Arrow de un CSV leída desde su caché columnar con memory-map.
+
+    Args:
+        csv_path (str): Ruta al archivo CSV
+        columns (Optional[List[str]]): Columnas a leer (por defecto todas)
+        build (bool): Si es True, convierte el CSV cuando no hay caché vigente
+        cache_dir (Optional[str]): Carpeta de la caché
+
+    Returns:
+        Optional[pyarrow.Table]: Tabla (sus datos apuntan al archivo mapeado), o None si
+        falta pyarrow, no hay caché vigente y no se pidió construirla, o el CSV no se pudo leer
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+
+    path = columnar_path(csv_path, cache_dir)
+    reader = _open_reader(path)
+    if reader is None or not _is_fresh(reader, csv_path):
+        if not build or build_columnar_cache(csv_path, cache_dir) is None:
+            return None
+        reader = _open_reader(path)
+        if reader is None:
+            return None
+
+    if columns is not None:
+        missing = [name for name in columns if name not in reader.schema.names]
+        if missing:
+            return None
+    table = reader.read_all()
+    # Proyección: las columnas que no se piden nunca se tocan en el archivo mapeado
+    return table.select(columns) if columns is not None else table
+
+
+def read_csv_frame(csv_path: str, columns: Optional[List[str]] = None, nrows: Optional[int] = None,
+                   build: bool = True):
+    """
+    DataFrame de pandas de un CSV, desde la caché columnar si es posible.
+
+    Las columnas con diccionario llegan como Categorical y las fechas como
+    datetime64. Sin pyarrow (o sin
+    caché vigente y build=False) se lee el CSV con pandas.
+
+    Args:
+        csv_path (str): Ruta al archivo CSV
+        columns (Optional[List[str]]): Columnas a leer (por defecto todas)
+        nrows (Optional[int]): Cantidad máxima de filas desde el inicio
+        build (bool): Si es True, convierte el CSV cuando no hay caché vigente
+
+    Returns:
+        DataFrame: Datos pedidos
+    """
+    table = open_columnar(csv_path, columns, build=build)
+    if table is not None:
+        if nrows is not None:
+            table = table.slice(0, nrows)
+        return table.to_pandas(date_as_object=False)
+
+    import pandas as pd
+    return pd.read_csv(csv_path, usecols=columns, nrows=nrows)
+
+
+def refresh_columnar_caches(data_dir: Optional[str] = None) -> List[str]:
+    """
+    Convierte los CSV de una carpeta cuya caché columnar falte o esté desactualizada.
+
+    Args:
+        data_dir (Optional[str]): Carpeta con los CSV (por defecto data/ del proyecto)
+
+    Returns:
+        List[str]: CSVs que se convirtieron
+    """
+    if not PYARROW_AVAILABLE:
+        return []
+    if data_dir is None:
+        _, data_dir, _, _ = get_project_paths()
+
+    converted = []
+    for csv_path in discover_csv_files(data_dir):
+        reader = _open_reader(columnar_path(csv_path))
+        if reader is not None and _is_fresh(reader, csv_path):
+            continue
+        if build_columnar_cache(csv_path) is not None:
+            converted.append(csv_path)
+    return converted
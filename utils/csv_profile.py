@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil completo de archivos CSV en memoria acotada - Tienda Aurelion
+
+Recorre el archivo por bloques de filas (pandas con chunksize) y, por
+columna, acumula: cantidad exacta de filas y de nulos, mínimo, máximo y
+media, valores distintos y valores más frecuentes. Nunca se tiene en
+memoria más de un bloque:
+
+- Valores distintos y más frecuentes: conteo exacto por valor mientras la
+  columna tenga hasta 50 000 valores distintos.
+- Con más valores distintos se pasa a resúmenes de tamaño fijo:
+  HyperLogLog (16384 registros de un byte, error típico ~0.8 %) para los
+  distintos y Misra-Gries para los más frecuentes (cada conteo es entonces
+  una cota inferior del real).
+
+El resultado se guarda junto al CSV en un archivo oculto
+(.<nombre>.profile.json) con la huella del archivo, así que la próxima
+vez se lee al instante. Requiere pandas y numpy; sin ellos no hay perfil.
+"""
+
+import json
+import math
+import os
+import tempfile
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from parse_cache import hash_bytes
+from utils import detect_encoding
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+
+PROFILE_FORMAT_VERSION = 1
+PROFILE_CHUNK_ROWS = 200_000
+HLL_PRECISION = 14
+# Hasta esta cantidad de valores distintos se cuentan de forma exacta
+EXACT_DISTINCT_LIMIT = 50_000
+TOP_K = 5
+_TOP_CAPACITY = 100
+# Bytes del inicio y del final que entran en la huella rápida del archivo
+_SAMPLE_BYTES = 64 * 1024
+
+
+class ColumnProfile(NamedTuple):
+    """Resumen de una columna de un CSV."""
+    name: str
+    kind: str                      # 'numérico' o 'texto'
+    nulls: int
+    distinct: int
+    distinct_exact: bool           # False si distinct y top son estimaciones
+    minimum: Any
+    maximum: Any
+    mean: Optional[float]          # Solo en columnas numéricas
+    top: List[Tuple[Any, int]]     # (valor, apariciones), de mayor a menor; cotas inferiores si no es exacto
+
+
+class CsvProfile(NamedTuple):
+    """Perfil de un archivo CSV completo."""
+    path: str
+    rows: int
+    columns: List[ColumnProfile]
+    encoding: str
+    from_cache: bool
+
+
+class HyperLogLog:
+    """
+    Estimador de cardinalidad HyperLogLog sobre hashes de 64 bits.
+
+    Args:
+        precision (int): Bits del hash que eligen el registro (2**precision registros)
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        """Agrega un array de hashes uint64."""
+        if not len(hashes):
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Los 32 bits siguientes alcanzan para contar ceros iniciales (y entran exactos en un float)
+        rest = ((hashes << np.uint64(self.precision)) >> np.uint64(32)).astype(np.float64)
+        with np.errstate(divide='ignore'):
+            rank = np.where(rest > 0, 32 - np.floor(np.log2(rest)), 33).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def count(self) -> int:
+        """Estimación de la cantidad de valores distintos."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Rango chico: conteo lineal de registros vacíos
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def _merge_top(counters: Dict[Any, int], capacity: int) -> Dict[Any, int]:
+    """Recorta un resumen Misra-Gries a `capacity` contadores."""
+    if len(counters) <= capacity:
+        return counters
+    threshold = sorted(counters.values(), reverse=True)[capacity]
+    return {value: count - threshold for value, count in counters.items() if count > threshold}
+
+
+def _to_python(value):
+    """Convierte escalares de numpy/pandas a tipos que se pueden guardar en JSON."""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class _ColumnAccumulator:
+    """Estadísticas de una columna acumuladas bloque a bloque."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.numeric = True
+        self.integral = True  # Números sin decimales (un bloque con nulos los trae como float)
+        self.nulls = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        # Conteo exacto por valor mientras haya pocos distintos; después, HyperLogLog + Misra-Gries
+        self.counts = pd.Series(dtype='int64')
+        self.hll: Optional[HyperLogLog] = None
+        self.top: Dict[Any, int] = {}
+
+    def update(self, series):
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if not len(values):
+            return
+        self.count += len(values)
+
+        if self.numeric and not pd.api.types.is_numeric_dtype(values.dtype):
+            # Aparecieron valores no numéricos: la columna pasa a ser de texto
+            self.numeric = False
+            self.minimum = self.maximum = None
+            if self.counts is not None:
+                self.counts.index = self.counts.index.map(str)
+                # Mín/máx como texto de los valores ya vistos (sin conteo exacto no se pueden recuperar)
+                if len(self.counts):
+                    self.minimum, self.maximum = self.counts.index.min(), self.counts.index.max()
+        if self.numeric:
+            if self.integral and not pd.api.types.is_integer_dtype(values.dtype):
+                self.integral = bool((values % 1 == 0).all())
+            self.total += float(values.sum())
+            low, high = _to_python(values.min()), _to_python(values.max())
+        else:
+            values = values.astype(str)
+            low, high = values.min(), values.max()
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+        chunk_counts = values.value_counts()
+        if self.counts is not None:
+            self.counts = self.counts.add(chunk_counts, fill_value=0).astype('int64')
+            if len(self.counts) <= EXACT_DISTINCT_LIMIT:
+                return
+            # Demasiados valores distintos: se pasa a los resúmenes de tamaño fijo
+            self.hll = HyperLogLog()
+            self.hll.add_hashes(self._hashes(self.counts.index.to_series()))
+            chunk_counts, self.counts = self.counts.sort_values(ascending=False), None
+        else:
+            self.hll.add_hashes(self._hashes(values))
+
+        # Resumen del bloque (los _TOP_CAPACITY + 1 más frecuentes) combinado con el acumulado
+        for value, count in chunk_counts.head(_TOP_CAPACITY + 1).items():
+            value = _to_python(value)
+            self.top[value] = self.top.get(value, 0) + int(count)
+        self.top = _merge_top(self.top, _TOP_CAPACITY)
+
+    def _hashes(self, values):
+        """Hashes uint64 de los valores; los números se unifican a float para que 5 y 5.0 coincidan."""
+        if self.numeric:
+            values = values.astype('float64')
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+    def _display(self, value):
+        return int(value) if self.numeric and self.integral and isinstance(value, float) else value
+
+    def result(self) -> ColumnProfile:
+        if self.counts is not None:
+            distinct, exact = len(self.counts), True
+            top = [(_to_python(value), int(count)) for value, count in self.counts.items()]
+        else:
+            distinct, exact = self.hll.count(), False
+            top = list(self.top.items())
+        top = sorted(top, key=lambda item: (-item[1], str(item[0])))[:TOP_K]
+        numeric = self.numeric and self.count > 0
+        return ColumnProfile(
+            self.name, 'numérico' if numeric else 'texto', self.nulls, distinct, exact,
+            self._display(self.minimum), self._display(self.maximum),
+            self.total / self.count if numeric else None,
+            [(self._display(value), count) for value, count in top]
+        )
+
+
+def _sidecar_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.profile.json")
+
+
+def _quick_fingerprint(path: str) -> Optional[Dict[str, Any]]:
+    """Huella barata de un archivo grande: tamaño, mtime y hash del inicio y del final."""
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            head = f.read(_SAMPLE_BYTES)
+            if st.st_size > 2 * _SAMPLE_BYTES:
+                f.seek(-_SAMPLE_BYTES, os.SEEK_END)
+            tail = f.read(_SAMPLE_BYTES)
+    except (IOError, OSError):
+        return None
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sample': hash_bytes(head + tail).hex()}
+
+
+def load_csv_profile(path: str) -> Optional[CsvProfile]:
+    """
+    Lee el perfil guardado junto al CSV, si corresponde a la versión actual del archivo.
+
+    Args:
+        path (str): Ruta al archivo CSV
+
+    Returns:
+        Optional[CsvProfile]: Perfil guardado, o None si no hay o quedó desactualizado
+    """
+    try:
+        with open(_sidecar_path(path), encoding='utf-8') as f:
+            stored = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if stored.get('version') != PROFILE_FORMAT_VERSION or stored.get('fingerprint') != _quick_fingerprint(path):
+        return None
+
+    profile = stored['profile']
+    columns = [
+        ColumnProfile(**dict(column, top=[tuple(item) for item in column['top']]))
+        for column in profile['columns']
+    ]
+    return CsvProfile(path, profile['rows'], columns, profile['encoding'], True)
+
+
+def _save_csv_profile(profile: CsvProfile, fingerprint: Dict[str, Any]):
+    """Guarda el perfil junto al CSV de forma atómica; si no se puede escribir, se omite."""
+    sidecar = _sidecar_path(profile.path)
+    data = {
+        'version': PROFILE_FORMAT_VERSION,
+        'fingerprint': fingerprint,
+        'profile': {
+            'rows': profile.rows,
+            'encoding': profile.encoding,
+            'columns': [column._asdict() for column in profile.columns],
+        },
+    }
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(sidecar), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, sidecar)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    except (IOError, OSError, TypeError, ValueError):
+        return
+
+
+def profile_csv(path: str, chunk_rows: int = PROFILE_CHUNK_ROWS,
+                progress: Optional[Callable[[float], None]] = None) -> Optional[CsvProfile]:
+    """
+    Recorre un CSV completo por bloques y calcula el perfil de cada columna.
+
+    Args:
+        path (str): Ruta al archivo CSV
+        chunk_rows (int): Filas por bloque (acota la memoria usada)
+        progress (Optional[Callable[[float], None]]): Recibe la fracción leída (0 a 1)
+
+    Returns:
+        Optional[CsvProfile]: Perfil, o None si falta pandas o no se pudo leer el archivo
+    """
+    if not PANDAS_AVAILABLE:
+        return None
+
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            encoding = detect_encoding(f.read(_SAMPLE_BYTES))
+            f.seek(0)
+            columns: Dict[str, _ColumnAccumulator] = {}
+            rows = 0
+            for chunk in pd.read_csv(f, chunksize=chunk_rows, encoding=encoding):
+                rows += len(chunk)
+                for name in chunk.columns:
+                    accumulator = columns.get(name)
+                    if accumulator is None:
+                        accumulator = columns[name] = _ColumnAccumulator(str(name))
+                    accumulator.update(chunk[name])
+                if progress is not None and size:
+                    progress(min(f.tell() / size, 1.0))
+    except (IOError, OSError, ValueError, UnicodeDecodeError, pd.errors.ParserError):
+        return None
+
+    return CsvProfile(path, rows, [column.result() for column in columns.values()], encoding, False)
+
+
+def get_csv_profile(path: str, refresh: bool = False,
+                    progress: Optional[Callable[[float], None]] = None) -> Optional[CsvProfile]:
+    """
+    Devuelve el perfil de un CSV: el guardado si sigue vigente o uno nuevo.
+
+    Args:
+        path (str): Ruta al archivo CSV
+        refresh (bool): Si es True, siempre recorre el archivo
+        progress (Optional[Callable[[float], None]]): Recibe la fracción leída (0 a 1)
+
+    Returns:
+        Optional[CsvProfile]: Perfil, o None si no se pudo calcular
+    """
+    if not refresh:
+        profile = load_csv_profile(path)
+        if profile is not None:
+            return profile
+
+    fingerprint = _quick_fingerprint(path)
+    profile = profile_csv(path, progress=progress)
+    # Si el archivo cambió mientras se leía, no se guarda un perfil mezclado
+    if profile is not None and fingerprint is not None and fingerprint == _quick_fingerprint(path):
+        _save_csv_profile(profile, fingerprint)
+    return profile
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de filas por desplazamiento en bytes para CSV grandes - Tienda Aurelion
+
+Una sola pasada por el archivo (por bloques, con numpy) registra dónde
+empieza cada fila número 0, 1024, 2048... Con eso:
+
+- La cantidad de filas se conoce sin volver a leer el archivo.
+- Para mostrar la fila 5.000.000 se salta directo al inicio de su grupo
+  y se leen a lo sumo 1023 filas de más.
+
+Los saltos de línea dentro de campos entre comillas no cuentan como fin
+de fila. El índice se guarda junto al CSV (.<nombre>.rows.idx) con la
+huella del archivo y se reconstruye cuando el CSV cambia. Requiere numpy
+(y pandas para leer páginas).
+"""
+
+import json
+import os
+import tempfile
+from typing import Callable, List, NamedTuple, Optional
+
+from utils import ENCODING_SAMPLE_SIZE, detect_encoding
+from csv_profile import _quick_fingerprint
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+ROW_INDEX_FORMAT_VERSION = 1
+ROW_INDEX_STRIDE = 1024
+_SCAN_BLOCK_BYTES = 4 * 1024 * 1024
+_NEWLINE = 10
+_QUOTE = 34
+
+
+class RowIndex(NamedTuple):
+    """Índice disperso de filas de un CSV."""
+    path: str
+    rows: int            # Filas de datos (sin el encabezado)
+    stride: int          # Cada cuántas filas se guarda un desplazamiento
+    offsets: 'np.ndarray'  # offsets[k] = byte donde empieza la fila de datos k * stride
+
+
+def _index_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.rows.idx")
+
+
+def _scan_offsets(f, size: int, stride: int,
+                  progress: Optional[Callable[[float], None]] = None) -> RowIndex:
+    """Recorre el archivo abierto y arma el índice (el encabezado es la línea 0)."""
+    parts: List['np.ndarray'] = []
+    lines_ended = 0     # Líneas terminadas hasta ahora
+    in_quotes = 0       # 1 si el bloque anterior terminó dentro de un campo entre comillas
+    position = 0
+    last_byte = _NEWLINE
+    while True:
+        block = f.read(_SCAN_BLOCK_BYTES)
+        if not block:
+            break
+        data = np.frombuffer(block, dtype=np.uint8)
+        newlines = np.flatnonzero(data == _NEWLINE)
+        if in_quotes or _QUOTE in data:
+            quotes = np.cumsum(data == _QUOTE, dtype=np.int64)
+            newlines = newlines[((quotes[newlines] + in_quotes) & 1) == 0]
+            in_quotes = int(quotes[-1] + in_quotes) & 1
+
+        # Cada fin de línea abre la línea siguiente: la línea l es la fila de datos l - 1
+        line_numbers = lines_ended + 1 + np.arange(len(newlines), dtype=np.int64)
+        selected = (line_numbers - 1) % stride == 0
+        parts.append(newlines[selected].astype(np.uint64) + np.uint64(position + 1))
+
+        lines_ended += len(newlines)
+        position += len(block)
+        last_byte = block[-1]
+        if progress is not None and size:
+            progress(min(position / size, 1.0))
+
+    offsets = np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+    # Una última línea sin salto final también es una fila
+    lines = lines_ended + (0 if last_byte == _NEWLINE else 1)
+    rows = max(lines - 1, 0)
+    return RowIndex(os.path.abspath(f.name), rows, stride, offsets[:(rows + stride - 1) // stride])
+
+
+def build_row_index(path: str, stride: int = ROW_INDEX_STRIDE,
+                    progress: Optional[Callable[[float], None]] = None) -> Optional[RowIndex]:
+    """
+    Recorre un CSV una vez y arma su índice de filas (sin guardarlo).
+
+    Args:
+        path (str): Ruta al archivo CSV
+        stride (int): Cada cuántas filas se guarda un desplazamiento
+        progress (Optional[Callable[[float], None]]): Recibe la fracción leída (0 a 1)
+
+    Returns:
+        Optional[RowIndex]: Índice, o None si falta numpy o el archivo no se pudo leer
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            return _scan_offsets(f, size, stride, progress)
+    except (IOError, OSError):
+        return None
+
+
+def load_row_index(path: str) -> Optional[RowIndex]:
+    """
+    Lee el índice guardado junto al CSV, si corresponde a la versión actual del archivo.
+
+    Args:
+        path (str): Ruta al archivo CSV
+
+    Returns:
+        Optional[RowIndex]: Índice guardado, o None si no hay o quedó desactualizado
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    try:
+        with open(_index_path(path), 'rb') as f:
+            header = json.loads(f.readline())
+            offsets = np.frombuffer(f.read(), dtype='<u8')
+    except (IOError, OSError, ValueError):
+        return None
+    if (header.get('version') != ROW_INDEX_FORMAT_VERSION
+            or header.get('fingerprint') != _quick_fingerprint(path)
+            or len(offsets) != (header['rows'] + header['stride'] - 1) // header['stride']):
+        return None
+    return RowIndex(os.path.abspath(path), header['rows'], header['stride'], offsets.astype(np.uint64))
+
+
+def _save_row_index(index: RowIndex, fingerprint: dict):
+    """Guarda el índice junto al CSV de forma atómica; si no se puede escribir, se omite."""
+    target = _index_path(index.path)
+    header = {'version': ROW_INDEX_FORMAT_VERSION, 'fingerprint': fingerprint,
+              'rows': index.rows, 'stride': index.stride}
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(index.offsets.astype('<u8').tobytes())
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    except (IOError, OSError):
+        return
+
+
+def get_row_index(path: str, progress: Optional[Callable[[float], None]] = None) -> Optional[RowIndex]:
+    """
+    Devuelve el índice de filas de un CSV: el guardado si sigue vigente o uno nuevo.
+
+    Args:
+        path (str): Ruta al archivo CSV
+        progress (Optional[Callable[[float], None]]): Recibe la fracción leída (0 a 1)
+
+    Returns:
+        Optional[RowIndex]: Índice, o None si no se pudo construir
+    """
+    index = load_row_index(path)
+    if index is not None:
+        return index
+
+    fingerprint = _quick_fingerprint(path)
+    index = build_row_index(path, progress=progress)
+    # Si el archivo cambió mientras se leía, no se guarda un índice mezclado
+    if index is not None and fingerprint is not None and fingerprint == _quick_fingerprint(path):
+        _save_row_index(index, fingerprint)
+    return index
+
+
+def count_rows(path: str) -> Optional[int]:
+    """
+    Cantidad de filas de datos de un CSV (sin el encabezado), usando el índice.
+
+    Args:
+        path (str): Ruta al archivo CSV
+
+    Returns:
+        Optional[int]: Cantidad de filas, o None si no se pudo calcular
+    """
+    index = get_row_index(path)
+    return index.rows if index is not None else None
+
+
+def read_rows(index: RowIndex, start: int, count: int):
+    """
+    Lee las filas [start, start + count) saltando directo a su grupo en el archivo.
+
+    Args:
+        index (RowIndex): Índice devuelto por get_row_index()
+        start (int): Primera fila de datos (desde 0)
+        count (int): Cantidad de filas
+
+    Returns:
+        DataFrame: Filas pedidas, con los nombres de columna del encabezado
+    """
+    import pandas as pd
+
+    start = max(0, min(start, index.rows))
+    count = max(0, min(count, index.rows - start))
+    with open(index.path, 'rb') as f:
+        encoding = detect_encoding(f.read(ENCODING_SAMPLE_SIZE))
+        f.seek(0)
+        columns = pd.read_csv(f, nrows=0, encoding=encoding).columns
+        if not count:
+            return pd.DataFrame(columns=columns)
+        f.seek(int(index.offsets[start // index.stride]))
+        frame = pd.read_csv(f, header=None, names=columns, encoding=encoding,
+                            skiprows=start % index.stride, nrows=count)
+    # Numeración de filas del archivo completo
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
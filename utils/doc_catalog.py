@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catálogo de búsqueda sobre todos los documentos de docs/ - Tienda Aurelion
+
+Guarda cada sección de cada archivo Markdown en una tabla SQLite FTS5
+persistente (.cache/catalog.sqlite3). El catálogo se actualiza de forma
+incremental: solo se vuelven a indexar los archivos cuya huella
+(tamaño, mtime y hash del contenido) cambió.
+
+Las búsquedas devuelven resultados ordenados por relevancia (BM25) de
+todos los documentos, con el archivo, la sección y un fragmento resaltado.
+"""
+
+import contextlib
+import os
+import sqlite3
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from search_index import parse_query
+from utils import load_document
+
+
+CATALOG_SCHEMA_VERSION = 1
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        content_hash TEXT NOT NULL,
+        title TEXT NOT NULL
+    )''',
+    # remove_diacritics: "seccion" encuentra "sección", igual que el índice en memoria
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+        path UNINDEXED,
+        section,
+        body,
+        tokenize = "unicode61 remove_diacritics 2",
+        prefix = '2 3'
+    )''',
+)
+
+
+class CatalogHit(NamedTuple):
+    """Resultado de búsqueda en el catálogo."""
+    path: str
+    title: str      # Título principal del documento
+    section: str
+    snippet: str
+    score: float    # Menor es mejor (convención de bm25() en SQLite)
+
+
+def to_fts_query(query: str) -> str:
+    """
+    Traduce una consulta de usuario a sintaxis FTS5 segura.
+
+    Acepta la misma sintaxis que el índice en memoria: palabras (todas
+    requeridas), "frases exactas" y prefijos*.
+
+    Args:
+        query (str): Texto escrito por el usuario
+
+    Returns:
+        str: Consulta FTS5, o string vacío si no hay palabras
+    """
+    parsed = parse_query(query)
+    parts = [f'"{term}"' for term in parsed.terms]
+    parts.extend(f'"{prefix}"*' for prefix in parsed.prefixes)
+    parts.extend('"' + ' '.join(phrase) + '"' for phrase in parsed.phrases)
+    return ' '.join(parts)
+
+
+class DocumentCatalog:
+    """
+    Catálogo FTS5 persistente de las secciones de muchos documentos.
+
+    Cada operación abre su propia conexión, así que el mismo objeto se
+    puede usar desde varios hilos (sesiones de Streamlit).
+
+    Args:
+        db_path (Optional[str]): Archivo SQLite (por defecto <proyecto>/.cache/catalog.sqlite3)
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            db_path = os.path.join(base_dir, '.cache', 'catalog.sqlite3')
+        self.db_path = db_path
+        self.available = True
+        self._ensure_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _ensure_schema(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            with contextlib.closing(self._connect()) as conn, conn:
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                if version != CATALOG_SCHEMA_VERSION:
+                    conn.execute('DROP TABLE IF EXISTS files')
+                    conn.execute('DROP TABLE IF EXISTS sections')
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {CATALOG_SCHEMA_VERSION}')
+        except (sqlite3.Error, OSError):
+            # SQLite sin FTS5 o carpeta no escribible: la búsqueda global se desactiva
+            self.available = False
+
+    def update(self, paths: Iterable[str]) -> Tuple[int, int]:
+        """
+        Sincroniza el catálogo con una lista de archivos.
+
+        Solo se reindexan los archivos nuevos o cuya huella cambió; los que
+        ya no están en la lista se eliminan del catálogo.
+
+        Args:
+            paths (Iterable[str]): Archivos Markdown a catalogar
+
+        Returns:
+            Tuple[int, int]: (archivos reindexados, archivos eliminados)
+        """
+        if not self.available:
+            return 0, 0
+
+        paths = [os.path.abspath(path) for path in paths]
+        reindexed = 0
+        try:
+            with contextlib.closing(self._connect()) as conn, conn:
+                known = {
+                    row[0]: row[1:]
+                    for row in conn.execute('SELECT path, size, mtime_ns, content_hash FROM files')
+                }
+
+                for path in paths:
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    stored = known.get(path)
+                    if stored and stored[0] == st.st_size and stored[1] == st.st_mtime_ns:
+                        continue  # Sin cambios: ni siquiera se lee el archivo
+
+                    document = load_document(path)
+                    if document is None:
+                        continue
+                    if stored and stored[2] == document.content_hash:
+                        # Mismo contenido (p. ej. un 'touch'): solo se actualiza la huella
+                        conn.execute('UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?',
+                                     (st.st_size, st.st_mtime_ns, path))
+                        continue
+
+                    conn.execute('DELETE FROM sections WHERE path = ?', (path,))
+                    conn.executemany(
+                        'INSERT INTO sections (path, section, body) VALUES (?, ?, ?)',
+                        ((path, name, body) for name, body in document.outline.sections().items())
+                    )
+                    conn.execute(
+                        'INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash, title) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (path, st.st_size, st.st_mtime_ns, document.content_hash, document.outline.title)
+                    )
+                    reindexed += 1
+
+                current = set(paths)
+                removed = [path for path in known if path not in current]
+                for path in removed:
+                    conn.execute('DELETE FROM sections WHERE path = ?', (path,))
+                    conn.execute('DELETE FROM files WHERE path = ?', (path,))
+        except sqlite3.Error:
+            return reindexed, 0
+
+        return reindexed, len(removed)
+
+    def search(self, query: str, limit: int = 30,
+               highlight: Tuple[str, str] = ('**', '**')) -> List[CatalogHit]:
+        """
+        Busca en todas las secciones de todos los documentos catalogados.
+
+        Args:
+            query (str): Palabras, "frases exactas" y/o prefijos*
+            limit (int): Cantidad máxima de resultados
+            highlight (Tuple[str, str]): Marcas para resaltar las coincidencias
+
+        Returns:
+            List[CatalogHit]: Resultados ordenados por relevancia
+        """
+        fts_query = to_fts_query(query)
+        if not self.available or not fts_query:
+            return []
+
+        opening, closing = highlight
+        try:
+            with contextlib.closing(self._connect()) as conn, conn:
+                rows = conn.execute(
+                    '''SELECT sections.path, files.title, sections.section,
+                              snippet(sections, 2, ?, ?, '…', 24),
+                              bm25(sections, 0.0, 5.0, 1.0) AS score
+                       FROM sections JOIN files ON files.path = sections.path
+                       WHERE sections MATCH ?
+                       ORDER BY score
+                       LIMIT ?''',
+                    (opening, closing, fts_query, limit)
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+
+        return [CatalogHit(path, title, section, snippet.replace('\n', ' '), score)
+                for path, title, section, snippet, score in rows]
+
+
+_default_catalog: Optional[DocumentCatalog] = None
+
+
+def get_default_catalog() -> DocumentCatalog:
+    """Devuelve el catálogo compartido del proyecto (se crea al primer uso)."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = DocumentCatalog()
+    return _default_catalog
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vigilancia de la carpeta docs/ para recargar documentos editados - Tienda Aurelion
+
+Un hilo en segundo plano compara periódicamente el tamaño y el mtime de
+cada archivo Markdown y avisa qué archivos se crearon, modificaron o
+eliminaron. Si está instalado watchdog (inotify, FSEvents...), sus eventos
+despiertan al hilo enseguida; si no, se usa solo el sondeo con la
+biblioteca estándar.
+
+Cada interfaz decide qué hacer con el aviso; lo habitual es llamar a
+reload_document (utils.py), que vuelve a parsear solo las secciones
+modificadas.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from file_discovery import MARKDOWN_PATTERNS, scan_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+DEFAULT_POLL_INTERVAL = 1.0  # segundos
+# Espera tras un evento para agrupar las escrituras sucesivas de un editor
+_SETTLE_DELAY = 0.1
+
+
+class FileChange(NamedTuple):
+    """Cambio detectado en un archivo vigilado."""
+    path: str
+    kind: str  # 'created', 'modified' o 'deleted'
+
+
+class DocumentWatcher:
+    """
+    Vigila los archivos de una carpeta (recursivamente) y notifica los cambios.
+
+    Args:
+        directory (str): Carpeta a vigilar
+        include (Iterable[str]): Globs de los archivos a vigilar
+        interval (float): Segundos entre sondeos
+    """
+
+    def __init__(self, directory: str, include: Iterable[str] = MARKDOWN_PATTERNS,
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        self.directory = os.path.abspath(directory)
+        self.include = tuple(include)
+        self.interval = interval
+        # Se incrementa con cada tanda de cambios; permite preguntar "¿cambió algo?" sin bloquear
+        self.version = 0
+        self._state = self._snapshot()
+        self._listeners: List[Callable[[List[FileChange]], None]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        for entry in scan_files(self.directory, self.include):
+            # El recorrido no detecta ediciones en el lugar: el stat de cada archivo sí
+            try:
+                st = os.stat(entry.path)
+            except OSError:
+                continue
+            state[entry.path] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def poll(self) -> List[FileChange]:
+        """
+        Compara el estado actual de la carpeta con el último conocido.
+
+        Returns:
+            List[FileChange]: Archivos creados, modificados o eliminados desde el último sondeo
+        """
+        current = self._snapshot()
+        with self._lock:
+            previous = self._state
+            self._state = current
+        changes = []
+        for path, signature in current.items():
+            old = previous.get(path)
+            if old is None:
+                changes.append(FileChange(path, 'created'))
+            elif old != signature:
+                changes.append(FileChange(path, 'modified'))
+        changes.extend(FileChange(path, 'deleted') for path in previous if path not in current)
+        if changes:
+            self.version += 1
+        return changes
+
+    def subscribe(self, callback: Callable[[List[FileChange]], None]) -> Callable[[], None]:
+        """
+        Registra una función que recibe cada tanda de cambios.
+
+        La función se llama desde el hilo del vigilante: las interfaces gráficas
+        deben pasar el aviso a su propio hilo (p. ej. con una cola).
+
+        Returns:
+            Callable[[], None]: Función para cancelar la suscripción
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._listeners:
+                    self._listeners.remove(callback)
+        return unsubscribe
+
+    def start(self):
+        """Inicia el hilo de vigilancia (y watchdog si está disponible)."""
+        if self._thread is not None:
+            return
+        if WATCHDOG_AVAILABLE:
+            try:
+                handler = FileSystemEventHandler()
+                handler.on_any_event = lambda event: self._wake.set()
+                self._observer = Observer()
+                self._observer.schedule(handler, self.directory, recursive=True)
+                self._observer.start()
+            except Exception:
+                # Sin soporte del sistema (p. ej. límite de inotify): queda el sondeo
+                self._observer = None
+        self._thread = threading.Thread(target=self._run, name="DocumentWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene la vigilancia."""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._wake.wait(self.interval):
+                self._wake.clear()
+                self._stop.wait(_SETTLE_DELAY)
+            if self._stop.is_set():
+                break
+            changes = self.poll()
+            if not changes:
+                continue
+            with self._lock:
+                listeners = list(self._listeners)
+            for callback in listeners:
+                try:
+                    callback(changes)
+                except Exception:
+                    # Un suscriptor con errores no debe detener la vigilancia
+                    continue
+
+
+_watchers: Dict[str, DocumentWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_docs_watcher(directory: str, interval: float = DEFAULT_POLL_INTERVAL) -> DocumentWatcher:
+    """
+    Devuelve el vigilante compartido de una carpeta, iniciándolo al primer uso.
+
+    Args:
+        directory (str): Carpeta a vigilar (p. ej. docs/)
+        interval (float): Segundos entre sondeos
+
+    Returns:
+        DocumentWatcher: Vigilante en marcha
+    """
+    key = os.path.abspath(directory)
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = _watchers[key] = DocumentWatcher(key, interval=interval)
+            watcher.start()
+    return watcher
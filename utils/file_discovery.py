@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Descubrimiento recursivo de archivos con caché por carpeta - Tienda Aurelion
+
+Recorre carpetas con os.scandir (una sola llamada al sistema por carpeta,
+sin os.path.isfile ni stat por cada entrada) y guarda una foto de cada
+carpeta: los nombres de sus archivos y de sus subcarpetas. La foto solo se
+vuelve a leer cuando cambia el mtime de la carpeta, es decir, cuando se
+crea, borra o renombra algo dentro de ella.
+
+La foto no guarda tamaños ni mtimes de los archivos: editar un archivo sin
+reemplazarlo no cambia el mtime de su carpeta, así que quedarían
+desactualizados. Quien necesite el estado actual de un archivo
+(p. ej. load_document o get_file_info) hace su propio stat.
+"""
+
+import fnmatch
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+MARKDOWN_PATTERNS = ('*.md', '*.markdown')
+CSV_PATTERNS = ('*.csv',)
+# Carpetas ocultas y de caché que nunca interesa recorrer
+DEFAULT_EXCLUDES = ('.*', '__pycache__', 'node_modules')
+
+# Si la carpeta cambió hace menos que esto al tomar la foto, un cambio
+# posterior podría quedar con el mismo mtime (resolución del sistema de archivos)
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+class FileEntry(NamedTuple):
+    """Archivo descubierto al recorrer una carpeta."""
+    path: str
+    name: str
+
+
+class _DirSnapshot(NamedTuple):
+    mtime_ns: int
+    racy: bool                 # Tomada justo después de un cambio: no es confiable
+    files: Tuple[FileEntry, ...]
+    subdirs: Tuple[str, ...]
+
+
+class _Patterns:
+    """Globs compilados una vez por recorrido; no distinguen mayúsculas."""
+
+    def __init__(self, patterns: Iterable[str]):
+        by_name, by_path = [], []
+        for pattern in patterns:
+            # Con '/' el glob se compara con la ruta relativa a la raíz
+            (by_path if '/' in pattern else by_name).append(fnmatch.translate(pattern.lower()))
+        self._name = re.compile('|'.join(by_name)).match if by_name else None
+        self._path = re.compile('|'.join(by_path)).match if by_path else None
+
+    def matches(self, name: str, relpath: str) -> bool:
+        if self._name is not None and self._name(name.lower()):
+            return True
+        return self._path is not None and self._path(relpath.lower()) is not None
+
+
+class DirectoryScanner:
+    """
+    Recorre árboles de carpetas y conserva una foto de cada carpeta.
+
+    Es seguro usarlo desde varios hilos (sesiones de Streamlit).
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, _DirSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def _snapshot(self, directory: str) -> Optional[_DirSnapshot]:
+        """Devuelve la foto de una carpeta, leyéndola de nuevo solo si cambió."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._snapshots.get(directory)
+        if cached is not None and cached.mtime_ns == mtime_ns and not cached.racy:
+            return cached
+
+        files, subdirs = [], []
+        scanned_at = time.time_ns()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        # Con el tipo que informa el sistema de archivos no hace falta un stat
+                        if entry.is_dir():
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            files.append(FileEntry(entry.path, entry.name))
+                    except OSError:
+                        continue  # Entrada borrada durante el recorrido o enlace roto
+        except (PermissionError, OSError):
+            return None
+
+        snapshot = _DirSnapshot(mtime_ns, scanned_at - mtime_ns < _RACY_WINDOW_NS,
+                                tuple(files), tuple(subdirs))
+        with self._lock:
+            if cached is not None:
+                for name in set(cached.subdirs).difference(subdirs):
+                    self._forget(os.path.join(directory, name))
+            self._snapshots[directory] = snapshot
+        return snapshot
+
+    def _forget(self, directory: str):
+        """Descarta la foto de una carpeta eliminada y la de sus subcarpetas (con el lock tomado)."""
+        snapshot = self._snapshots.pop(directory, None)
+        if snapshot is None:
+            return
+        for name in snapshot.subdirs:
+            self._forget(os.path.join(directory, name))
+
+    def scan(self, root: str, include: Iterable[str] = ('*',),
+             exclude: Iterable[str] = DEFAULT_EXCLUDES, recursive: bool = True) -> List[FileEntry]:
+        """
+        Lista los archivos de una carpeta (y sus subcarpetas) que cumplen los filtros.
+
+        Args:
+            root (str): Carpeta raíz
+            include (Iterable[str]): Globs que debe cumplir el archivo (p. ej. '*.md');
+                si contienen '/', se comparan con la ruta relativa a la raíz
+            exclude (Iterable[str]): Globs de archivos o carpetas a omitir
+            recursive (bool): Si se recorren las subcarpetas
+
+        Returns:
+            List[FileEntry]: Archivos encontrados, ordenados por ruta
+        """
+        include = _Patterns(include)
+        exclude = _Patterns(exclude)
+        root = os.path.abspath(root)
+        found: List[FileEntry] = []
+
+        pending = [(root, '')]
+        while pending:
+            directory, prefix = pending.pop()
+            snapshot = self._snapshot(directory)
+            if snapshot is None:
+                continue
+            for entry in snapshot.files:
+                relpath = prefix + entry.name
+                if include.matches(entry.name, relpath) and not exclude.matches(entry.name, relpath):
+                    found.append(entry)
+            if recursive:
+                for name in snapshot.subdirs:
+                    relpath = prefix + name
+                    if not exclude.matches(name, relpath):
+                        pending.append((os.path.join(directory, name), relpath + '/'))
+
+        found.sort(key=lambda entry: entry.path)
+        return found
+
+    def clear(self):
+        """Olvida todas las fotos guardadas."""
+        with self._lock:
+            self._snapshots.clear()
+
+
+_default_scanner: Optional[DirectoryScanner] = None
+
+
+def get_default_scanner() -> DirectoryScanner:
+    """Devuelve el recorredor compartido del proceso (se crea al primer uso)."""
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = DirectoryScanner()
+    return _default_scanner
+
+
+def scan_files(root: str, include: Iterable[str] = ('*',),
+               exclude: Iterable[str] = DEFAULT_EXCLUDES, recursive: bool = True) -> List[FileEntry]:
+    """Atajo de DirectoryScanner.scan sobre el recorredor compartido."""
+    return get_default_scanner().scan(root, include, exclude, recursive)
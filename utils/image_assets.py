@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de imágenes de cada documento y caché de variantes reducidas - Tienda Aurelion
+
+- AssetIndex: se arma una vez por documento y asocia cada referencia
+  ![alt](ruta) (fuera de bloques de código) con la ruta absoluta del
+  archivo. Las rutas relativas se resuelven contra la carpeta del
+  documento con os.path.normpath, así '../images/x.png' desde docs/ es
+  <proyecto>/images/x.png. Las URLs y las imágenes que no existen quedan
+  sin ruta. Las referencias que no estaban en el texto inicial (secciones
+  de documentos en streaming) se resuelven al pedirlas y se recuerdan.
+
+- ImageVariantCache: guarda en .cache/images copias reducidas de cada
+  imagen (anchos de IMAGE_VARIANT_WIDTHS, en WebP o PNG). El nombre de
+  cada variante incluye el mtime y el tamaño del original, así que editar
+  la imagen genera variantes nuevas y las viejas se borran. Streamlit y la
+  GUI envían o decodifican esos bytes chicos en lugar de redimensionar el
+  original en cada vista. Streamlit solo envía PNG, JPEG o GIF (cualquier
+  otro formato lo vuelve a codificar), así que para st.image se pide PNG.
+
+Requiere Pillow para las variantes; sin él se usa la imagen original.
+"""
+
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from markdown_outline import _STR_LINE_PATTERNS, _iter_headings
+from parse_cache import hash_bytes
+
+try:
+    from PIL import Image, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+IMAGE_CACHE_FORMAT_VERSION = 1
+# Anchos estándar: se usa el menor que cubra el ancho pedido. 730 es el ancho de
+# contenido de Streamlit y 1460 su máximo (el doble, para pantallas de alta densidad)
+IMAGE_VARIANT_WIDTHS = (320, 730, 1460)
+IMAGE_PATTERN = re.compile(r'!\[([^\]\n]*)\]\(([^)\n]+)\)')
+_REMOTE_PREFIXES = ('http://', 'https://', 'data:', '//')
+
+
+class ImageRef(NamedTuple):
+    """Una referencia a imagen del documento."""
+    alt: str
+    target: str           # Ruta tal como está escrita en el Markdown
+    path: Optional[str]   # Ruta absoluta del archivo, o None si es remota o no existe
+
+
+def find_images(content: str) -> List[Tuple[str, str]]:
+    """
+    Busca las imágenes Markdown de un texto, sin contar las de bloques de código.
+
+    Args:
+        content (str): Texto Markdown
+
+    Returns:
+        List[Tuple[str, str]]: (alt, ruta) de cada imagen, en orden de aparición
+    """
+    if '![' not in content:
+        return []
+    fences: List[Tuple[int, int]] = []
+    for _ in _iter_headings(content, _STR_LINE_PATTERNS, 0, fences):
+        pass
+    images = []
+    for match in IMAGE_PATTERN.finditer(content):
+        position = match.start()
+        if not any(start <= position < end for start, end in fences):
+            images.append((match.group(1), match.group(2).strip()))
+    return images
+
+
+def resolve_image_path(target: str, base_dirs: Tuple[str, ...]) -> Optional[str]:
+    """
+    Resuelve la ruta de una imagen contra las carpetas base, en orden.
+
+    Args:
+        target (str): Ruta escrita en el Markdown (puede tener un título: ruta "título")
+        base_dirs (Tuple[str, ...]): Carpetas contra las que se resuelven las rutas relativas
+
+    Returns:
+        Optional[str]: Ruta absoluta del archivo, o None si es remota o no existe
+    """
+    # ![alt](ruta "título") y ![alt](<ruta con espacios>)
+    path = target.split(' "')[0].strip().strip('<>')
+    if not path or path.lower().startswith(_REMOTE_PREFIXES):
+        return None
+    if os.path.isabs(path):
+        candidates = [path]
+    else:
+        candidates = [os.path.join(base_dir, path) for base_dir in base_dirs]
+    for candidate in candidates:
+        candidate = os.path.normpath(os.path.abspath(candidate))
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+class AssetIndex:
+    """
+    Imágenes de un documento con su ruta resuelta.
+
+    Es seguro usarlo desde varios hilos (sesiones de Streamlit).
+    """
+
+    def __init__(self, base_dirs: Tuple[str, ...], content: str = ""):
+        """
+        Args:
+            base_dirs (Tuple[str, ...]): Carpetas para resolver rutas relativas
+                (la del documento primero)
+            content (str): Texto del documento; sus imágenes se resuelven ahora
+        """
+        self.base_dirs = tuple(base_dirs)
+        self._refs: Dict[str, ImageRef] = {}
+        self._lock = threading.Lock()
+        for alt, target in find_images(content):
+            if target not in self._refs:
+                self._refs[target] = ImageRef(alt, target, resolve_image_path(target, self.base_dirs))
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def refs(self) -> List[ImageRef]:
+        """Todas las referencias conocidas, en orden de aparición."""
+        with self._lock:
+            return list(self._refs.values())
+
+    def resolve(self, target: str, alt: str = "") -> ImageRef:
+        """
+        Devuelve la referencia de una ruta, resolviéndola una sola vez.
+
+        Args:
+            target (str): Ruta escrita en el Markdown
+            alt (str): Texto alternativo (si la referencia es nueva)
+
+        Returns:
+            ImageRef: Referencia con su ruta absoluta (o None)
+        """
+        with self._lock:
+            ref = self._refs.get(target)
+        if ref is None:
+            ref = ImageRef(alt, target, resolve_image_path(target, self.base_dirs))
+            with self._lock:
+                ref = self._refs.setdefault(target, ref)
+        return ref
+
+
+def default_image_format() -> str:
+    """'webp' si Pillow puede escribirlo, si no 'png'."""
+    if PIL_AVAILABLE and features.check('webp'):
+        return 'webp'
+    return 'png'
+
+
+def variant_width(requested: int) -> int:
+    """El menor ancho estándar que cubre el pedido (o el mayor, si ninguno alcanza)."""
+    for width in IMAGE_VARIANT_WIDTHS:
+        if width >= requested:
+            return width
+    return IMAGE_VARIANT_WIDTHS[-1]
+
+
+def _default_cache_dir() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, '.cache', 'images')
+
+
+class ImageVariantCache:
+    """Variantes reducidas de imágenes guardadas en disco, por mtime del original."""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir (Optional[str]): Carpeta de la caché (por defecto <proyecto>/.cache/images)
+        """
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self._lock = threading.Lock()
+
+    def _names(self, source: str, stat_result: os.stat_result, width: int,
+               height: Optional[int], fmt: str) -> Tuple[str, str]:
+        """(prefijo común a todas las versiones del original, nombre de esta variante)."""
+        stem = os.path.splitext(os.path.basename(source))[0]
+        prefix = f"{stem}-{hash_bytes(source.encode('utf-8', 'surrogatepass')).hex()[:12]}-"
+        state = hash_bytes(
+            f"{IMAGE_CACHE_FORMAT_VERSION}:{stat_result.st_mtime_ns}:{stat_result.st_size}".encode()
+        ).hex()[:8]
+        box = f"{width}x{height}" if height else f"{width}"
+        return prefix, f"{prefix}{state}-{box}.{fmt}"
+
+    def _remove_stale(self, prefix: str, state_prefix: str):
+        """Borra las variantes de versiones anteriores del mismo original."""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(prefix) and not name.startswith(state_prefix) and not name.endswith('.tmp'):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def _build(self, source: str, target: str, width: int, height: Optional[int], fmt: str) -> bool:
+        """Genera una variante de forma atómica; False si la imagen no se pudo leer."""
+        try:
+            with Image.open(source) as image:
+                # Diagramas y capturas (PNG, GIF...) se comprimen sin pérdida; las fotos JPEG, con pérdida
+                lossless = image.format != 'JPEG'
+                image.thumbnail((width, height or image.height), Image.Resampling.LANCZOS)
+                if fmt == 'png' and image.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                elif fmt == 'webp' and image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info
+                                          else 'RGB')
+                os.makedirs(self.cache_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        if fmt == 'webp':
+                            if lossless:
+                                image.save(f, 'WEBP', lossless=True, method=6)
+                            else:
+                                image.save(f, 'WEBP', quality=90, method=4)
+                        else:
+                            image.save(f, 'PNG', optimize=True)
+                    os.replace(tmp_path, target)
+                except BaseException:
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+        except (IOError, OSError, ValueError, Image.DecompressionBombError):
+            return False
+        return True
+
+    def get_variant(self, source: str, width: int, height: Optional[int] = None,
+                    fmt: Optional[str] = None) -> Optional[str]:
+        """
+        Devuelve la ruta de una variante reducida, generándola si todavía no existe.
+
+        Sin alto, el ancho se lleva al ancho estándar que lo cubre; con alto,
+        la imagen entra en la caja width x height. Nunca se agranda.
+
+        Args:
+            source (str): Ruta de la imagen original
+            width (int): Ancho máximo
+            height (Optional[int]): Alto máximo
+            fmt (Optional[str]): 'webp' o 'png' (por defecto el mejor disponible)
+
+        Returns:
+            Optional[str]: Ruta de la variante; la original si falta Pillow; None si no existe
+        """
+        try:
+            stat_result = os.stat(source)
+        except OSError:
+            return None
+        if not PIL_AVAILABLE:
+            return source
+
+        fmt = fmt or default_image_format()
+        width = width if height else variant_width(width)
+        source = os.path.abspath(source)
+        prefix, name = self._names(source, stat_result, width, height, fmt)
+        target = os.path.join(self.cache_dir, name)
+        if os.path.exists(target):
+            return target
+
+        with self._lock:
+            if os.path.exists(target):
+                return target
+            if not self._build(source, target, width, height, fmt):
+                return None
+            self._remove_stale(prefix, name[:len(prefix) + 9])
+        return target
+
+    def get_variant_bytes(self, source: str, width: int, height: Optional[int] = None,
+                          fmt: Optional[str] = None) -> Optional[bytes]:
+        """
+        Bytes de una variante reducida (ver get_variant).
+
+        Returns:
+            Optional[bytes]: Contenido del archivo, o None si no se pudo obtener
+        """
+        path = self.get_variant(source, width, height, fmt)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except (IOError, OSError):
+            return None
+
+    def prepare(self, source: str, fmt: Optional[str] = None) -> List[str]:
+        """
+        Genera de antemano las variantes de todos los anchos estándar.
+
+        Args:
+            source (str): Ruta de la imagen original
+            fmt (Optional[str]): Formato de las variantes
+
+        Returns:
+            List[str]: Rutas de las variantes disponibles
+        """
+        paths = [self.get_variant(source, width, fmt=fmt) for width in IMAGE_VARIANT_WIDTHS]
+        return [path for path in paths if path]
+
+
+_default_image_cache: Optional[ImageVariantCache] = None
+
+
+def get_default_image_cache() -> ImageVariantCache:
+    """Devuelve la caché de variantes compartida del proyecto (se crea al primer uso)."""
+    global _default_image_cache
+    if _default_image_cache is None:
+        _default_image_cache = ImageVariantCache()
+    return _default_image_cache
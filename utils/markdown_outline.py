@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de estructura (outline) para documentos Markdown - Tienda Aurelion
+
+Recorre el documento una sola vez y construye el árbol completo de
+encabezados (# a ######), ignorando los bloques de código delimitados
+con ``` o ~~~. Cada nodo guarda offsets sobre el buffer original, de modo
+que el contenido solo se convierte en string cuando se necesita.
+
+Las tres interfaces (CLI, GUI y Streamlit) usan este módulo a través de
+utils.py, así que un documento se parsea una única vez y el mismo árbol
+se puede reutilizar para secciones, búsquedas y estadísticas.
+"""
+
+import itertools
+import re
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+# Una sola expresión para líneas de encabezado ATX y delimitadores de código.
+# Empieza por '\n' para que el motor de regex salte directamente de una línea
+# a la siguiente; la primera línea del documento se prueba aparte.
+_LINE_BODY = (
+    r'[ ]{0,3}(?:'
+    r'(?P<fence>`{3,}|~{3,})(?P<info>[^\n]*)'
+    r'|(?P<hashes>#{1,6})(?:[^\S\n]+(?P<text>[^\n]*))?'
+    r')(?=\n|\Z)'
+)
+_STR_LINE_PATTERNS = (re.compile(_LINE_BODY), re.compile('\n' + _LINE_BODY))
+# Misma expresión sobre bytes, para recorrer archivos mapeados en memoria
+_BYTES_LINE_PATTERNS = (re.compile(_LINE_BODY.encode()), re.compile(b'\n' + _LINE_BODY.encode()))
+_CLOSING_HASHES_RE = re.compile(r'(?:^|[^\S\n]+)#+$')
+_ANCHOR_STRIP_RE = re.compile(r'[^\w\- ]')
+
+
+class SectionSpan(NamedTuple):
+    """Posición de una sección dentro del buffer original."""
+    name: str
+    heading_start: int  # Inicio de la línea del encabezado
+    start: int          # Inicio del cuerpo (ya sin espacios iniciales)
+    end: int            # Fin del cuerpo (ya sin espacios finales)
+
+
+def _trim_span(buffer: str, start: int, end: int) -> Tuple[int, int]:
+    """Ajusta (start, end) para que equivalga a buffer[start:end].strip()."""
+    # Se compara con slices de un elemento para aceptar str, bytes y mmap
+    while start < end and buffer[start:start + 1].isspace():
+        start += 1
+    while end > start and buffer[end - 1:end].isspace():
+        end -= 1
+    return start, end
+
+
+class SectionIndex(Mapping):
+    """
+    Índice compacto de secciones basado en offsets sobre un único buffer.
+
+    Se comporta como un diccionario {nombre_seccion: contenido}, pero el
+    contenido de cada sección solo se convierte en string cuando se accede
+    a él. Las secciones con nombre repetido conservan la última aparición,
+    igual que el diccionario de parse_markdown_sections.
+
+    Si se indica un encoding, el buffer es binario (bytes o mmap) y cada
+    sección se decodifica a partir de su rango de bytes al pedirla.
+    """
+
+    def __init__(self, buffer, title: str, spans: List[SectionSpan],
+                 hole: Optional[Tuple[int, int]] = None, encoding: Optional[str] = None):
+        self.buffer = buffer
+        self.title = title
+        self.spans = spans
+        self.encoding = encoding
+        # Rango a excluir del cuerpo (solo para la sección "Contenido" por defecto)
+        self._hole = hole
+        self._by_name = {span.name: span for span in spans}
+
+    def __getitem__(self, name: str) -> str:
+        return self.section_text(self._by_name[name])
+
+    def __iter__(self):
+        return iter(self._by_name)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, name) -> bool:
+        # Sin materializar el contenido (Mapping lo haría vía __getitem__)
+        return name in self._by_name
+
+    def span(self, name: str) -> SectionSpan:
+        """Devuelve la posición de una sección sin materializar su contenido."""
+        return self._by_name[name]
+
+    def section_text(self, span: SectionSpan) -> str:
+        """Materializa el contenido de una sección como string."""
+        if self._hole is None:
+            return self._slice(span.start, span.end)
+        hole_start, hole_end = self._hole
+        text = self._slice(span.start, hole_start) + self._slice(hole_end, span.end)
+        return text.strip()
+
+    def _slice(self, start: int, end: int) -> str:
+        piece = self.buffer[start:end]
+        if self.encoding is None:
+            return piece
+        return piece.decode(self.encoding, errors='replace')
+
+    def to_dict(self) -> Dict[str, str]:
+        """Materializa todas las secciones en un diccionario."""
+        return {name: self.section_text(span) for name, span in self._by_name.items()}
+
+
+class OutlineNode:
+    """Encabezado del documento con sus offsets y sus subsecciones."""
+
+    __slots__ = ('title', 'level', 'path', 'anchor', 'heading_start',
+                 'body_start', 'end', 'parent', 'children')
+
+    def __init__(self, title: str, level: int, heading_start: int, body_start: int,
+                 parent: Optional['OutlineNode'] = None):
+        self.title = title
+        self.level = level
+        self.heading_start = heading_start
+        self.body_start = body_start
+        self.end = body_start  # Se ajusta al cerrar el nodo
+        self.parent = parent
+        self.children: List['OutlineNode'] = []
+        self.path: Tuple[str, ...] = ()
+        self.anchor = ""  # Lo completa Outline al construir el índice de anclas
+
+    @property
+    def own_end(self) -> int:
+        """Fin del texto propio de la sección (antes de su primera subsección)."""
+        return self.children[0].heading_start if self.children else self.end
+
+    def __repr__(self):
+        return f"OutlineNode({'#' * self.level} {self.title!r}, {self.heading_start}:{self.end})"
+
+
+def make_anchor(title: str) -> str:
+    """
+    Genera un ancla estilo GitHub a partir del texto de un encabezado.
+
+    Args:
+        title (str): Texto del encabezado
+
+    Returns:
+        str: Ancla en minúsculas, sin puntuación y con guiones
+    """
+    return _ANCHOR_STRIP_RE.sub('', title.strip().lower()).replace(' ', '-')
+
+
+class Outline:
+    """
+    Árbol de encabezados de un documento Markdown.
+
+    Atributos principales:
+        buffer: Texto completo del documento (compartido por todos los nodos)
+        title: Título principal (primer #), "Documento" si no existe
+        root: Nodo virtual de nivel 0 que contiene todo el documento
+        nodes: Lista plana de encabezados en orden de aparición
+    """
+
+    def __init__(self, buffer: str, title: str, root: OutlineNode, nodes: List[OutlineNode],
+                 encoding: Optional[str] = None):
+        self.buffer = buffer
+        self.encoding = encoding  # Solo si buffer es binario (modo streaming)
+        self.title = title
+        self.root = root
+        self.nodes = nodes
+        # Índices de búsqueda: se construyen una vez, al primer uso
+        self._by_path: Optional[Dict[Tuple[str, ...], OutlineNode]] = None
+        self._by_anchor: Optional[Dict[str, OutlineNode]] = None
+        self._sections: Optional[SectionIndex] = None
+        # Bloques de código (inicio, fin) vistos durante el parseo, si se registraron
+        self.fences: Optional[List[Tuple[int, int]]] = None
+        # Conteos por segmento (texto propio de cada encabezado; el 0 es lo previo
+        # al primero), calculados bajo demanda por markdown_stats
+        self.segment_counts: Optional[List[Optional[tuple]]] = None
+        self.stats_cache: Dict[Optional[str], Dict] = {}
+
+    def __iter__(self) -> Iterator[OutlineNode]:
+        return iter(self.nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def find(self, path: Union[str, Tuple[str, ...]]) -> Optional[OutlineNode]:
+        """
+        Busca un encabezado por su ruta de títulos, p. ej. ("Título", "Sección").
+
+        Un string se interpreta como ruta de un solo elemento.
+        """
+        if isinstance(path, str):
+            path = (path,)
+        if self._by_path is None:
+            by_path: Dict[Tuple[str, ...], OutlineNode] = {}
+            for node in self.nodes:
+                by_path.setdefault(node.path, node)
+            self._by_path = by_path
+        return self._by_path.get(tuple(path))
+
+    def by_anchor(self, anchor: str) -> Optional[OutlineNode]:
+        """Busca un encabezado por su ancla (con o sin '#' inicial)."""
+        if self._by_anchor is None:
+            self._build_anchors()
+        return self._by_anchor.get(anchor.lstrip('#'))
+
+    def anchor_of(self, node: OutlineNode) -> str:
+        """Devuelve el ancla de un encabezado (p. ej. para enlazarlo)."""
+        if self._by_anchor is None:
+            self._build_anchors()
+        return node.anchor
+
+    def _build_anchors(self):
+        """Asigna anclas únicas estilo GitHub (sufijos -1, -2... si se repiten)."""
+        by_anchor: Dict[str, OutlineNode] = {}
+        anchor_counts: Dict[str, int] = {}
+        for node in self.nodes:
+            base_anchor = make_anchor(node.title)
+            count = anchor_counts.get(base_anchor, 0)
+            anchor_counts[base_anchor] = count + 1
+            node.anchor = base_anchor if count == 0 else f"{base_anchor}-{count}"
+            by_anchor[node.anchor] = node
+        self._by_anchor = by_anchor
+
+    def text(self, node: OutlineNode, include_children: bool = True) -> str:
+        """
+        Devuelve el contenido de un encabezado sin la línea del título.
+
+        Args:
+            node (OutlineNode): Nodo del árbol
+            include_children (bool): Si incluye el texto de las subsecciones
+        """
+        end = node.end if include_children else node.own_end
+        start, end = _trim_span(self.buffer, node.body_start, end)
+        if self.encoding is None:
+            return self.buffer[start:end]
+        return self.buffer[start:end].decode(self.encoding, errors='replace')
+
+    def level_nodes(self, level: int) -> List[OutlineNode]:
+        """Devuelve todos los encabezados de un nivel dado."""
+        return [node for node in self.nodes if node.level == level]
+
+    def sections(self) -> SectionIndex:
+        """
+        Vista de secciones de nivel 2 (##), compatible con parse_markdown_sections.
+
+        Si el documento no tiene ##, devuelve una única sección "Contenido"
+        con todo el texto salvo la línea del título principal.
+        """
+        if self._sections is None:
+            self._sections = self._build_sections()
+        return self._sections
+
+    def to_records(self) -> List[Tuple[int, str, int, int, int]]:
+        """
+        Serializa el árbol como lista de tuplas (nivel, título, inicio_encabezado,
+        inicio_cuerpo, fin), apta para guardarse en caché.
+        """
+        return [(node.level, node.title, node.heading_start, node.body_start, node.end)
+                for node in self.nodes]
+
+    def _build_sections(self) -> SectionIndex:
+        buffer = self.buffer
+        encoding = self.encoding
+        doc_start, doc_end = _trim_span(buffer, 0, len(buffer))
+        if doc_start == doc_end:
+            return SectionIndex(buffer, "", [], encoding=encoding)
+
+        # Cada sección llega hasta el siguiente ## (no corta en un # posterior, como el parser original)
+        level2 = [node for node in self.nodes if node.level == 2]
+        ends = [node.heading_start for node in level2[1:]] + [len(buffer)]
+        spans = [
+            SectionSpan(node.title, node.heading_start, *_trim_span(buffer, node.body_start, end))
+            for node, end in zip(level2, ends)
+        ]
+        if spans:
+            return SectionIndex(buffer, self.title, spans, encoding=encoding)
+
+        # Sin secciones: una sección por defecto sin la línea del título
+        first_h1 = next((node for node in self.nodes if node.level == 1), None)
+        if first_h1 is not None:
+            hole = (first_h1.heading_start, first_h1.body_start)
+            if doc_start >= first_h1.heading_start:
+                start, end = _trim_span(buffer, first_h1.body_start, len(buffer))
+                return SectionIndex(buffer, self.title, [SectionSpan("Contenido", 0, start, end)],
+                                    encoding=encoding)
+            return SectionIndex(buffer, self.title, [SectionSpan("Contenido", 0, doc_start, doc_end)],
+                                hole, encoding)
+
+        return SectionIndex(buffer, self.title, [SectionSpan("Contenido", 0, doc_start, doc_end)],
+                            encoding=encoding)
+
+
+def _heading_text(raw: Optional[str]) -> str:
+    """Limpia el texto de un encabezado ATX (espacios y '#' de cierre)."""
+    if not raw:
+        return ""
+    text = raw.strip()
+    if not text.endswith('#'):
+        return text
+    return _CLOSING_HASHES_RE.sub('', text).strip()
+
+
+def _iter_headings(buffer, patterns, start: int = 0, fences: Optional[list] = None):
+    """
+    Recorre el buffer una vez y produce los encabezados fuera de bloques de código.
+
+    Funciona igual sobre str que sobre bytes/mmap (con los patrones adecuados).
+
+    Args:
+        fences (Optional[list]): Si se indica, se le agregan los rangos
+            (inicio, fin) de los bloques de código encontrados en el recorrido
+
+    Yields:
+        tuple: (nivel, texto_crudo, inicio_linea, fin_linea)
+    """
+    first_re, line_re = patterns
+    backtick = '`' if isinstance(buffer, str) else b'`'
+    fence_char = None
+    fence_len = 0
+    fence_start = 0
+
+    matches = line_re.finditer(buffer, start)
+    first = first_re.match(buffer, start)
+    if first is not None:
+        matches = itertools.chain((first,), matches)
+
+    for match in matches:
+        fence = match.group('fence')
+
+        if fence_char is not None:
+            # Dentro de un bloque de código: solo interesa el cierre
+            if fence and fence[:1] == fence_char and len(fence) >= fence_len \
+                    and not match.group('info').strip():
+                fence_char = None
+                if fences is not None:
+                    fences.append((fence_start, match.end()))
+            continue
+
+        if fence:
+            if fence[:1] == backtick and backtick in match.group('info'):
+                continue  # Código inline, no es un bloque
+            fence_char, fence_len = fence[:1], len(fence)
+            fence_start = match.start() if match.re is first_re else match.start() + 1
+            continue
+
+        if match.group('text'):
+            line_start = match.start() if match.re is first_re else match.start() + 1
+            yield len(match.group('hashes')), match.group('text'), line_start, match.end()
+
+    if fence_char is not None and fences is not None:
+        # Bloque sin cerrar: llega hasta el final del documento
+        fences.append((fence_start, len(buffer)))
+
+
+def _build_tree(headings, length: int):
+    """
+    Arma el árbol a partir de (nivel, título, inicio_linea, fin_linea).
+
+    Returns:
+        tuple: (raiz, nodos, titulo_principal)
+    """
+    root = OutlineNode("", 0, 0, 0)
+    root.end = length
+    nodes: List[OutlineNode] = []
+    stack = [root]
+    main_title = ""
+
+    for level, title, heading_start, line_end in headings:
+        if not title:
+            continue
+        body_start = min(line_end + 1, length)
+
+        # Cerrar los nodos de nivel igual o mayor
+        while stack[-1].level >= level:
+            stack.pop().end = heading_start
+
+        parent = stack[-1]
+        node = OutlineNode(title, level, heading_start, body_start, parent)
+        node.path = parent.path + (title,)
+        parent.children.append(node)
+        nodes.append(node)
+        stack.append(node)
+
+        if level == 1 and not main_title:
+            main_title = title
+
+    while len(stack) > 1:
+        stack.pop().end = length
+
+    return root, nodes, main_title
+
+
+def _is_blank(buffer, start: int = 0) -> bool:
+    doc_start, doc_end = _trim_span(buffer, start, len(buffer))
+    return doc_start == doc_end
+
+
+def parse_outline(content: str) -> Outline:
+    """
+    Construye el árbol de encabezados de un documento en una sola pasada.
+
+    Args:
+        content (str): Contenido completo del documento Markdown
+
+    Returns:
+        Outline: Árbol con búsqueda directa por ruta y por ancla
+    """
+    fences: List[Tuple[int, int]] = []
+    headings = (
+        (level, _heading_text(raw), line_start, line_end)
+        for level, raw, line_start, line_end in _iter_headings(content, _STR_LINE_PATTERNS, 0, fences)
+    )
+    root, nodes, main_title = _build_tree(headings, len(content))
+
+    if not main_title and not _is_blank(content):
+        main_title = "Documento"
+
+    outline = Outline(content, main_title, root, nodes)
+    # Los bloques de código salen del mismo recorrido y sirven para las estadísticas
+    outline.fences = fences
+    return outline
+
+
+def parse_outline_bytes(buffer, encoding: str, start: int = 0) -> Outline:
+    """
+    Construye el árbol de encabezados directamente sobre bytes (p. ej. un mmap).
+
+    Solo se decodifican los textos de los encabezados; el contenido de cada
+    sección se decodifica desde su rango de bytes cuando se pide. Requiere un
+    encoding compatible con ASCII (utf-8, cp1252, latin-1...).
+
+    Args:
+        buffer (bytes | mmap.mmap): Contenido binario del documento
+        encoding (str): Encoding con el que decodificar títulos y secciones
+        start (int): Offset desde el que empezar (p. ej. para saltar un BOM)
+
+    Returns:
+        Outline: Árbol con offsets en bytes y decodificación bajo demanda
+    """
+    headings = (
+        (level, _heading_text(raw.decode(encoding, errors='replace')), line_start, line_end)
+        for level, raw, line_start, line_end in _iter_headings(buffer, _BYTES_LINE_PATTERNS, start)
+    )
+    root, nodes, main_title = _build_tree(headings, len(buffer))
+
+    if not main_title and not _is_blank(buffer, start):
+        main_title = "Documento"
+
+    return Outline(buffer, main_title, root, nodes, encoding)
+
+
+def outline_from_records(content, title: str,
+                         records: List[Tuple[int, str, int, int, int]],
+                         encoding: Optional[str] = None) -> Outline:
+    """
+    Reconstruye un Outline a partir de Outline.to_records() sin volver a parsear.
+
+    Args:
+        content (str | bytes | mmap.mmap): Contenido del documento (el mismo que se parseó)
+        title (str): Título principal guardado
+        records (List[Tuple]): Registros de los encabezados en orden de aparición
+        encoding (Optional[str]): Encoding si el contenido es binario (modo streaming)
+
+    Returns:
+        Outline: Árbol equivalente al original
+    """
+    root = OutlineNode("", 0, 0, 0)
+    root.end = len(content)
+    nodes: List[OutlineNode] = []
+    stack = [root]
+
+    for level, node_title, heading_start, body_start, end in records:
+        while stack[-1].level >= level:
+            stack.pop()
+        parent = stack[-1]
+        node = OutlineNode(node_title, level, heading_start, body_start, parent)
+        node.end = end
+        node.path = parent.path + (node_title,)
+        parent.children.append(node)
+        nodes.append(node)
+        stack.append(node)
+
+    return Outline(content, title, root, nodes, encoding)
+
+
+class OutlineChanges(NamedTuple):
+    """Diferencias entre dos versiones de un documento, a nivel de sección (##)."""
+    changed: List[str]              # Secciones que siguen existiendo pero cambiaron
+    added: List[str]                # Secciones nuevas
+    removed: List[str]              # Secciones que ya no existen
+    rescanned: Tuple[int, int]      # Rango del contenido nuevo que se volvió a recorrer
+
+    @property
+    def affected(self) -> List[str]:
+        """Todas las secciones cuyas entradas en caché dejan de ser válidas."""
+        return self.changed + self.added + self.removed
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.added or self.removed)
+
+
+_COMPARE_CHUNK = 64 * 1024
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    """Largo del prefijo común de a y b (como máximo limit), comparando por bloques."""
+    lo = 0
+    while lo < limit:
+        hi = min(lo + _COMPARE_CHUNK, limit)
+        if a[lo:hi] != b[lo:hi]:
+            # La primera diferencia está en [lo, hi): búsqueda binaria
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+    return limit
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Largo del sufijo común de a y b (como máximo limit)."""
+    len_a, len_b = len(a), len(b)
+    lo = 0
+    while lo < limit:
+        hi = min(lo + _COMPARE_CHUNK, limit)
+        if a[len_a - hi:len_a - lo] != b[len_b - hi:len_b - lo]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[len_a - mid:len_a - lo] == b[len_b - mid:len_b - lo]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+    return limit
+
+
+def _node_heading(node: OutlineNode, buffer: str, shift: int = 0):
+    """Convierte un nodo en la tupla (nivel, título, inicio_linea, fin_linea) de _build_tree."""
+    body_start = node.body_start
+    line_end = body_start - 1 if buffer[body_start - 1:body_start] == '\n' else body_start
+    return node.level, node.title, node.heading_start + shift, line_end + shift
+
+
+def reparse_outline(old: Outline, content: str) -> Tuple[Outline, OutlineChanges]:
+    """
+    Actualiza el árbol de un documento editado recorriendo solo la zona modificada.
+
+    Se buscan el prefijo y el sufijo comunes entre la versión anterior y la
+    nueva. Los encabezados anteriores a la edición se conservan; el recorrido
+    empieza en el último encabezado intacto (donde seguro no hay un bloque de
+    código abierto) y se detiene en cuanto vuelve a encontrar, ya dentro del
+    sufijo común, un encabezado de la versión anterior: desde ahí el resto es
+    idéntico y solo se desplazan los offsets.
+
+    Args:
+        old (Outline): Árbol de la versión anterior (sobre un str)
+        content (str): Contenido nuevo del documento
+
+    Returns:
+        Tuple[Outline, OutlineChanges]: Árbol nuevo y secciones que cambiaron
+    """
+    old_buffer = old.buffer
+    old_length, new_length = len(old_buffer), len(content)
+    prefix = _common_prefix(old_buffer, content, min(old_length, new_length))
+    suffix = _common_suffix(old_buffer, content, min(old_length, new_length) - prefix)
+    new_edit_end = new_length - suffix
+    shift = new_length - old_length
+
+    # Encabezados cuya línea (incluido su salto de línea) está antes de la edición
+    nodes = old.nodes
+    intact = 0
+    while intact < len(nodes) and old_buffer.find('\n', nodes[intact].heading_start, prefix) != -1:
+        intact += 1
+    # El último intacto se vuelve a recorrer: es un punto seguro fuera de bloques de código
+    restart_index = max(intact - 1, 0)
+    restart = nodes[restart_index].heading_start if intact else 0
+    headings = [_node_heading(node, old_buffer) for node in nodes[:restart_index]]
+
+    old_starts = {node.heading_start: index for index, node in enumerate(nodes)}
+    scan_end = new_length
+    resync = len(nodes)
+    fences: List[Tuple[int, int]] = []
+    for level, raw, line_start, line_end in _iter_headings(content, _STR_LINE_PATTERNS, restart, fences):
+        if line_start - 1 >= new_edit_end:
+            index = old_starts.get(line_start - shift)
+            if index is not None:
+                # Sincronizado con la versión anterior: el resto solo se desplaza
+                headings.extend(_node_heading(node, old_buffer, shift) for node in nodes[index:])
+                scan_end = line_start
+                resync = index
+                break
+        headings.append((level, _heading_text(raw), line_start, line_end))
+
+    root, new_nodes, main_title = _build_tree(headings, new_length)
+    if not main_title and not _is_blank(content):
+        main_title = "Documento"
+    outline = Outline(content, main_title, root, new_nodes)
+
+    # Bloques de código y conteos de los segmentos intactos se reutilizan
+    kept = restart_index + 1 if intact else 0  # Segmentos antes de 'restart' (incluido el inicial)
+    if old.fences is not None:
+        old_scan_end = scan_end - shift
+        outline.fences = ([fence for fence in old.fences if fence[0] < restart] + fences
+                          + [(start + shift, end + shift) for start, end in old.fences if start >= old_scan_end])
+    if old.segment_counts is not None:
+        tail = old.segment_counts[resync + 1:]
+        outline.segment_counts = (old.segment_counts[:kept]
+                                  + [None] * (len(new_nodes) + 1 - kept - len(tail)) + tail)
+
+    # Secciones fuera de la zona editada no cambian; las que la tocan se comparan
+    old_sections = old.sections()
+    new_sections = outline.sections()
+    changed, added = [], []
+    for span in new_sections.spans:
+        if new_sections._by_name[span.name] is not span:
+            continue  # Nombre repetido: vale la última sección con ese nombre
+        old_span = old_sections._by_name.get(span.name)
+        if old_span is None:
+            added.append(span.name)
+        elif span.end < prefix and old_span == span:
+            continue
+        elif span.heading_start > new_edit_end and span == SectionSpan(
+                old_span.name, old_span.heading_start + shift, old_span.start + shift, old_span.end + shift):
+            continue
+        elif old_sections.section_text(old_span) != new_sections.section_text(span):
+            changed.append(span.name)
+    removed = [name for name in old_sections._by_name if name not in new_sections._by_name]
+
+    return outline, OutlineChanges(changed, added, removed, (restart, scan_end))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Paginación de secciones largas por bloques - Tienda Aurelion
+
+Divide el texto de una sección en bloques (párrafos, listas, tablas y
+bloques de código, separados por líneas en blanco) y los agrupa en páginas
+que no superan un presupuesto de caracteres. Nunca se corta un bloque por
+la mitad salvo que él solo supere el presupuesto: en ese caso una tabla
+se parte por filas repitiendo su encabezado y un bloque de código se parte
+por líneas volviendo a abrir y cerrar el bloque en cada página.
+"""
+
+import re
+from typing import List
+
+from markdown_outline import _STR_LINE_PATTERNS, _iter_headings
+
+
+PAGE_SIZE_BUDGET = 20_000  # caracteres por página
+
+_BLANK_LINES_RE = re.compile(r'\n[ \t]*\n')
+_FENCE_RE = re.compile(r'[ ]{0,3}(`{3,}|~{3,})')
+_TABLE_DELIMITER_RE = re.compile(r'[ ]{0,3}\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+
+
+def split_blocks(content: str) -> List[str]:
+    """
+    Divide un texto Markdown en bloques sin cortar bloques de código.
+
+    Args:
+        content (str): Texto de una sección
+
+    Returns:
+        List[str]: Bloques en orden (sin las líneas en blanco que los separan)
+    """
+    fences = []
+    for _ in _iter_headings(content, _STR_LINE_PATTERNS, 0, fences):
+        pass
+
+    blocks = []
+    position = 0
+    for fence_start, fence_end in fences + [(len(content), len(content))]:
+        # Fuera de los bloques de código se corta en cada línea en blanco
+        for piece in _BLANK_LINES_RE.split(content[position:fence_start]):
+            if piece.strip():
+                blocks.append(piece.strip('\n'))
+        if fence_end > fence_start:
+            blocks.append(content[fence_start:fence_end].strip('\n'))
+        position = fence_end
+    return blocks
+
+
+def _chunk_lines(lines: List[str], budget: int) -> List[List[str]]:
+    """Agrupa líneas consecutivas sin superar el presupuesto (al menos una por grupo)."""
+    chunks, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > budget:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_block(block: str, budget: int) -> List[str]:
+    """Parte un bloque más grande que el presupuesto en trozos que se renderizan solos."""
+    lines = block.split('\n')
+    fence = _FENCE_RE.match(lines[0])
+    if fence is not None and fence.group(1)[0] == '`' and '`' in lines[0][fence.end():]:
+        fence = None  # Código inline al inicio de un párrafo, no un bloque
+    if fence is not None:
+        opening = lines[0]
+        marker = fence.group(1)
+        closed = len(lines) > 1 and lines[-1].strip().startswith(marker[0] * len(marker))
+        closing = lines[-1] if closed else marker
+        body = lines[1:-1] if closed else lines[1:]
+        overhead = len(opening) + len(closing) + 2
+        return ['\n'.join([opening] + chunk + [closing])
+                for chunk in _chunk_lines(body, max(budget - overhead, 1))]
+
+    if len(lines) > 2 and '|' in lines[0] and _TABLE_DELIMITER_RE.match(lines[1]):
+        # Tabla: cada trozo repite el encabezado y la fila separadora
+        header = lines[:2]
+        overhead = len(header[0]) + len(header[1]) + 2
+        return ['\n'.join(header + chunk) for chunk in _chunk_lines(lines[2:], max(budget - overhead, 1))]
+
+    return ['\n'.join(chunk) for chunk in _chunk_lines(lines, budget)]
+
+
+def paginate_markdown(content: str, budget: int = PAGE_SIZE_BUDGET) -> List[str]:
+    """
+    Agrupa los bloques de un texto en páginas de hasta `budget` caracteres.
+
+    Args:
+        content (str): Texto de una sección (ya limpio para renderizar)
+        budget (int): Tamaño máximo aproximado de cada página
+
+    Returns:
+        List[str]: Páginas en orden; una sola si el texto entra en el presupuesto
+    """
+    if len(content) <= budget:
+        return [content]
+
+    pages, current, size = [], [], 0
+    for block in split_blocks(content):
+        pieces = _split_block(block, budget) if len(block) > budget else [block]
+        for piece in pieces:
+            if current and size + len(piece) + 2 > budget:
+                pages.append('\n\n'.join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 2
+    if current:
+        pages.append('\n\n'.join(current))
+    return pages or [content]
+
+
+def page_label(page: str, width: int = 60) -> str:
+    """
+    Texto corto que identifica una página: su primera línea con contenido.
+
+    Args:
+        page (str): Texto de la página
+        width (int): Largo máximo del texto
+
+    Returns:
+        str: Primera línea sin marcas de Markdown, recortada
+    """
+    for line in page.split('\n'):
+        text = line.strip().strip('#|>*-`~ \t')
+        if text:
+            return text if len(text) <= width else text[:width - 1] + '…'
+    return ""
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estadísticas de documentos Markdown por segmento - Tienda Aurelion
+
+Un segmento es el texto propio de cada encabezado (desde su línea hasta el
+siguiente encabezado); el segmento 0 es lo que hay antes del primero. Cada
+segmento se cuenta una sola vez (palabras, líneas, caracteres, bloques de
+código, tablas e imágenes) y los totales de una sección o del documento
+son sumas de segmentos, así que pedirlos de nuevo no vuelve a recorrer el texto.
+
+Los bloques de código se toman del mismo recorrido que arma el árbol
+(Outline.fences); las tablas e imágenes dentro de un bloque de código no cuentan.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from markdown_outline import Outline, _STR_LINE_PATTERNS, _iter_headings
+
+
+WORDS_PER_MINUTE = 200
+
+# Orden de los conteos guardados por segmento
+COUNT_FIELDS = ('words', 'lines', 'characters', 'code_blocks', 'tables', 'images')
+
+_IMAGE_RE = re.compile(r'!\[[^\]\n]*\]\([^)\n]*\)|<img\b', re.IGNORECASE)
+# Fila separadora de una tabla (|---|:--:|); empieza por '\n' como el parser de
+# encabezados: la primera línea de un segmento es su encabezado (salvo en el 0)
+_TABLE_RE = re.compile(
+    r'\n[ ]{0,3}(?:\|[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?'
+    r'|:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)+\|?)[ \t]*(?=\n|\Z)'
+)
+
+
+def _segment_bounds(outline: Outline, index: int) -> Tuple[int, int]:
+    nodes = outline.nodes
+    start = nodes[index - 1].heading_start if index else 0
+    end = nodes[index].heading_start if index < len(nodes) else len(outline.buffer)
+    return start, end
+
+
+def _segment_text(outline: Outline, start: int, end: int) -> str:
+    piece = outline.buffer[start:end]
+    if outline.encoding is None:
+        return piece
+    return piece.decode(outline.encoding, errors='replace')
+
+
+def _count_segment(outline: Outline, index: int) -> tuple:
+    """Cuenta un segmento en una pasada por cada tipo de elemento."""
+    start, end = _segment_bounds(outline, index)
+    text = _segment_text(outline, start, end)
+
+    if outline.fences is not None and outline.encoding is None:
+        fences = outline.fences
+        first = bisect_left(fences, (start,))
+        last = bisect_left(fences, (end,), first)
+        fences = [(fence_start - start, fence_end - start) for fence_start, fence_end in fences[first:last]]
+    else:
+        # Árbol sin registro de bloques (caché o modo streaming): se recorre solo este segmento
+        fences = []
+        for _ in _iter_headings(text, _STR_LINE_PATTERNS, 0, fences):
+            pass
+
+    def outside_fences(position: int) -> bool:
+        return not any(fence_start <= position < fence_end for fence_start, fence_end in fences)
+
+    lines = text.count('\n')
+    if index == len(outline.nodes) and outline.buffer:
+        lines += 1  # Última línea del documento (sin salto final)
+    if index:
+        tables = sum(1 for match in _TABLE_RE.finditer(text) if outside_fences(match.start() + 1))
+    else:
+        # Antes del primer encabezado la primera línea también puede ser de una tabla
+        tables = sum(1 for match in _TABLE_RE.finditer('\n' + text) if outside_fences(match.start()))
+    images = sum(1 for match in _IMAGE_RE.finditer(text) if outside_fences(match.start()))
+    return len(text.split()), lines, len(text), len(fences), tables, images
+
+
+def _sum_segments(outline: Outline, first: int, last: int) -> List[int]:
+    """Suma los conteos de los segmentos [first, last), calculando los que falten."""
+    counts = outline.segment_counts
+    if counts is None:
+        counts = outline.segment_counts = [None] * (len(outline.nodes) + 1)
+    totals = [0] * len(COUNT_FIELDS)
+    for index in range(first, last):
+        segment = counts[index]
+        if segment is None:
+            segment = counts[index] = _count_segment(outline, index)
+        for field, value in enumerate(segment):
+            totals[field] += value
+    return totals
+
+
+def _node_at(nodes, heading_start: int) -> Optional[int]:
+    """Índice del nodo que empieza en un offset (los nodos están ordenados)."""
+    lo, hi = 0, len(nodes)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if nodes[mid].heading_start < heading_start:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < len(nodes) and nodes[lo].heading_start == heading_start:
+        return lo
+    return None
+
+
+def _as_stats(totals: List[int], levels: Counter) -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(zip(COUNT_FIELDS, totals))
+    stats['sections'] = levels.get(2, 0)
+    stats['headings'] = {level: levels.get(level, 0) for level in range(1, 7)}
+    stats['reading_time'] = math.ceil(stats['words'] / WORDS_PER_MINUTE)  # minutos
+    return stats
+
+
+def document_stats(outline: Outline) -> Dict[str, Any]:
+    """
+    Estadísticas completas de un documento (suma de todos sus segmentos).
+
+    Args:
+        outline (Outline): Árbol del documento
+
+    Returns:
+        Dict[str, Any]: words, lines, characters, sections, headings (por nivel),
+            code_blocks, tables, images y reading_time (minutos)
+    """
+    stats = outline.stats_cache.get(None)
+    if stats is None:
+        totals = _sum_segments(outline, 0, len(outline.nodes) + 1)
+        stats = outline.stats_cache[None] = _as_stats(totals, Counter(node.level for node in outline.nodes))
+    return stats
+
+
+def section_stats(outline: Outline, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Estadísticas de una sección (##), incluidas sus subsecciones.
+
+    Solo se cuentan los segmentos de esa sección, así que en modo streaming
+    no obliga a leer el resto del archivo.
+
+    Args:
+        outline (Outline): Árbol del documento
+        name (str): Nombre de la sección, como en Outline.sections()
+
+    Returns:
+        Optional[Dict[str, Any]]: Mismas claves que document_stats, o None si no existe
+    """
+    stats = outline.stats_cache.get(name)
+    if stats is not None:
+        return stats
+    sections = outline.sections()
+    if name not in sections:
+        return None
+
+    span = sections.span(name)
+    nodes = outline.nodes
+    first = _node_at(nodes, span.heading_start)
+    if first is None or nodes[first].level != 2:
+        # Sección por defecto "Contenido" (sin ##): abarca todo el documento
+        return document_stats(outline)
+    # Hasta el siguiente ##, igual que el contenido de la sección
+    last = first + 1
+    while last < len(nodes) and nodes[last].level != 2:
+        last += 1
+
+    totals = _sum_segments(outline, first + 1, last + 1)
+    levels = Counter(node.level for node in nodes[first:last])
+    stats = outline.stats_cache[name] = _as_stats(totals, levels)
+    return stats
+
+
+def empty_stats() -> Dict[str, Any]:
+    """Estadísticas de un documento vacío."""
+    return _as_stats([0] * len(COUNT_FIELDS), Counter())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché en memoria para las etapas del explorador - Tienda Aurelion
+
+Streamlit vuelve a ejecutar todo el script con cada interacción. Esta caché
+guarda el resultado de cada etapa (carga, parseo, estadísticas, limpieza,
+imágenes) con una clave derivada del contenido (hash), de modo que cambiar
+de sección en un documento ya visto es una búsqueda en un diccionario.
+
+La caché es del proceso: la comparten todas las sesiones y los hilos. Tiene
+un presupuesto de entradas y de bytes aproximados; al superarlo se
+descartan las entradas usadas hace más tiempo (LRU). Lleva la cuenta de
+aciertos y fallos por etapa para poder mostrarlos en la interfaz.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from parse_cache import hash_bytes
+
+
+DEFAULT_MEMORY_BYTES = 128 * 1024 * 1024  # 128 MB
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class StageStats(NamedTuple):
+    """Contadores de una etapa de la caché."""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int  # Bytes aproximados ocupados por las entradas de la etapa
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def content_key(text: str) -> bytes:
+    """
+    Clave de caché para un texto: hash de su contenido.
+
+    Args:
+        text (str): Texto a identificar (documento o sección)
+
+    Returns:
+        bytes: Hash de 16 bytes del texto en UTF-8
+    """
+    return hash_bytes(text.encode('utf-8', 'surrogatepass'))
+
+
+def _weigh(value: Any) -> int:
+    """Tamaño aproximado de un valor; las tuplas suman sus elementos."""
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_weigh(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class MemoryCache:
+    """
+    Caché LRU en memoria con claves (etapa, clave) y contadores por etapa.
+
+    Es seguro usarla desde varios hilos; el cálculo de un valor que falta se
+    hace fuera del lock, así que dos sesiones pueden calcularlo a la vez
+    (se queda el último).
+
+    Args:
+        max_bytes (int): Tamaño máximo aproximado de todas las entradas
+        max_entries (int): Cantidad máxima de entradas
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()  # (etapa, clave) -> (valor, tamaño)
+        self._size = 0
+        self._counters: Dict[str, list] = {}  # etapa -> [aciertos, fallos, descartes]
+        self._lock = threading.Lock()
+
+    def _count(self, stage: str, field: int):
+        counters = self._counters.get(stage)
+        if counters is None:
+            counters = self._counters[stage] = [0, 0, 0]
+        counters[field] += 1
+
+    def get(self, stage: str, key: Hashable) -> Optional[Any]:
+        """
+        Busca un valor y lo marca como usado recientemente.
+
+        Args:
+            stage (str): Etapa del pipeline (p. ej. 'parse', 'clean')
+            key (Hashable): Clave dentro de la etapa (normalmente un hash)
+
+        Returns:
+            Optional[Any]: Valor guardado, o None si no está
+        """
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            if entry is None:
+                self._count(stage, 1)
+                return None
+            self._entries.move_to_end((stage, key))
+            self._count(stage, 0)
+            return entry[0]
+
+    def put(self, stage: str, key: Hashable, value: Any, size: Optional[int] = None):
+        """
+        Guarda un valor, descartando las entradas más antiguas si hace falta.
+
+        Args:
+            stage (str): Etapa del pipeline
+            key (Hashable): Clave dentro de la etapa
+            value (Any): Valor a guardar (no puede ser None)
+            size (Optional[int]): Bytes aproximados del valor (por defecto se estiman)
+        """
+        if value is None:
+            return
+        if size is None:
+            size = _weigh(value)
+        with self._lock:
+            old = self._entries.pop((stage, key), None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[(stage, key)] = (value, size)
+            self._size += size
+            # La entrada recién guardada (la última) nunca se descarta
+            while (self._size > self.max_bytes or len(self._entries) > self.max_entries) and len(self._entries) > 1:
+                (old_stage, _), (_, old_size) = self._entries.popitem(last=False)
+                self._size -= old_size
+                self._count(old_stage, 2)
+
+    def get_or_compute(self, stage: str, key: Hashable, compute: Callable[[], Any],
+                       size: Optional[Callable[[Any], int]] = None) -> Any:
+        """
+        Devuelve el valor guardado o lo calcula y lo guarda.
+
+        Args:
+            stage (str): Etapa del pipeline
+            key (Hashable): Clave dentro de la etapa
+            compute (Callable[[], Any]): Función que calcula el valor si falta
+            size (Optional[Callable[[Any], int]]): Función que estima los bytes del valor
+
+        Returns:
+            Any: Valor guardado o recién calculado
+        """
+        value = self.get(stage, key)
+        if value is None:
+            value = compute()
+            self.put(stage, key, value, size(value) if size is not None and value is not None else None)
+        return value
+
+    def discard(self, stage: str, key: Hashable):
+        """Elimina una entrada (p. ej. cuando su valor dejó de ser válido)."""
+        with self._lock:
+            old = self._entries.pop((stage, key), None)
+            if old is not None:
+                self._size -= old[1]
+
+    def stats(self) -> Dict[str, StageStats]:
+        """
+        Contadores de cada etapa.
+
+        Returns:
+            Dict[str, StageStats]: Aciertos, fallos, descartes, entradas y bytes por etapa
+        """
+        with self._lock:
+            entries: Dict[str, int] = {}
+            sizes: Dict[str, int] = {}
+            for (stage, _), (_, size) in self._entries.items():
+                entries[stage] = entries.get(stage, 0) + 1
+                sizes[stage] = sizes.get(stage, 0) + size
+            return {
+                stage: StageStats(hits, misses, evictions, entries.get(stage, 0), sizes.get(stage, 0))
+                for stage, (hits, misses, evictions) in self._counters.items()
+            }
+
+    @property
+    def size(self) -> int:
+        """Bytes aproximados ocupados por todas las entradas."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self._size = 0
+
+
+_default_memory_cache: Optional[MemoryCache] = None
+
+
+def get_memory_cache() -> MemoryCache:
+    """Devuelve la caché en memoria compartida del proceso (se crea al primer uso)."""
+    global _default_memory_cache
+    if _default_memory_cache is None:
+        _default_memory_cache = MemoryCache()
+    return _default_memory_cache
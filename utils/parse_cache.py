@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de parseo para documentos Markdown - Tienda Aurelion
+
+Guarda en disco, para cada archivo, el árbol de encabezados, las
+estadísticas y otros artefactos ya calculados. Cada entrada se identifica
+por la huella del archivo (ruta, tamaño, mtime y hash del contenido), de
+modo que un arranque en frío sobre una carpeta ya vista no vuelve a parsear.
+
+Formato de cada entrada (un archivo por documento):
+    cabecera fija (struct) con la huella + pickle comprimido con zlib
+    que contiene solo tipos básicos (tuplas, listas, dicts, strings).
+
+Los artefactos chicos que dependen solo del texto de una sección (p. ej.
+la sección ya limpia para renderizar) van en entradas propias, una por
+hash de contenido: guardar uno no reescribe la entrada del documento y
+sirven para cualquier archivo que tenga esa misma sección.
+
+Las escrituras son atómicas (archivo temporal + os.replace), así que los
+lectores concurrentes nunca ven una entrada a medio escribir. Cuando el
+tamaño total supera el presupuesto, se eliminan las entradas usadas hace
+más tiempo (LRU según el mtime de cada entrada, que se actualiza en cada acierto)
+hasta bajar al 80 % del presupuesto.
+El total se lleva en memoria entre escrituras: la carpeta solo se recorre
+cuando se pasa el presupuesto o cada _RESCAN_WRITES escrituras.
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from typing import Any, Dict, NamedTuple, Optional
+
+
+CACHE_FORMAT_VERSION = 2
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024  # 64 MB
+# Cada cuántas escrituras se vuelve a medir la carpeta aunque el total estimado no supere el presupuesto
+# (otros procesos también escriben en ella)
+_RESCAN_WRITES = 256
+# Al pasar el presupuesto se libera hasta esta fracción, para no volver a recorrer la carpeta en la escritura siguiente
+_EVICT_TARGET = 0.8
+
+_MAGIC = b'MDXC'
+# magic, versión, tamaño del archivo, mtime en ns, hash del contenido
+_HEADER = struct.Struct('<4sBQq16s')
+_ENTRY_SUFFIX = '.mdxc'
+
+
+class FileFingerprint(NamedTuple):
+    """Huella de un archivo: ruta absoluta, tamaño, mtime y hash del contenido."""
+    path: str
+    size: int
+    mtime_ns: int
+    digest: bytes
+
+    @property
+    def content_hash(self) -> str:
+        return self.digest.hex()
+
+
+def hash_bytes(data) -> bytes:
+    """Calcula el hash (blake2b de 16 bytes) de un bloque de bytes."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def fingerprint_file(path: str, data: bytes, stat_result: Optional[os.stat_result] = None) -> FileFingerprint:
+    """
+    Construye la huella de un archivo a partir de sus bytes ya leídos.
+
+    Args:
+        path (str): Ruta al archivo
+        data (bytes): Contenido binario del archivo
+        stat_result (Optional[os.stat_result]): Resultado de os.stat si ya se tiene
+    """
+    st = stat_result or os.stat(path)
+    return FileFingerprint(os.path.abspath(path), st.st_size, st.st_mtime_ns, hash_bytes(data))
+
+
+class ParseCache:
+    """
+    Caché en disco de resultados de parseo, con presupuesto de bytes y LRU.
+
+    Args:
+        cache_dir (Optional[str]): Carpeta de la caché (por defecto <proyecto>/.cache/parse)
+        max_bytes (int): Tamaño máximo total de las entradas
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_BYTES):
+        if cache_dir is None:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_dir = os.path.join(base_dir, '.cache', 'parse')
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Bytes de las entradas según el último recorrido más lo escrito después (None: sin medir)
+        self._total_bytes: Optional[int] = None
+        self._writes_since_scan = 0
+
+    def _entry_path(self, path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8', 'surrogatepass')).hexdigest()
+        return os.path.join(self.cache_dir, key + _ENTRY_SUFFIX)
+
+    def _read_entry(self, entry_path: str):
+        """Lee una entrada; devuelve (huella_parcial, payload) o None si no es válida."""
+        try:
+            with open(entry_path, 'rb') as f:
+                raw = f.read()
+        except (IOError, OSError):
+            return None
+
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, size, mtime_ns, digest = _HEADER.unpack_from(raw)
+        if magic != _MAGIC or version != CACHE_FORMAT_VERSION:
+            return None
+
+        try:
+            path, payload = pickle.loads(zlib.decompress(raw[_HEADER.size:]))
+        except Exception:
+            # Entrada corrupta o de un formato anterior: se trata como fallo
+            return None
+        return FileFingerprint(path, size, mtime_ns, digest), payload
+
+    def lookup(self, path: str, stat_result: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+        """
+        Busca una entrada cuyo tamaño y mtime coincidan con el archivo actual.
+
+        Es la vía rápida: no necesita leer ni hashear el documento.
+
+        Returns:
+            Optional[Dict[str, Any]]: Payload guardado, o None si no hay acierto
+        """
+        entry_path = self._entry_path(path)
+        entry = self._read_entry(entry_path)
+        if entry is None:
+            return None
+
+        fingerprint, payload = entry
+        try:
+            st = stat_result or os.stat(path)
+        except OSError:
+            return None
+        if (fingerprint.path != os.path.abspath(path) or fingerprint.size != st.st_size
+                or fingerprint.mtime_ns != st.st_mtime_ns):
+            return None
+
+        self._touch(entry_path)
+        payload['content_hash'] = fingerprint.content_hash
+        return payload
+
+    def get(self, fingerprint: FileFingerprint) -> Optional[Dict[str, Any]]:
+        """
+        Busca una entrada por huella completa.
+
+        Si solo cambió el mtime pero el hash del contenido coincide (p. ej. un
+        'touch' o una copia), la entrada se reutiliza y se actualiza su huella.
+        """
+        entry_path = self._entry_path(fingerprint.path)
+        entry = self._read_entry(entry_path)
+        if entry is None:
+            return None
+
+        stored, payload = entry
+        if stored.path != fingerprint.path or stored.digest != fingerprint.digest:
+            return None
+
+        if stored != fingerprint:
+            self.put(fingerprint, payload)
+        else:
+            self._touch(entry_path)
+        payload['content_hash'] = fingerprint.content_hash
+        return payload
+
+    def put(self, fingerprint: FileFingerprint, payload: Dict[str, Any]):
+        """
+        Guarda (o reemplaza) la entrada de un archivo de forma atómica.
+
+        Args:
+            fingerprint (FileFingerprint): Huella del archivo
+            payload (Dict[str, Any]): Datos a guardar (solo tipos básicos)
+        """
+        payload = {key: value for key, value in payload.items() if key != 'content_hash'}
+        self._write_entry(self._entry_path(fingerprint.path), fingerprint, payload)
+
+    def _write_entry(self, entry_path: str, fingerprint: FileFingerprint, payload: Any):
+        """Escribe una entrada de forma atómica y aplica el presupuesto."""
+        try:
+            body = zlib.compress(pickle.dumps((fingerprint.path, payload),
+                                              protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return
+
+        header = _HEADER.pack(_MAGIC, CACHE_FORMAT_VERSION, fingerprint.size,
+                              fingerprint.mtime_ns, fingerprint.digest)
+        try:
+            old_size = os.path.getsize(entry_path)
+        except OSError:
+            old_size = 0
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(header)
+                    f.write(body)
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except (IOError, OSError, PermissionError):
+            # La caché es opcional: un error de escritura no debe romper la app
+            return
+
+        if self._total_bytes is not None:
+            self._total_bytes += len(header) + len(body) - old_size
+            self._writes_since_scan += 1
+        if (self._total_bytes is None or self._total_bytes > self.max_bytes
+                or self._writes_since_scan >= _RESCAN_WRITES):
+            self.evict(keep=entry_path)
+
+    def _artifact_path(self, kind: str, key: bytes) -> str:
+        return os.path.join(self.cache_dir, f"{kind}-{key.hex()}{_ENTRY_SUFFIX}")
+
+    def get_artifact(self, kind: str, key: bytes) -> Optional[Any]:
+        """
+        Busca un artefacto por tipo y hash del contenido del que se calculó.
+
+        Args:
+            kind (str): Tipo de artefacto (p. ej. 'clean')
+            key (bytes): Hash del contenido de origen
+
+        Returns:
+            Optional[Any]: Valor guardado, o None si no está
+        """
+        entry_path = self._artifact_path(kind, key)
+        entry = self._read_entry(entry_path)
+        if entry is None:
+            return None
+        stored, value = entry
+        if stored.path != f"{kind}:{key.hex()}" or stored.digest != key:
+            return None
+        self._touch(entry_path)
+        return value
+
+    def put_artifact(self, kind: str, key: bytes, value: Any):
+        """
+        Guarda un artefacto en su propia entrada (no toca la del documento).
+
+        Args:
+            kind (str): Tipo de artefacto
+            key (bytes): Hash (16 bytes) del contenido de origen
+            value (Any): Valor a guardar (solo tipos básicos)
+        """
+        self._write_entry(self._artifact_path(kind, key),
+                          FileFingerprint(f"{kind}:{key.hex()}", 0, 0, key), value)
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Si se pasó el presupuesto, elimina las entradas menos usadas hasta bajar de _EVICT_TARGET.
+
+        Args:
+            keep (Optional[str]): Entrada que no debe eliminarse (la recién escrita)
+        """
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(_ENTRY_SUFFIX):
+                        continue
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        except (PermissionError, OSError):
+            return
+
+        self._writes_since_scan = 0
+        self._total_bytes = total
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * _EVICT_TARGET)
+        entries.sort()
+        for _, size, entry_path in entries:
+            if entry_path == keep:
+                continue
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue  # Otro proceso pudo eliminarla antes
+            total -= size
+            if total <= target:
+                break
+        self._total_bytes = total
+
+    def clear(self):
+        """Elimina todas las entradas de la caché."""
+        self._total_bytes = None
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(_ENTRY_SUFFIX):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+        except (PermissionError, OSError):
+            pass
+
+    @staticmethod
+    def _touch(entry_path: str):
+        """Marca una entrada como usada recientemente (para el LRU)."""
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+
+_default_cache: Optional[ParseCache] = None
+
+
+def get_default_cache() -> ParseCache:
+    """Devuelve la caché compartida del proyecto (se crea al primer uso)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
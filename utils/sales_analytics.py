@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análisis de ventas sobre las tablas de la Tienda Aurelion
+
+Las cuatro tablas forman un esquema estrella: detalle_ventas es la tabla
+de hechos (cantidad e importe por línea) y ventas, productos y clientes
+son dimensiones. Los cruces se hacen con tablas hash (un array indexado
+por id cuando los ids son casi consecutivos, si no pandas Index) que
+devuelven, para cada línea de detalle, la posición de su venta y de su
+producto. Una sola pasada con numpy.bincount totaliza las líneas por
+producto y por venta; categoría, ciudad, medio de pago y mes se agrupan
+después sobre esas tablas, que son mucho más chicas. Nada recorre las
+filas en Python, así que el cálculo sigue siendo interactivo con decenas
+de millones de líneas.
+
+Las tablas se leen desde la caché columnar (csv_columnar), solo con las
+columnas necesarias. Las líneas cuyo producto, venta o cliente no existe
+en su tabla se agrupan como "(sin dato)".
+"""
+
+import os
+from typing import NamedTuple, Optional, Tuple
+
+from csv_columnar import read_csv_frame
+from csv_profile import _quick_fingerprint
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+
+# Archivo de cada tabla dentro de data/
+SALES_TABLES = {
+    'ventas': 'ventas.csv',
+    'detalle_ventas': 'detalle_ventas.csv',
+    'productos': 'productos.csv',
+    'clientes': 'clientes.csv',
+}
+MISSING_LABEL = "(sin dato)"
+TOP_PRODUCTS = 10
+
+
+class SalesSummary(NamedTuple):
+    """Indicadores de ventas; las tablas son DataFrames ordenados por ingresos."""
+    revenue: float
+    orders: int               # Ventas con al menos una línea de detalle
+    units: int
+    average_ticket: float     # Ingresos por venta
+    by_category: 'pd.DataFrame'   # categoria, ingresos, unidades
+    by_city: 'pd.DataFrame'       # ciudad, ingresos, unidades
+    by_payment: 'pd.DataFrame'    # medio_pago, ingresos, unidades
+    by_month: 'pd.DataFrame'      # mes (AAAA-MM, en orden cronológico), ingresos, unidades
+    top_products: 'pd.DataFrame'  # producto, categoria, ingresos, unidades
+
+
+def sales_fingerprint(data_dir: str) -> Optional[Tuple]:
+    """
+    Huella conjunta de las cuatro tablas (sirve como clave de caché del resumen).
+
+    Args:
+        data_dir (str): Carpeta con los CSV
+
+    Returns:
+        Optional[Tuple]: Huella, o None si falta alguna tabla
+    """
+    parts = []
+    for name in SALES_TABLES.values():
+        fingerprint = _quick_fingerprint(os.path.join(data_dir, name))
+        if fingerprint is None:
+            return None
+        parts.append((name, fingerprint['size'], fingerprint['mtime_ns'], fingerprint['sample']))
+    return tuple(parts)
+
+
+def _lookup(dimension_keys, fact_keys):
+    """Cruce hash: posición de cada clave de hechos en la dimensión (-1 si no está)."""
+    dimension_keys = np.asarray(dimension_keys)
+    fact_keys = np.asarray(fact_keys)
+    if (dimension_keys.dtype.kind in 'iu' and fact_keys.dtype.kind in 'iu' and len(dimension_keys)
+            and int(dimension_keys.max()) - int(dimension_keys.min()) <= 4 * len(dimension_keys) + 1024):
+        # Claves enteras casi consecutivas (ids): la tabla hash es un array indexado por la clave
+        low = int(dimension_keys.min())
+        table = np.full(int(dimension_keys.max()) - low + 1, -1, dtype=np.int64)
+        # Al asignar en orden inverso, con claves repetidas queda la primera aparición
+        table[dimension_keys[::-1] - low] = np.arange(len(dimension_keys) - 1, -1, -1)
+        slots = fact_keys.astype(np.int64) - low
+        inside = (slots >= 0) & (slots < len(table))
+        return np.where(inside, table[np.where(inside, slots, 0)], -1)
+
+    keys = pd.Index(dimension_keys)
+    if keys.is_unique:
+        return keys.get_indexer(fact_keys)
+    # Con claves repetidas vale la primera aparición
+    first = np.flatnonzero(~keys.duplicated(keep='first'))
+    positions = keys[first].get_indexer(fact_keys)
+    return np.where(positions >= 0, first[positions], -1)
+
+
+def _codes_through(positions, dimension_codes):
+    """Códigos de un atributo de la dimensión para cada fila de hechos (-1 si no hay cruce)."""
+    # La posición -1 cae en el último elemento agregado, que es el código -1
+    return np.append(np.asarray(dimension_codes, dtype=np.int64), -1)[positions]
+
+
+def _totals(positions, size: int, revenue, units):
+    """Ingresos y unidades por posición de la dimensión; la última casilla junta las que no cruzan."""
+    slots = np.where(positions < 0, size, positions)
+    return (np.bincount(slots, weights=revenue, minlength=size + 1),
+            np.bincount(slots, weights=units, minlength=size + 1))
+
+
+def _group(codes, labels, revenue, units, name: str, sort_by_revenue: bool = True):
+    """Suma ingresos y unidades (ya totalizados por fila de una dimensión) por código; -1 va a MISSING_LABEL."""
+    slots = np.where(codes < 0, len(labels), codes)
+    frame = pd.DataFrame({
+        name: list(labels) + [MISSING_LABEL],
+        'ingresos': np.bincount(slots, weights=revenue, minlength=len(labels) + 1),
+        'unidades': np.rint(np.bincount(slots, weights=units, minlength=len(labels) + 1)).astype(np.int64),
+    })
+    frame = frame[(frame['ingresos'] != 0) | (frame['unidades'] != 0)]
+    if sort_by_revenue:
+        frame = frame.sort_values('ingresos', ascending=False, kind='stable')
+    return frame.reset_index(drop=True)
+
+
+def compute_sales_summary(data_dir: str) -> Optional[SalesSummary]:
+    """
+    Calcula los indicadores de ventas a partir de las cuatro tablas.
+
+    Args:
+        data_dir (str): Carpeta con los CSV
+
+    Returns:
+        Optional[SalesSummary]: Resumen, o None si falta pandas o alguna tabla
+    """
+    if not PANDAS_AVAILABLE or sales_fingerprint(data_dir) is None:
+        return None
+
+    def table(name, columns):
+        return read_csv_frame(os.path.join(data_dir, SALES_TABLES[name]), columns=columns)
+
+    try:
+        detail = table('detalle_ventas', ['id_venta', 'id_producto', 'cantidad', 'importe'])
+        sales = table('ventas', ['id_venta', 'fecha', 'id_cliente', 'medio_pago'])
+        products = table('productos', ['id_producto', 'nombre_producto', 'categoria'])
+        customers = table('clientes', ['id_cliente', 'ciudad'])
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+
+    revenue = pd.to_numeric(detail['importe'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    units = pd.to_numeric(detail['cantidad'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    # Cruces: cada línea de detalle -> su producto y su venta; cada venta -> su cliente
+    product_pos = _lookup(products['id_producto'].to_numpy(), detail['id_producto'].to_numpy())
+    sale_pos = _lookup(sales['id_venta'].to_numpy(), detail['id_venta'].to_numpy())
+    customer_of_sale = _lookup(customers['id_cliente'].to_numpy(), sales['id_cliente'].to_numpy())
+
+    # Única pasada por las líneas: totales por producto y por venta (la última casilla, sin cruce).
+    # Todo lo demás se agrupa sobre esas tablas chicas.
+    product_revenue, product_units = _totals(product_pos, len(products), revenue, units)
+    sale_revenue, sale_units = _totals(sale_pos, len(sales), revenue, units)
+
+    category = pd.Categorical(products['categoria'])
+    city = pd.Categorical(customers['ciudad'])
+    payment = pd.Categorical(sales['medio_pago'])
+    months = pd.to_datetime(sales['fecha'], errors='coerce').to_numpy().astype('datetime64[M]')
+    month_codes, month_values = pd.factorize(months, sort=True)
+
+    def slot_codes(codes):
+        # Códigos alineados con las casillas de _totals (la última, sin cruce, va a MISSING_LABEL)
+        return np.append(np.asarray(codes, dtype=np.int64), -1)
+
+    by_category = _group(slot_codes(category.codes), category.categories,
+                         product_revenue, product_units, 'categoria')
+    by_city = _group(slot_codes(_codes_through(customer_of_sale, city.codes)), city.categories,
+                     sale_revenue, sale_units, 'ciudad')
+    by_payment = _group(slot_codes(payment.codes), payment.categories,
+                        sale_revenue, sale_units, 'medio_pago')
+    by_month = _group(slot_codes(month_codes),
+                      [str(month)[:7] for month in np.asarray(month_values, dtype='datetime64[M]')],
+                      sale_revenue, sale_units, 'mes', sort_by_revenue=False)
+
+    # Productos más vendidos por ingresos
+    product_revenue, product_units = product_revenue[:-1], product_units[:-1]
+    top = np.argsort(-product_revenue, kind='stable')[:TOP_PRODUCTS]
+    top = top[product_revenue[top] != 0]
+    top_products = pd.DataFrame({
+        'producto': products['nombre_producto'].to_numpy()[top],
+        'categoria': np.asarray(category.astype(object))[top],
+        'ingresos': product_revenue[top],
+        'unidades': np.rint(product_units[top]).astype(np.int64),
+    })
+
+    # Ventas distintas en el detalle: las que cruzan se marcan por posición, el resto con unique
+    seen = np.zeros(len(sales) + 1, dtype=bool)
+    seen[sale_pos] = True
+    unmatched = detail['id_venta'].to_numpy()[sale_pos < 0]
+    orders = int(seen[:-1].sum()) + int(pd.unique(unmatched).size)
+    total = float(revenue.sum())
+    return SalesSummary(
+        revenue=total,
+        orders=orders,
+        units=int(units.sum()),
+        average_ticket=total / orders if orders else 0.0,
+        by_category=by_category,
+        by_city=by_city,
+        by_payment=by_payment,
+        by_month=by_month,
+        top_products=top_products,
+    )
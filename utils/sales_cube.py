@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cubo de ventas preagregado con actualización incremental - Tienda Aurelion
+
+Guarda los ingresos, unidades y líneas de detalle sumados por celda
+(día, categoría, ciudad, medio de pago), más los totales por producto.
+El tablero consulta el cubo (unos miles de celdas) en lugar de las filas.
+
+ventas.csv y detalle_ventas.csv solo crecen agregando filas al final: el
+cubo recuerda hasta qué byte leyó cada uno y, en la siguiente
+actualización, suma solo las filas nuevas. Se reconstruye desde cero si:
+
+- Cambiaron los bytes ya leídos (se compara el hash del inicio y del
+  final de la parte ya leída; una edición en el medio que no cambie esas
+  partes ni el tamaño no se detecta).
+- Cambió productos.csv o clientes.csv (las dimensiones).
+- Llegaron ventas nuevas con un id que ya tenía líneas de detalle sin
+  venta (esas líneas se habían sumado como "(sin dato)").
+
+El cubo se guarda en <proyecto>/.cache/ (pickle comprimido con zlib,
+escritura atómica) y sobrevive a los reinicios.
+"""
+
+import io
+import os
+import pickle
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+from parse_cache import hash_bytes
+from utils import ENCODING_SAMPLE_SIZE, detect_encoding, get_project_paths
+from csv_columnar import read_csv_frame
+from csv_profile import _quick_fingerprint
+from sales_analytics import (
+    SALES_TABLES,
+    TOP_PRODUCTS,
+    SalesSummary,
+    _codes_through,
+    _group,
+    _lookup,
+    _totals
+)
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+
+CUBE_FORMAT_VERSION = 1
+CUBE_CHUNK_ROWS = 1_000_000
+CUBE_DIMENSIONS = ['dia', 'categoria', 'ciudad', 'medio_pago']
+# Día de una fecha inválida o de una venta que no existe (es el valor de NaT en datetime64)
+_MISSING_DAY = -(2 ** 63)
+# Bytes del inicio y del final de la parte ya leída que se comparan para detectar ediciones
+_CHECK_BYTES = 64 * 1024
+
+
+class _BoundedReader(io.RawIOBase):
+    """Lectura de un archivo abierto hasta un byte dado (el tamaño al empezar la lectura)."""
+
+    def __init__(self, f, end: int):
+        self._f = f
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._end - self._f.tell())
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _prefix_digests(f, offset: int) -> Dict[str, str]:
+    """Hash del inicio y del final de los primeros `offset` bytes."""
+    f.seek(0)
+    head = f.read(min(offset, _CHECK_BYTES))
+    f.seek(max(offset - _CHECK_BYTES, 0))
+    tail = f.read(min(offset, _CHECK_BYTES))
+    return {'head': hash_bytes(head).hex(), 'tail': hash_bytes(tail).hex()}
+
+
+def _read_appended(path: str, source: Optional[Dict[str, Any]], columns: List[str]):
+    """
+    Filas agregadas a un CSV desde la última lectura, por bloques.
+
+    Si el archivo no termina en salto de línea, la última fila se lee igual
+    y se recuerda: cuando el archivo crezca, si lo que sigue no es un salto
+    de línea esa fila estaba a medio escribir y hay que reconstruir.
+
+    Returns:
+        tuple: (bloques, nuevo_estado); bloques es None si los bytes ya leídos cambiaron
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if source is None:
+            encoding = detect_encoding(f.read(ENCODING_SAMPLE_SIZE))
+            f.seek(0)
+            header_line = f.readline()
+            if not header_line.endswith(b'\n'):
+                return [], None
+            header = pd.read_csv(io.BytesIO(header_line), encoding=encoding).columns.tolist()
+            source = {'offset': len(header_line), 'header': header, 'encoding': encoding,
+                      'unterminated': False}
+        elif size < source['offset'] or _prefix_digests(f, source['offset']) != source['digests']:
+            return None, None
+
+        start = source['offset']
+        if source['unterminated'] and size > start:
+            f.seek(start)
+            if f.read(1) != b'\n':
+                return None, None
+            start += 1
+
+        chunks = []
+        if size > start:
+            f.seek(start)
+            reader = io.BufferedReader(_BoundedReader(f, size))
+            chunks = list(pd.read_csv(
+                reader, header=None, names=source['header'], usecols=columns,
+                encoding=source['encoding'], chunksize=CUBE_CHUNK_ROWS
+            ))
+            f.seek(size - 1)
+            source = dict(source, offset=size, unterminated=f.read(1) != b'\n')
+        source = dict(source, digests=_prefix_digests(f, source['offset']))
+    return chunks, source
+
+
+def _day_numbers(values):
+    """Días desde 1970-01-01 (las fechas inválidas quedan como _MISSING_DAY)."""
+    days = pd.to_datetime(values, errors='coerce').to_numpy().astype('datetime64[D]')
+    return np.where(np.isnat(days), _MISSING_DAY, days.astype(np.int64))
+
+
+def _empty_cells():
+    columns = {name: np.empty(0, dtype=np.int64) for name in CUBE_DIMENSIONS}
+    columns.update(ingresos=np.empty(0), unidades=np.empty(0), lineas=np.empty(0, dtype=np.int64))
+    return pd.DataFrame(columns)
+
+
+class SalesCube:
+    """
+    Cubo de ventas de una carpeta de datos, persistido en disco.
+
+    Es seguro usarlo desde varios hilos: refresh() toma un lock y publica un
+    estado nuevo; summary() lee el estado publicado.
+
+    Args:
+        data_dir (str): Carpeta con los CSV
+        cache_path (Optional[str]): Archivo del cubo (por defecto en <proyecto>/.cache/)
+    """
+
+    def __init__(self, data_dir: str, cache_path: Optional[str] = None):
+        self.data_dir = os.path.abspath(data_dir)
+        if cache_path is None:
+            base_dir, _, _, _ = get_project_paths()
+            suffix = hash_bytes(self.data_dir.encode('utf-8', 'surrogatepass')).hex()[:12]
+            cache_path = os.path.join(base_dir, '.cache', f'sales_cube-{suffix}.pkl')
+        self.cache_path = cache_path
+        self._state: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self.last_refresh = None  # 'sin cambios', 'incremental' o 'completa'
+
+    def _path(self, table: str) -> str:
+        return os.path.join(self.data_dir, SALES_TABLES[table])
+
+    @property
+    def version(self) -> Optional[tuple]:
+        """
+        Identifica el contenido actual del cubo (sirve como clave de caché de consultas).
+
+        Incluye el hash de lo ya leído de cada tabla, no solo hasta qué byte:
+        una edición que no cambia el tamaño reconstruye el cubo y también
+        tiene que cambiar la versión.
+        """
+        state = self._state
+        if state is None:
+            return None
+        sources = tuple(
+            (source['offset'], source['digests']['head'], source['digests']['tail']) if source else None
+            for source in state['sources'].values()
+        )
+        return sources + (state['dimensions_key'],)
+
+    def refresh(self) -> bool:
+        """
+        Incorpora las filas nuevas de ventas y detalle (o reconstruye el cubo si hace falta).
+
+        Returns:
+            bool: True si el cubo está disponible (hay pandas y las cuatro tablas)
+        """
+        if not PANDAS_AVAILABLE:
+            return False
+        with self._lock:
+            state = self._state if self._state is not None else self._load()
+            dimensions_key = self._dimensions_key()
+            if dimensions_key is None:
+                return False
+
+            updated = None
+            if state is not None and state['dimensions_key'] == dimensions_key:
+                updated = self._apply_appends(state)
+                self.last_refresh = 'incremental' if updated is not state else 'sin cambios'
+            if updated is None:
+                updated = self._apply_appends(self._empty_state(dimensions_key))
+                self.last_refresh = 'completa'
+            if updated is None:
+                return False
+
+            if updated is not state:
+                self._save(updated)
+            self._state = updated
+            return True
+
+    def _dimensions_key(self) -> Optional[tuple]:
+        parts = []
+        for table in ('productos', 'clientes', 'ventas', 'detalle_ventas'):
+            if not os.path.exists(self._path(table)):
+                return None
+        for table in ('productos', 'clientes'):
+            fingerprint = _quick_fingerprint(self._path(table))
+            if fingerprint is None:
+                return None
+            parts.append((fingerprint['size'], fingerprint['mtime_ns'], fingerprint['sample']))
+        return tuple(parts)
+
+    def _empty_state(self, dimensions_key: tuple) -> Dict[str, Any]:
+        """Estado inicial: dimensiones leídas, sin ventas ni detalle consumidos."""
+        products = read_csv_frame(self._path('productos'), columns=['id_producto', 'nombre_producto', 'categoria'])
+        customers = read_csv_frame(self._path('clientes'), columns=['id_cliente', 'ciudad'])
+        category = pd.Categorical(products['categoria'])
+        city = pd.Categorical(customers['ciudad'])
+        return {
+            'format': CUBE_FORMAT_VERSION,
+            'dimensions_key': dimensions_key,
+            'sources': {'ventas': None, 'detalle_ventas': None},
+            'product_ids': products['id_producto'].to_numpy(),
+            'product_names': products['nombre_producto'].to_numpy(dtype=object),
+            'product_categories': np.asarray(category.codes, dtype=np.int64),
+            'categories': list(category.categories),
+            'customer_ids': customers['id_cliente'].to_numpy(),
+            'customer_cities': np.asarray(city.codes, dtype=np.int64),
+            'cities': list(city.categories),
+            'payments': [],
+            # Una fila por venta leída
+            'sale_ids': np.empty(0, dtype=np.int64),
+            'sale_days': np.empty(0, dtype=np.int64),
+            'sale_cities': np.empty(0, dtype=np.int64),
+            'sale_payments': np.empty(0, dtype=np.int64),
+            'sale_seen': np.empty(0, dtype=bool),       # True si ya tiene líneas de detalle
+            'unmatched_sale_ids': np.empty(0, dtype=np.int64),
+            'product_revenue': np.zeros(len(products) + 1),
+            'product_units': np.zeros(len(products) + 1),
+            'cells': _empty_cells(),
+        }
+
+    def _apply_appends(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Suma las filas nuevas sobre una copia del estado.
+
+        Returns:
+            Optional[Dict[str, Any]]: Estado nuevo, el mismo si no hubo filas nuevas, o None si hay que reconstruir
+        """
+        sales_chunks, sales_source = _read_appended(
+            self._path('ventas'), state['sources']['ventas'], ['id_venta', 'fecha', 'id_cliente', 'medio_pago'])
+        detail_chunks, detail_source = _read_appended(
+            self._path('detalle_ventas'), state['sources']['detalle_ventas'],
+            ['id_venta', 'id_producto', 'cantidad', 'importe'])
+        if sales_chunks is None or detail_chunks is None:
+            return None
+        if (sales_source == state['sources']['ventas']
+                and detail_source == state['sources']['detalle_ventas']):
+            return state
+
+        state = dict(state, sources={'ventas': sales_source, 'detalle_ventas': detail_source})
+        for chunk in sales_chunks:
+            if not self._add_sales(state, chunk):
+                return None
+        for chunk in detail_chunks:
+            self._add_detail(state, chunk)
+        return state
+
+    def _add_sales(self, state: Dict[str, Any], chunk) -> bool:
+        """Agrega ventas nuevas; False si alguna tenía líneas ya sumadas sin venta."""
+        # Una venta sin id no puede cruzar con ninguna línea
+        ids = pd.to_numeric(chunk['id_venta'], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+        if len(state['unmatched_sale_ids']) and np.isin(ids, state['unmatched_sale_ids']).any():
+            return False
+
+        # Códigos de medio de pago: los valores nuevos se agregan al final de la lista
+        payments = list(state['payments'])
+        known = {value: code for code, value in enumerate(payments)}
+        chunk_codes, chunk_values = pd.factorize(chunk['medio_pago'].astype(object))
+        mapping = np.empty(len(chunk_values) + 1, dtype=np.int64)
+        mapping[-1] = -1
+        for position, value in enumerate(chunk_values):
+            value = str(value)
+            if value not in known:
+                known[value] = len(payments)
+                payments.append(value)
+            mapping[position] = known[value]
+        payment_codes = mapping[chunk_codes]
+
+        customers = _lookup(state['customer_ids'], chunk['id_cliente'].to_numpy())
+        state['payments'] = payments
+        state['sale_ids'] = np.concatenate([state['sale_ids'], ids])
+        state['sale_days'] = np.concatenate([state['sale_days'], _day_numbers(chunk['fecha'])])
+        state['sale_cities'] = np.concatenate(
+            [state['sale_cities'], _codes_through(customers, state['customer_cities'])])
+        state['sale_payments'] = np.concatenate([state['sale_payments'], payment_codes])
+        state['sale_seen'] = np.concatenate([state['sale_seen'], np.zeros(len(ids), dtype=bool)])
+        return True
+
+    def _add_detail(self, state: Dict[str, Any], chunk):
+        """Suma líneas de detalle nuevas en las celdas del cubo y en los totales por producto."""
+        revenue = pd.to_numeric(chunk['importe'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        units = pd.to_numeric(chunk['cantidad'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        sale_ids = chunk['id_venta'].to_numpy()
+        product_pos = _lookup(state['product_ids'], chunk['id_producto'].to_numpy())
+        sale_pos = _lookup(state['sale_ids'], sale_ids)
+
+        product_revenue, product_units = _totals(product_pos, len(state['product_ids']), revenue, units)
+        state['product_revenue'] = state['product_revenue'] + product_revenue
+        state['product_units'] = state['product_units'] + product_units
+
+        seen = state['sale_seen'].copy()
+        seen[sale_pos[sale_pos >= 0]] = True
+        state['sale_seen'] = seen
+        unmatched = sale_ids[sale_pos < 0]
+        if len(unmatched):
+            state['unmatched_sale_ids'] = np.union1d(state['unmatched_sale_ids'],
+                                                     pd.to_numeric(unmatched, errors='coerce'))
+
+        days = np.append(state['sale_days'], _MISSING_DAY)[sale_pos]
+        lines = pd.DataFrame({
+            'dia': days,
+            'categoria': _codes_through(product_pos, state['product_categories']),
+            'ciudad': _codes_through(sale_pos, state['sale_cities']),
+            'medio_pago': _codes_through(sale_pos, state['sale_payments']),
+            'ingresos': revenue,
+            'unidades': units,
+            'lineas': np.ones(len(chunk), dtype=np.int64),
+        })
+        cells = pd.concat([state['cells'], lines], ignore_index=True)
+        state['cells'] = cells.groupby(CUBE_DIMENSIONS, sort=False, as_index=False).sum()
+
+    def summary(self) -> Optional[SalesSummary]:
+        """
+        Indicadores del tablero calculados sobre el cubo (llamar antes a refresh()).
+
+        Returns:
+            Optional[SalesSummary]: Resumen, o None si el cubo no está disponible
+        """
+        state = self._state
+        if state is None:
+            return None
+
+        cells = state['cells']
+        revenue = cells['ingresos'].to_numpy()
+        units = cells['unidades'].to_numpy()
+        days = cells['dia'].to_numpy()
+        months = np.where(days == _MISSING_DAY, np.datetime64('NaT'),
+                          days.astype('datetime64[D]')).astype('datetime64[M]')
+        month_codes, month_values = pd.factorize(months, sort=True)
+
+        product_revenue = state['product_revenue'][:-1]
+        product_units = state['product_units'][:-1]
+        top = np.argsort(-product_revenue, kind='stable')[:TOP_PRODUCTS]
+        top = top[product_revenue[top] != 0]
+        categories = np.append(np.asarray(state['categories'], dtype=object), None)
+        top_products = pd.DataFrame({
+            'producto': state['product_names'][top],
+            'categoria': categories[state['product_categories'][top]],
+            'ingresos': product_revenue[top],
+            'unidades': np.rint(product_units[top]).astype(np.int64),
+        })
+
+        orders = int(state['sale_seen'].sum()) + len(state['unmatched_sale_ids'])
+        total = float(revenue.sum())
+        return SalesSummary(
+            revenue=total,
+            orders=orders,
+            units=int(np.rint(units.sum())),
+            average_ticket=total / orders if orders else 0.0,
+            by_category=_group(cells['categoria'].to_numpy(), state['categories'], revenue, units, 'categoria'),
+            by_city=_group(cells['ciudad'].to_numpy(), state['cities'], revenue, units, 'ciudad'),
+            by_payment=_group(cells['medio_pago'].to_numpy(), state['payments'], revenue, units, 'medio_pago'),
+            by_month=_group(month_codes,
+                            [str(month)[:7] for month in np.asarray(month_values, dtype='datetime64[M]')],
+                            revenue, units, 'mes', sort_by_revenue=False),
+            top_products=top_products,
+        )
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.cache_path, 'rb') as f:
+                state = pickle.loads(zlib.decompress(f.read()))
+        except (IOError, OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get('format') != CUBE_FORMAT_VERSION:
+            return None
+        return state
+
+    def _save(self, state: Dict[str, Any]):
+        """Guarda el cubo de forma atómica; si no se puede escribir, queda solo en memoria."""
+        try:
+            data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.cache_path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except (IOError, OSError, pickle.PicklingError):
+            return
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de búsqueda de texto completo por secciones - Tienda Aurelion
+
+Índice invertido en memoria que se construye una vez por documento y
+permite consultas con ranking BM25, frases exactas ("entre comillas"),
+prefijos (palabra*) y extracción de fragmentos con las coincidencias
+resaltadas.
+
+El tokenizador ignora mayúsculas y acentos, de modo que "seccion"
+encuentra "sección" y "ANALISIS" encuentra "análisis".
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+_WORD_RE = re.compile(r'\w+')
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Parámetros estándar de BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _build_fold_table() -> Dict[int, str]:
+    """
+    Tabla para str.translate que quita acentos sin cambiar la longitud del texto.
+
+    Conservar la longitud permite usar las posiciones del texto normalizado
+    para resaltar las coincidencias en el texto original.
+    """
+    table = {}
+    for codepoint in range(0x80, 0x250):
+        char = chr(codepoint)
+        base = ''.join(c for c in unicodedata.normalize('NFD', char)
+                       if not unicodedata.combining(c))
+        if len(base) == 1 and base != char:
+            table[codepoint] = base.lower()
+    table[0x130] = 'i'  # 'İ'.lower() tiene dos caracteres
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_text(text: str) -> str:
+    """
+    Normaliza un texto para buscar: minúsculas y sin acentos.
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        str: Texto normalizado, con la misma longitud que el original
+    """
+    return text.translate(_FOLD_TABLE).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Divide un texto en palabras normalizadas (minúsculas y sin acentos)."""
+    return _WORD_RE.findall(fold_text(text))
+
+
+class SearchHit(NamedTuple):
+    """Resultado de búsqueda: sección, puntuación y fragmento resaltado."""
+    section: str
+    score: float
+    snippet: str
+    line: int  # Línea (dentro de la sección) de la primera coincidencia
+
+
+class _Query(NamedTuple):
+    terms: List[str]             # Palabras sueltas
+    prefixes: List[str]          # Palabras terminadas en '*'
+    phrases: List[List[str]]     # Frases entre comillas
+
+
+def parse_query(query: str) -> _Query:
+    """
+    Interpreta una consulta: palabras, "frases exactas" y prefijos*.
+
+    Args:
+        query (str): Texto escrito por el usuario
+
+    Returns:
+        _Query: Consulta separada en términos, prefijos y frases
+    """
+    terms, prefixes, phrases = [], [], []
+    for phrase, word in _QUERY_RE.findall(query):
+        if phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) > 1:
+                phrases.append(tokens)
+            else:
+                terms.extend(tokens)
+        elif word.endswith('*'):
+            prefixes.extend(tokenize(word[:-1])[:1])
+        else:
+            terms.extend(tokenize(word))
+    return _Query(terms, prefixes, phrases)
+
+
+class SearchIndex:
+    """
+    Índice invertido por secciones con posiciones de cada palabra.
+
+    Args:
+        sections (Mapping[str, str]): {nombre_seccion: contenido}, p. ej. Outline.sections()
+    """
+
+    def __init__(self, sections: Mapping):
+        self._sections = sections
+        self._names: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._lengths = array('I')
+        # Offset (en caracteres) de cada palabra; se calcula solo para las secciones
+        # que aparecen en resultados y se conserva para las siguientes búsquedas
+        self._offsets: Dict[int, array] = {}
+        self._title_tokens = array('I')
+        # palabra -> {id_seccion: posiciones}
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+        for name, content in sections.items():
+            self._add(name, content)
+        self._update_norms()
+
+    def _add(self, name: str, content: str):
+        """Indexa una sección con un id nuevo."""
+        doc_id = len(self._names)
+        self._names.append(name)
+        self._ids[name] = doc_id
+        # El nombre de la sección también es buscable: ocupa las primeras posiciones
+        title_tokens = tokenize(name)
+        tokens = title_tokens + tokenize(content)
+
+        # Agrupar posiciones por palabra dentro de la sección y luego volcarlas
+        local: Dict[str, List[int]] = {}
+        for position, token in enumerate(tokens):
+            positions = local.get(token)
+            if positions is None:
+                local[token] = [position]
+            else:
+                positions.append(position)
+        for token, positions in local.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+            postings[doc_id] = positions
+
+        self._title_tokens.append(len(title_tokens))
+        self._lengths.append(len(tokens))
+
+    def _remove(self, doc_id: int, content: str):
+        """Quita una sección del índice; su id queda libre y sin palabras."""
+        for token in set(tokenize(self._names[doc_id])).union(tokenize(content)):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._names[doc_id] = None
+        self._lengths[doc_id] = 0
+        self._offsets.pop(doc_id, None)
+
+    def _update_norms(self):
+        live = len(self._ids)
+        avg_length = sum(self._lengths) / live if live else 1.0
+        # Normalización por largo de BM25, precalculada por sección
+        self._norms = [BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1.0))
+                       for length in self._lengths]
+
+    def update(self, sections: Mapping, changed: Iterable[str]):
+        """
+        Actualiza el índice tras una edición del documento.
+
+        Solo se vuelven a tokenizar las secciones indicadas; el resto conserva
+        sus palabras y los offsets ya calculados para los fragmentos.
+
+        Args:
+            sections (Mapping[str, str]): Secciones de la versión nueva del documento
+            changed (Iterable[str]): Secciones modificadas, agregadas o eliminadas
+        """
+        changed = list(dict.fromkeys(changed))
+        old_sections = self._sections
+        for name in changed:
+            doc_id = self._ids.pop(name, None)
+            if doc_id is not None:
+                self._remove(doc_id, old_sections[name])
+
+        self._sections = sections
+        for name in changed:
+            if name in sections:
+                self._add(name, sections[name])
+        self._vocabulary = None
+        self._update_norms()
+
+    def copy(self) -> 'SearchIndex':
+        """
+        Copia independiente del índice, sin volver a tokenizar.
+
+        Permite actualizar un índice compartido entre hilos sin modificar el
+        que otros están consultando (se actualiza la copia y luego se publica).
+
+        Returns:
+            SearchIndex: Índice con las mismas secciones y palabras
+        """
+        clone = SearchIndex.__new__(SearchIndex)
+        clone._sections = self._sections
+        clone._names = list(self._names)
+        clone._ids = dict(self._ids)
+        clone._lengths = array('I', self._lengths)
+        # Los offsets ya calculados no cambian: se comparten los mismos arrays
+        clone._offsets = dict(self._offsets)
+        clone._title_tokens = array('I', self._title_tokens)
+        clone._postings = {token: dict(postings) for token, postings in self._postings.items()}
+        clone._vocabulary = self._vocabulary
+        clone._norms = list(self._norms)
+        return clone
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _idf(self, term: str) -> float:
+        n_docs = len(self._ids)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _term_scores(self, term: str, counts: Dict[int, int]) -> Dict[int, float]:
+        """Puntuación BM25 de un término para cada sección según su frecuencia."""
+        idf = self._idf(term)
+        norms = self._norms
+        factor = idf * (BM25_K1 + 1)
+        return {doc_id: factor * tf / (tf + norms[doc_id]) for doc_id, tf in counts.items()}
+
+    def expand_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        """Devuelve las palabras del índice que empiezan por un prefijo."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        matches = []
+        for term in vocabulary[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _phrase_positions(self, phrase: List[str]) -> Dict[int, List[int]]:
+        """Secciones que contienen la frase exacta -> posiciones de inicio."""
+        first = self._postings.get(phrase[0])
+        if not first:
+            return {}
+        others = [self._postings.get(term) for term in phrase[1:]]
+        if not all(others):
+            return {}
+
+        result = {}
+        for doc_id, positions in first.items():
+            if not all(doc_id in postings for postings in others):
+                continue
+            following = [set(postings[doc_id]) for postings in others]
+            starts = [
+                start for start in positions
+                if all(start + offset + 1 in following[offset] for offset in range(len(following)))
+            ]
+            if starts:
+                result[doc_id] = starts
+        return result
+
+    def search(self, query: str, limit: int = 20,
+               highlight: Tuple[str, str] = ('**', '**')) -> List[SearchHit]:
+        """
+        Busca secciones que contengan todos los elementos de la consulta.
+
+        Args:
+            query (str): Palabras, "frases exactas" y/o prefijos*
+            limit (int): Cantidad máxima de resultados
+            highlight (Tuple[str, str]): Marcas para resaltar las coincidencias
+
+        Returns:
+            List[SearchHit]: Resultados ordenados por relevancia (BM25)
+        """
+        parsed = parse_query(query)
+        # Cada elemento de la consulta aporta {id_seccion: puntuación}
+        clauses: List[Dict[int, float]] = []
+        term_postings = []
+
+        for term in parsed.terms:
+            postings = self._postings.get(term, {})
+            clauses.append(self._term_scores(term, {d: len(p) for d, p in postings.items()}))
+            term_postings.append(postings)
+
+        for prefix in parsed.prefixes:
+            scores: Dict[int, float] = {}
+            for term in self.expand_prefix(prefix):
+                postings = self._postings[term]
+                for doc_id, score in self._term_scores(term, {d: len(p) for d, p in postings.items()}).items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+                term_postings.append(postings)
+            clauses.append(scores)
+
+        phrase_hits = []
+        for phrase in parsed.phrases:
+            found = self._phrase_positions(phrase)
+            counts = {doc_id: len(starts) for doc_id, starts in found.items()}
+            scores = {}
+            for term in phrase:
+                for doc_id, score in self._term_scores(term, counts).items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+            clauses.append(scores)
+            phrase_hits.append((found, len(phrase)))
+
+        if not clauses:
+            return []
+
+        # Todas las condiciones deben cumplirse (AND): se parte de la más selectiva
+        clauses.sort(key=len)
+        candidates = set(clauses[0])
+        for clause in clauses[1:]:
+            candidates &= clause.keys()
+            if not candidates:
+                return []
+
+        total = {doc_id: sum(clause[doc_id] for clause in clauses) for doc_id in candidates}
+        hits = []
+        for doc_id in heapq.nlargest(limit, total, key=total.get):
+            # Posiciones a resaltar: (posición_inicial, cantidad_de_palabras)
+            marks = [(position, 1) for postings in term_postings for position in postings.get(doc_id, ())]
+            marks.extend((position, size) for found, size in phrase_hits for position in found.get(doc_id, ()))
+
+            name = self._names[doc_id]
+            snippet, line = self._snippet(doc_id, self._sections[name], marks, highlight)
+            hits.append(SearchHit(name, total[doc_id], snippet, line))
+        return hits
+
+    def _snippet(self, doc_id: int, text: str, marks: List[Tuple[int, int]],
+                 highlight: Tuple[str, str]) -> Tuple[str, int]:
+        """Convierte posiciones de palabras en rangos de texto y arma el fragmento."""
+        title_tokens = self._title_tokens[doc_id]
+        offsets = self._offsets.get(doc_id)
+        if offsets is None:
+            offsets = array('I', [0] * title_tokens)
+            offsets.extend(match.start() for match in _WORD_RE.finditer(fold_text(text)))
+            self._offsets[doc_id] = offsets
+        spans = []
+        for position, size in sorted(marks):
+            if position < title_tokens:
+                continue  # Coincidencia en el nombre de la sección
+            last_start = offsets[position + size - 1]
+            last_word = _WORD_RE.match(fold_text(text[last_start:last_start + 64]))
+            spans.append((offsets[position], last_start + len(last_word.group())))
+        return make_snippet(text, spans, highlight)
+
+
+def make_snippet(text: str, spans: List[Tuple[int, int]], highlight: Tuple[str, str] = ('**', '**'),
+                 width: int = 160) -> Tuple[str, int]:
+    """
+    Extrae un fragmento alrededor de la primera coincidencia y la resalta.
+
+    Args:
+        text (str): Contenido de la sección
+        spans (List[Tuple[int, int]]): Rangos (inicio, fin) de las coincidencias, ordenados
+        highlight (Tuple[str, str]): Marcas de apertura y cierre
+        width (int): Largo aproximado del fragmento
+
+    Returns:
+        Tuple[str, int]: (fragmento, número de línea de la primera coincidencia)
+    """
+    if not spans:
+        return text[:width].replace('\n', ' ').strip(), 1
+
+    first_start = spans[0][0]
+    start = max(0, first_start - width // 3)
+    end = min(len(text), start + width)
+    # Ajustar los bordes a límites de palabra
+    if start > 0:
+        space = text.find(' ', start, first_start)
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(' ', first_start, end)
+        end = space if space > first_start else end
+
+    opening, closing = highlight
+    pieces = []
+    cursor = start
+    for match_start, match_end in spans:
+        if match_start < cursor:
+            continue  # Solapada con la anterior (p. ej. palabra dentro de una frase)
+        if match_end > end:
+            break
+        pieces.append(text[cursor:match_start])
+        pieces.append(opening + text[match_start:match_end] + closing)
+        cursor = match_end
+    pieces.append(text[cursor:end])
+
+    snippet = ''.join(pieces).replace('\n', ' ').strip()
+    if start > 0:
+        snippet = '…' + snippet
+    if end < len(text):
+        snippet += '…'
+    return snippet, text.count('\n', 0, first_start) + 1
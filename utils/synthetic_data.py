@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de datos y documentos sintéticos para pruebas de escala - Tienda Aurelion
+
+Produce, a partir de una semilla:
+
+- Las cuatro tablas (clientes, productos, ventas, detalle_ventas) con los
+  mismos esquemas que data/ e integridad referencial, de cientos a
+  cientos de millones de filas.
+- Corpus de documentos Markdown con la cantidad de archivos, tamaño,
+  profundidad de encabezados, tablas, bloques de código e imágenes que
+  se pidan.
+
+Todo se escribe en disco por bloques: la memoria usada no depende del
+tamaño pedido. Los atributos de cada cliente y producto (nombre, ciudad,
+categoría, precio) se derivan de su id con una función hash sembrada, así
+que ventas y detalle los repiten sin tener que guardar las tablas en
+memoria. La misma semilla siempre genera los mismos archivos.
+
+Uso:
+    python utils/synthetic_data.py ventas carpeta/ --detalle 10000000
+    python utils/synthetic_data.py markdown carpeta/ --archivos 20 --bytes 1000000
+"""
+
+import argparse
+import os
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+
+DEFAULT_SEED = 42
+BLOCK_ROWS = 100_000
+
+FIRST_NAMES = [
+    'Mariana', 'Nicolas', 'Hernan', 'Uma', 'Agustina', 'Bruno', 'Elena', 'Karina', 'Olivia',
+    'Guadalupe', 'Emilia', 'Zoe', 'Lucas', 'Martina', 'Tomas', 'Valentina', 'Diego', 'Camila',
+    'Santiago', 'Julieta',
+]
+LAST_NAMES = [
+    'Lopez', 'Rojas', 'Martinez', 'Flores', 'Castro', 'Rodriguez', 'Acosta', 'Perez', 'Romero',
+    'Gomez', 'Fernandez', 'Diaz', 'Sosa', 'Torres', 'Alvarez', 'Ruiz',
+]
+CITIES = ['Carlos Paz', 'Rio Cuarto', 'Cordoba', 'Alta Gracia', 'Villa Maria', 'Mendiolaza']
+CATEGORIES = ['Alimentos', 'Limpieza']
+PAYMENT_METHODS = ['efectivo', 'qr', 'tarjeta', 'transferencia']
+PRODUCT_NAMES = [
+    'Coca Cola 1.5L', 'Pepsi 1.5L', 'Aceite de Girasol 1L', 'Yerba Mate Suave 1kg', 'Queso Rallado 150g',
+    'Desodorante Aerosol', 'Pizza Congelada Muzzarella', 'Ron 700ml', 'Energética Nitro 500ml',
+    'Chicle Menta', 'Caramelos Masticables', 'Vino Blanco 750ml', 'Hamburguesas Congeladas x4',
+    'Toallas Húmedas x50', 'Aceitunas Negras 200g', 'Yogur Natural 200g', 'Detergente 750ml',
+    'Lavandina 1L', 'Galletitas de Agua', 'Arroz Largo Fino 1kg',
+]
+_WORDS = (
+    'datos ventas cliente producto análisis tienda archivo columna fila registro importe cantidad '
+    'precio categoría ciudad medio pago fecha resumen informe consulta documento sección tabla '
+    'estructura calidad proceso resultado valor total promedio mensual'
+).split()
+
+
+def _mix(ids, salt: int):
+    """Hash splitmix64 de cada id: un valor pseudoaleatorio fijo para (semilla, id)."""
+    with np.errstate(over='ignore'):
+        z = np.asarray(ids, dtype=np.uint64) + np.uint64(salt) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _pick(values: List[str], ids, salt: int):
+    """Elige un valor de la lista para cada id (siempre el mismo para el mismo id y semilla)."""
+    return np.asarray(values, dtype=object)[_mix(ids, salt) % np.uint64(len(values))]
+
+
+def _customer_attributes(ids, seed: int):
+    first = _pick(FIRST_NAMES, ids, seed * 8 + 1)
+    last = _pick(LAST_NAMES, ids, seed * 8 + 2)
+    names = first + ' ' + last
+    emails = pd.Series(first + '.' + last).str.lower().to_numpy(dtype=object) + '@mail.com'
+    return names, emails
+
+
+def _product_prices(ids, seed: int):
+    return (_mix(ids, seed * 8 + 3) % np.uint64(4500)).astype(np.int64) + 500
+
+
+def _write_blocks(path: str, total: int, block_rows: int, make_block):
+    """Escribe un CSV por bloques; make_block(inicio, fin) devuelve el DataFrame de esas filas."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, max(total, 1), block_rows):
+            block = make_block(start, min(start + block_rows, total))
+            block.to_csv(f, index=False, header=start == 0, lineterminator='\n')
+
+
+def generate_sales_data(out_dir: str, detail_rows: int = 1_000_000, sales: Optional[int] = None,
+                        customers: Optional[int] = None, products: Optional[int] = None,
+                        seed: int = DEFAULT_SEED, block_rows: int = BLOCK_ROWS) -> Dict[str, str]:
+    """
+    Genera las cuatro tablas de la tienda con integridad referencial.
+
+    Cada venta tiene al menos una línea de detalle (si detail_rows >= sales),
+    las ventas están ordenadas por id y fecha, y nombre, email y precio se
+    repiten de forma consistente entre tablas.
+
+    Args:
+        out_dir (str): Carpeta de salida (se crea si no existe)
+        detail_rows (int): Líneas de detalle_ventas.csv
+        sales (Optional[int]): Ventas (por defecto un tercio de las líneas)
+        customers (Optional[int]): Clientes (por defecto una venta de cada diez, hasta 1.000.000)
+        products (Optional[int]): Productos (por defecto 100)
+        seed (int): Semilla
+        block_rows (int): Filas por bloque escrito (acota la memoria)
+
+    Returns:
+        Dict[str, str]: Ruta de cada tabla generada, o {} si falta pandas
+    """
+    if not PANDAS_AVAILABLE:
+        return {}
+
+    sales = sales if sales is not None else max(1, detail_rows // 3)
+    customers = customers if customers is not None else max(1, min(sales // 10, 1_000_000))
+    products = products if products is not None else 100
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {name: os.path.join(out_dir, f'{name}.csv')
+             for name in ('clientes', 'productos', 'ventas', 'detalle_ventas')}
+    # Un generador independiente por tabla: cambiar el tamaño de una no altera las otras
+    streams = np.random.SeedSequence(seed).spawn(2)
+    start_day = np.datetime64('2023-01-01')
+
+    def customer_block(start, end):
+        ids = np.arange(start + 1, end + 1, dtype=np.int64)
+        names, emails = _customer_attributes(ids, seed)
+        return pd.DataFrame({
+            'id_cliente': ids,
+            'nombre_cliente': names,
+            'email': emails,
+            'ciudad': _pick(CITIES, ids, seed * 8 + 4),
+            'fecha_alta': (start_day + (_mix(ids, seed * 8 + 5) % np.uint64(365)).astype('timedelta64[D]')).astype(str),
+        })
+
+    def product_block(start, end):
+        ids = np.arange(start + 1, end + 1, dtype=np.int64)
+        base = _pick(PRODUCT_NAMES, ids, seed * 8 + 6)
+        # Nombres únicos cuando hay más productos que nombres base
+        names = np.where(ids <= len(PRODUCT_NAMES), base, base + ' #' + ids.astype(str).astype(object))
+        return pd.DataFrame({
+            'id_producto': ids,
+            'nombre_producto': names,
+            'categoria': _pick(CATEGORIES, ids, seed * 8 + 7),
+            'precio_unitario': _product_prices(ids, seed),
+        })
+
+    sales_rng = np.random.default_rng(streams[0])
+
+    def sales_block(start, end):
+        ids = np.arange(start + 1, end + 1, dtype=np.int64)
+        # Fechas no decrecientes a lo largo del archivo (como una exportación diaria)
+        days = (ids * 365 // max(sales, 1)).astype('timedelta64[D]')
+        customer_ids = sales_rng.integers(1, customers + 1, len(ids))
+        names, emails = _customer_attributes(customer_ids, seed)
+        return pd.DataFrame({
+            'id_venta': ids,
+            'fecha': (np.datetime64('2024-01-01') + days).astype(str),
+            'id_cliente': customer_ids,
+            'nombre_cliente': names,
+            'email': emails,
+            'medio_pago': np.asarray(PAYMENT_METHODS, dtype=object)[sales_rng.integers(0, len(PAYMENT_METHODS), len(ids))],
+        })
+
+    detail_rng = np.random.default_rng(streams[1])
+
+    def detail_block(start, end):
+        rows = np.arange(start, end, dtype=np.int64)
+        product_ids = detail_rng.integers(1, products + 1, len(rows))
+        quantities = detail_rng.integers(1, 6, len(rows))
+        prices = _product_prices(product_ids, seed)
+        base = _pick(PRODUCT_NAMES, product_ids, seed * 8 + 6)
+        names = np.where(product_ids <= len(PRODUCT_NAMES), base,
+                         base + ' #' + product_ids.astype(str).astype(object))
+        return pd.DataFrame({
+            # Las líneas se reparten en orden entre las ventas: cada venta tiene al menos una
+            'id_venta': rows * sales // max(detail_rows, 1) + 1,
+            'id_producto': product_ids,
+            'nombre_producto': names,
+            'cantidad': quantities,
+            'precio_unitario': prices,
+            'importe': quantities * prices,
+        })
+
+    _write_blocks(paths['clientes'], customers, block_rows, customer_block)
+    _write_blocks(paths['productos'], products, block_rows, product_block)
+    _write_blocks(paths['ventas'], sales, block_rows, sales_block)
+    _write_blocks(paths['detalle_ventas'], detail_rows, block_rows, detail_block)
+    return paths
+
+
+def _paragraph(rng, words: int) -> str:
+    text = ' '.join(np.asarray(_WORDS, dtype=object)[rng.integers(0, len(_WORDS), words)])
+    return text[0].upper() + text[1:] + '.'
+
+
+def _section_body(rng, number: int, table_every: int, code_every: int, image_every: int) -> str:
+    """Contenido de una sección: párrafos, lista y, cada tanto, tabla, código o imagen."""
+    parts = [_paragraph(rng, int(rng.integers(20, 80))) for _ in range(int(rng.integers(1, 4)))]
+    parts.append('\n'.join(f"- {_paragraph(rng, int(rng.integers(3, 10)))}" for _ in range(3)))
+    if table_every and number % table_every == 0:
+        rows = [f"| {i} | {CITIES[i % len(CITIES)]} | {int(rng.integers(100, 10000))} |" for i in range(1, 6)]
+        parts.append('\n'.join(['| id | ciudad | importe |', '|---|---|---|'] + rows))
+    if code_every and number % code_every == 0:
+        # El comentario con # dentro del bloque no debe tomarse como encabezado
+        parts.append("```python\n# Cargar datos\nimport pandas as pd\n"
+                     f"df = pd.read_csv('ventas.csv')\nprint(df.head({number % 10 + 1}))\n```")
+    if image_every and number % image_every == 0:
+        parts.append("![Diagrama de flujo](../images/diagrama-flujo.png)")
+    return '\n\n'.join(parts)
+
+
+def generate_markdown_file(path: str, target_bytes: int = 100_000, depth: int = 3,
+                           table_every: int = 4, code_every: int = 5, image_every: int = 10,
+                           seed: int = DEFAULT_SEED) -> int:
+    """
+    Escribe un documento Markdown sintético de aproximadamente `target_bytes`.
+
+    Los encabezados recorren los niveles 1 a `depth` (# título, ## secciones,
+    ### subsecciones...), de modo que el árbol tiene esa profundidad.
+
+    Args:
+        path (str): Archivo de salida
+        target_bytes (int): Tamaño aproximado (se termina la sección en curso)
+        depth (int): Niveles de encabezado (1 a 6)
+        table_every (int): Una tabla cada tantas secciones (0 = ninguna)
+        code_every (int): Un bloque de código cada tantas secciones (0 = ninguno)
+        image_every (int): Una imagen cada tantas secciones (0 = ninguna)
+        seed (int): Semilla
+
+    Returns:
+        int: Bytes escritos (0 si falta numpy)
+    """
+    if not PANDAS_AVAILABLE:
+        return 0
+
+    rng = np.random.default_rng(seed)
+    depth = max(1, min(depth, 6))
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        title = f"# Documento sintético {seed}\n\n{_paragraph(rng, 30)}\n\n"
+        f.write(title)
+        written += len(title.encode('utf-8'))
+        number = 0
+        while written < target_bytes:
+            number += 1
+            # Niveles 2..depth en ciclo (o 1 si solo se pidió un nivel)
+            level = 1 if depth == 1 else 2 + (number - 1) % (depth - 1)
+            chunk = (f"{'#' * level} Sección {number}: {_WORDS[number % len(_WORDS)]}\n\n"
+                     f"{_section_body(rng, number, table_every, code_every, image_every)}\n\n")
+            f.write(chunk)
+            written += len(chunk.encode('utf-8'))
+    return written
+
+
+def generate_markdown_corpus(out_dir: str, files: int = 10, bytes_per_file: int = 100_000,
+                             depth: int = 3, table_every: int = 4, code_every: int = 5,
+                             image_every: int = 10, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    Genera una carpeta de documentos Markdown sintéticos (uno por semilla derivada).
+
+    Args:
+        out_dir (str): Carpeta de salida (se crea si no existe)
+        files (int): Cantidad de archivos
+        bytes_per_file (int): Tamaño aproximado de cada archivo
+        depth (int): Niveles de encabezado
+        table_every (int): Una tabla cada tantas secciones
+        code_every (int): Un bloque de código cada tantas secciones
+        image_every (int): Una imagen cada tantas secciones
+        seed (int): Semilla
+
+    Returns:
+        List[str]: Rutas de los archivos generados
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for number in range(files):
+        path = os.path.join(out_dir, f'documento_{number + 1:04d}.md')
+        generate_markdown_file(path, bytes_per_file, depth, table_every, code_every, image_every,
+                               seed=seed * 100_003 + number)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos y documentos sintéticos de la Tienda Aurelion")
+    parser.add_argument('--semilla', type=int, default=DEFAULT_SEED)
+    commands = parser.add_subparsers(dest='comando', required=True)
+
+    sales_parser = commands.add_parser('ventas', help="CSVs de clientes, productos, ventas y detalle")
+    sales_parser.add_argument('carpeta')
+    sales_parser.add_argument('--detalle', type=int, default=1_000_000, help="Líneas de detalle_ventas")
+    sales_parser.add_argument('--ventas', type=int, default=None)
+    sales_parser.add_argument('--clientes', type=int, default=None)
+    sales_parser.add_argument('--productos', type=int, default=None)
+
+    markdown_parser = commands.add_parser('markdown', help="Corpus de documentos Markdown")
+    markdown_parser.add_argument('carpeta')
+    markdown_parser.add_argument('--archivos', type=int, default=10)
+    markdown_parser.add_argument('--bytes', type=int, default=100_000, help="Tamaño aproximado de cada archivo")
+    markdown_parser.add_argument('--profundidad', type=int, default=3)
+    markdown_parser.add_argument('--tablas', type=int, default=4, help="Una tabla cada N secciones (0 = ninguna)")
+    markdown_parser.add_argument('--codigo', type=int, default=5, help="Un bloque de código cada N secciones")
+    markdown_parser.add_argument('--imagenes', type=int, default=10, help="Una imagen cada N secciones")
+
+    args = parser.parse_args()
+    if not PANDAS_AVAILABLE:
+        print("❌ Se necesitan numpy y pandas: pip install pandas")
+        return
+    if args.comando == 'ventas':
+        paths = generate_sales_data(args.carpeta, args.detalle, args.ventas, args.clientes,
+                                    args.productos, seed=args.semilla)
+    else:
+        paths = generate_markdown_corpus(args.carpeta, args.archivos, args.bytes, args.profundidad,
+                                         args.tablas, args.codigo, args.imagenes, seed=args.semilla)
+    for path in (paths.values() if isinstance(paths, dict) else paths):
+        print(f"✅ {path} ({os.path.getsize(path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
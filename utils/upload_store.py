@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén de archivos subidos, direccionado por contenido - Tienda Aurelion
+
+Cada archivo subido con st.file_uploader se identifica por el hash de sus
+bytes, que se calcula una sola vez. Si dos sesiones suben el mismo archivo
+comparten la misma entrada, y todo lo que se deriva de ella (texto
+decodificado, árbol, estadísticas) se puede guardar con esa misma clave.
+
+Los archivos pequeños quedan en memoria; los que superan un umbral (o los
+más antiguos, cuando la memoria ocupada supera su presupuesto) se vuelcan
+a una carpeta temporal y se leen desde ahí con el mismo detector de
+encoding que los documentos locales. La carpeta también tiene un
+presupuesto: al superarlo se borran los archivos usados hace más tiempo.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from parse_cache import hash_bytes
+from utils import decode_markdown_bytes, read_markdown_file
+
+
+UPLOAD_SPILL_THRESHOLD = 4 * 1024 * 1024           # 4 MB: a partir de aquí se guarda en disco
+DEFAULT_UPLOAD_MEMORY_BYTES = 64 * 1024 * 1024     # 64 MB en memoria entre todas las sesiones
+DEFAULT_UPLOAD_DISK_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB en la carpeta temporal
+
+
+class StoredUpload(NamedTuple):
+    """Archivo subido guardado en el almacén."""
+    content_hash: str
+    name: str
+    size: int
+    path: Optional[str]  # Archivo temporal, si se volcó a disco
+
+
+class UploadStore:
+    """
+    Archivos subidos compartidos por todas las sesiones, con clave = hash del contenido.
+
+    Es seguro usarlo desde varios hilos.
+
+    Args:
+        spill_threshold (int): Tamaño desde el cual un archivo va directo a disco
+        max_memory_bytes (int): Bytes máximos en memoria
+        max_disk_bytes (int): Bytes máximos en la carpeta temporal
+        temp_dir (Optional[str]): Carpeta temporal (por defecto se crea una al primer volcado)
+    """
+
+    def __init__(self, spill_threshold: int = UPLOAD_SPILL_THRESHOLD,
+                 max_memory_bytes: int = DEFAULT_UPLOAD_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_UPLOAD_DISK_BYTES,
+                 temp_dir: Optional[str] = None):
+        self.spill_threshold = spill_threshold
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.temp_dir = temp_dir
+        # Orden de uso (LRU): el más antiguo primero
+        self._uploads: 'OrderedDict[str, StoredUpload]' = OrderedDict()
+        self._data: Dict[str, bytes] = {}  # Solo los archivos que están en memoria
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, data: bytes, name: str) -> StoredUpload:
+        """
+        Guarda un archivo subido (o devuelve la entrada existente si ya estaba).
+
+        Args:
+            data (bytes): Contenido del archivo
+            name (str): Nombre original del archivo
+
+        Returns:
+            StoredUpload: Entrada del almacén
+        """
+        content_hash = hash_bytes(data).hex()
+        with self._lock:
+            stored = self._uploads.get(content_hash)
+            if stored is not None:
+                self._uploads.move_to_end(content_hash)
+                return stored
+
+        path = self._spill(content_hash, data) if len(data) >= self.spill_threshold else None
+        stored = StoredUpload(content_hash, name, len(data), path)
+        with self._lock:
+            if content_hash in self._uploads:
+                # Otra sesión subió el mismo archivo mientras tanto
+                return self._uploads[content_hash]
+            self._uploads[content_hash] = stored
+            if path is None:
+                self._data[content_hash] = bytes(data)
+                self._memory_bytes += stored.size
+            else:
+                self._disk_bytes += stored.size
+            self._evict()
+            # El propio archivo pudo volcarse a disco para respetar el presupuesto
+            return self._uploads.get(content_hash, stored)
+
+    def get(self, content_hash: str) -> Optional[StoredUpload]:
+        """
+        Busca una entrada por hash y la marca como usada recientemente.
+
+        Returns:
+            Optional[StoredUpload]: Entrada, o None si no está (o ya se descartó)
+        """
+        with self._lock:
+            stored = self._uploads.get(content_hash)
+            if stored is not None:
+                self._uploads.move_to_end(content_hash)
+            return stored
+
+    def read_text(self, stored: StoredUpload) -> Optional[Tuple[str, str]]:
+        """
+        Decodifica un archivo subido con el mismo detector de encoding que los locales.
+
+        Args:
+            stored (StoredUpload): Entrada devuelta por add() o get()
+
+        Returns:
+            Optional[Tuple[str, str]]: (texto, encoding), o None si ya no está disponible
+        """
+        with self._lock:
+            data = self._data.get(stored.content_hash)
+            current = self._uploads.get(stored.content_hash)
+        if data is not None:
+            return decode_markdown_bytes(data)
+        if current is None or current.path is None:
+            return None
+        content, encoding = read_markdown_file(current.path)
+        if not encoding:
+            return None
+        return content, encoding
+
+    def _ensure_temp_dir(self) -> str:
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix='aurelion_uploads_')
+            atexit.register(shutil.rmtree, self.temp_dir, True)
+        return self.temp_dir
+
+    def _spill(self, content_hash: str, data: bytes) -> Optional[str]:
+        """Escribe un archivo en la carpeta temporal (de forma atómica); None si falla."""
+        try:
+            temp_dir = self._ensure_temp_dir()
+            os.makedirs(temp_dir, exist_ok=True)
+            path = os.path.join(temp_dir, content_hash + '.md')
+            if not os.path.exists(path):
+                fd, tmp_path = tempfile.mkstemp(dir=temp_dir, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            return path
+        except (IOError, OSError, PermissionError):
+            # Sin carpeta temporal escribible el archivo se queda en memoria
+            return None
+
+    def _evict(self):
+        """Vuelca a disco o descarta las entradas más antiguas (con el lock tomado)."""
+        if self._memory_bytes > self.max_memory_bytes:
+            for content_hash in list(self._uploads):
+                if self._memory_bytes <= self.max_memory_bytes:
+                    break
+                data = self._data.get(content_hash)
+                if data is None:
+                    continue
+                path = self._spill(content_hash, data)
+                if path is None:
+                    break
+                del self._data[content_hash]
+                self._memory_bytes -= len(data)
+                self._disk_bytes += len(data)
+                self._uploads[content_hash] = self._uploads[content_hash]._replace(path=path)
+
+        newest = next(reversed(self._uploads), None)
+        while self._disk_bytes > self.max_disk_bytes:
+            oldest = next((stored for stored in self._uploads.values()
+                           if stored.path is not None and stored.content_hash != newest), None)
+            if oldest is None:
+                break
+            # Quien aún lo tenga abierto lo volverá a agregar desde su st.file_uploader
+            del self._uploads[oldest.content_hash]
+            self._disk_bytes -= oldest.size
+            try:
+                os.unlink(oldest.path)
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._uploads)
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self._uploads
+
+    def clear(self):
+        """Descarta todas las entradas y borra la carpeta temporal."""
+        with self._lock:
+            self._uploads.clear()
+            self._data.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+            if self.temp_dir is not None:
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -8,9 +8,67 @@ documentos Markdown de forma robusta, con manejo de errores y
 detección automática de estructura.
 """
 
+import codecs
+import mmap
 import os
-import re
-from typing import Dict, Tuple, List, Optional
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Dict, Tuple, List, NamedTuple, Optional
+
+from markdown_outline import (
+    Outline,
+    OutlineChanges,
+    OutlineNode,
+    SectionIndex,
+    SectionSpan,
+    make_anchor,
+    outline_from_records,
+    parse_outline,
+    parse_outline_bytes,
+    reparse_outline
+)
+from search_index import (
+    SearchHit,
+    SearchIndex,
+    fold_text
+)
+from markdown_stats import (
+    document_stats,
+    empty_stats,
+    section_stats
+)
+from markdown_pages import (
+    PAGE_SIZE_BUDGET,
+    page_label,
+    paginate_markdown,
+    split_blocks
+)
+from parse_cache import (
+    FileFingerprint,
+    ParseCache,
+    fingerprint_file,
+    get_default_cache,
+    hash_bytes
+)
+from memory_cache import (
+    MemoryCache,
+    StageStats,
+    content_key,
+    get_memory_cache
+)
+from file_discovery import (
+    CSV_PATTERNS,
+    DEFAULT_EXCLUDES,
+    MARKDOWN_PATTERNS,
+    DirectoryScanner,
+    FileEntry,
+    scan_files
+)
+from doc_watcher import (
+    DocumentWatcher,
+    FileChange,
+    get_docs_watcher
+)
 
 
 def get_project_paths():
@@ -31,176 +89,491 @@ def get_project_paths():
     return base_dir, data_dir, docs_dir, utils_dir
 
 
-def load_markdown(path: str) -> str:
+# Archivos a partir de este tamaño se leen con mmap en lugar de f.read()
+MMAP_THRESHOLD = 4 * 1024 * 1024
+# Bytes que se inspeccionan para decidir el encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# Archivos a partir de este tamaño se abren en modo streaming (solo índice de encabezados)
+STREAMING_THRESHOLD = 32 * 1024 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+# Bytes sin carácter asignado en cp1252 (en latin-1 son controles C1)
+_CP1252_UNDEFINED = {0x81, 0x8D, 0x8F, 0x90, 0x9D}
+# Encodings en los que '#', '`' y el salto de línea son siempre un único byte ASCII
+_ASCII_COMPATIBLE_ENCODINGS = {'utf-8', 'utf-8-sig', 'cp1252', 'latin-1'}
+# Tabla para bytes.translate que conserva solo el rango 0x80-0x9F
+_NON_C1_BYTES = bytes(range(0x80)) + bytes(range(0xA0, 0x100))
+
+
+@contextmanager
+def open_file_buffer(path: str):
     """
-    Carga un archivo Markdown desde disco con manejo robusto de encoding.
+    Abre un archivo y entrega su contenido binario leído una sola vez.
+    
+    Los archivos grandes se mapean en memoria (mmap) para evitar copiarlos.
     
     Args:
-        path (str): Ruta al archivo Markdown
+        path (str): Ruta al archivo
+        
+    Yields:
+        bytes | mmap.mmap: Contenido del archivo
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+        else:
+            yield f.read()
+
+
+def detect_encoding(data, sample_size: int = ENCODING_SAMPLE_SIZE) -> str:
+    """
+    Detecta el encoding de un texto a partir de su BOM y de una muestra acotada.
+    
+    Args:
+        data (bytes | mmap.mmap): Contenido binario
+        sample_size (int): Cantidad máxima de bytes a inspeccionar
         
     Returns:
-        str: Contenido del archivo, o string vacío si hay error
+        str: Nombre del encoding ('utf-8', 'utf-8-sig', 'utf-16', 'cp1252', 'latin-1'...)
     """
-    if not os.path.exists(path):
-        return ""
+    head = data[:4]
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
     
-    if not os.path.isfile(path):
-        return ""
+    sample = data[:sample_size]
+    try:
+        # final=False: la muestra puede cortar un carácter multibyte al final
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
     
-    # Intentar diferentes encodings
-    encodings = ['utf-8', 'latin-1', 'cp1252', 'ascii']
+    high_c1 = set(sample.translate(None, _NON_C1_BYTES))
+    if high_c1 and not (high_c1 & _CP1252_UNDEFINED):
+        return 'cp1252'
+    return 'latin-1'
+
+
+def decode_markdown_bytes(data) -> Tuple[str, str]:
+    """
+    Decodifica bytes ya leídos detectando el encoding una sola vez.
     
-    for encoding in encodings:
+    Args:
+        data (bytes | mmap.mmap): Contenido binario
+        
+    Returns:
+        Tuple[str, str]: (texto, encoding_usado)
+    """
+    encoding = detect_encoding(data)
+    try:
+        return str(data, encoding), encoding
+    except UnicodeDecodeError:
+        # La muestra era UTF-8 válido pero el resto del archivo no lo es
+        fallback = 'cp1252' if encoding == 'utf-8' else 'latin-1'
         try:
-            with open(path, 'r', encoding=encoding) as f:
-                content = f.read()
-            return content
+            return str(data, fallback), fallback
         except UnicodeDecodeError:
-            continue
-        except (IOError, OSError, PermissionError):
-            return ""
+            return str(data, 'latin-1'), 'latin-1'
+
+
+def read_markdown_file(path: str) -> Tuple[str, str]:
+    """
+    Lee un archivo de texto una sola vez y lo decodifica con el encoding detectado.
+    
+    Args:
+        path (str): Ruta al archivo
+        
+    Returns:
+        Tuple[str, str]: (contenido, encoding), o ("", "") si hay error
+    """
+    if not os.path.isfile(path):
+        return "", ""
     
-    return ""
+    try:
+        with open_file_buffer(path) as data:
+            return decode_markdown_bytes(data)
+    except (IOError, OSError, PermissionError, ValueError):
+        return "", ""
 
 
-def parse_markdown_sections(content: str) -> Tuple[str, Dict[str, str]]:
+def load_markdown(path: str) -> str:
     """
-    Parsea un documento Markdown y extrae título principal y secciones.
+    Carga un archivo Markdown desde disco con manejo robusto de encoding.
     
     Args:
-        content (str): Contenido completo del documento Markdown
+        path (str): Ruta al archivo Markdown
         
     Returns:
-        Tuple[str, Dict[str, str]]: (titulo_principal, {nombre_seccion: contenido})
+        str: Contenido del archivo, o string vacío si hay error
+    """
+    content, _ = read_markdown_file(path)
+    return content
+
+
+class LoadedDocument(NamedTuple):
+    """Documento cargado junto con su árbol y estadísticas."""
+    path: str
+    content: str
+    outline: Outline
+    stats: Dict[str, int]
+    fingerprint: Optional[FileFingerprint]
+    from_cache: bool
+    encoding: str = ""
+    
+    @property
+    def content_hash(self) -> str:
+        return self.fingerprint.content_hash if self.fingerprint else ""
+
+
+def load_document(path: str, cache: Optional[ParseCache] = None,
+                  use_cache: bool = True) -> Optional[LoadedDocument]:
     """
-    if not content.strip():
-        return "", {}
+    Carga un documento y obtiene su árbol y estadísticas, usando la caché en disco.
     
-    lines = content.split('\n')
+    Si el archivo ya se procesó antes y no cambió, el árbol se reconstruye
+    desde la caché sin volver a parsear el texto.
     
-    # Buscar título principal (primer #)
-    main_title = ""
-    title_pattern = re.compile(r'^#\s+(.+)$')
+    Args:
+        path (str): Ruta al archivo Markdown
+        cache (Optional[ParseCache]): Caché a usar (por defecto la del proyecto)
+        use_cache (bool): Si es False, siempre parsea y no escribe en caché
+        
+    Returns:
+        Optional[LoadedDocument]: Documento cargado, o None si no se pudo leer
+    """
+    if not os.path.isfile(path):
+        return None
     
-    for line in lines:
-        match = title_pattern.match(line.strip())
-        if match:
-            main_title = match.group(1).strip()
-            break
+    if cache is None and use_cache:
+        cache = get_default_cache()
     
-    if not main_title:
-        main_title = "Documento"
+    payload = None
+    fingerprint = None
+    try:
+        st = os.stat(path)
+        # Una sola lectura: se usa para decodificar y, si hace falta, para el hash
+        with open_file_buffer(path) as data:
+            content, encoding = decode_markdown_bytes(data)
+            if use_cache:
+                # Vía rápida: tamaño y mtime coinciden, no hace falta hashear
+                payload = cache.lookup(path, st)
+                if payload is not None:
+                    fingerprint = FileFingerprint(os.path.abspath(path), st.st_size, st.st_mtime_ns,
+                                                  bytes.fromhex(payload['content_hash']))
+                else:
+                    fingerprint = fingerprint_file(path, data, st)
+                    payload = cache.get(fingerprint)
+    except (IOError, OSError, PermissionError, ValueError):
+        return None
+    
+    if payload is not None and 'outline' in payload and 'segment_counts' in payload:
+        outline = outline_from_records(content, payload['title'], payload['outline'])
+        # Estadísticas por sección listas sin volver a contar
+        outline.segment_counts = payload['segment_counts']
+        outline.stats_cache[None] = payload['stats']
+        return LoadedDocument(path, content, outline, payload['stats'], fingerprint, True, encoding)
+    
+    outline = parse_outline(content)
+    stats = document_stats(outline)
+    if use_cache:
+        payload = payload or {}
+        payload.update(title=outline.title, outline=outline.to_records(), stats=stats,
+                       segment_counts=outline.segment_counts)
+        cache.put(fingerprint, payload)
+    return LoadedDocument(path, content, outline, stats, fingerprint, False, encoding)
+
+
+def reload_document(document: LoadedDocument, cache: Optional[ParseCache] = None,
+                    use_cache: bool = True) -> Tuple[Optional[LoadedDocument], Optional[OutlineChanges]]:
+    """
+    Actualiza un documento ya cargado si su archivo cambió en disco.
     
-    # Parsear secciones (##)
-    sections = {}
-    current_section = None
-    current_content = []
-    section_pattern = re.compile(r'^##\s+(.+)$')
+    Solo se vuelve a recorrer la zona editada del texto (ver reparse_outline).
+    Los artefactos por sección se guardan por hash de contenido (ver
+    save_section_artifact), así que los de secciones sin cambios siguen valiendo.
     
-    for line in lines:
-        section_match = section_pattern.match(line.strip())
+    Args:
+        document (LoadedDocument): Documento devuelto por load_document
+        cache (Optional[ParseCache]): Caché a usar (por defecto la del proyecto)
+        use_cache (bool): Si es False, no lee ni escribe la caché en disco
         
-        if section_match:
-            # Guardar sección anterior si existe
-            if current_section is not None:
-                sections[current_section] = '\n'.join(current_content).strip()
-            
-            # Iniciar nueva sección
-            current_section = section_match.group(1).strip()
-            current_content = []
-        else:
-            # Añadir línea al contenido de la sección actual
-            if current_section is not None:
-                current_content.append(line)
-    
-    # Guardar última sección
-    if current_section is not None:
-        sections[current_section] = '\n'.join(current_content).strip()
-    
-    # Si no hay secciones, crear una sección por defecto
-    if not sections:
-        content_lines = []
-        skip_first_title = False
+    Returns:
+        Tuple[Optional[LoadedDocument], Optional[OutlineChanges]]:
+            (documento actualizado, cambios). Los cambios son None si el archivo
+            no se modificó; el documento es None si ya no se puede leer.
+    """
+    path = document.path
+    fingerprint = document.fingerprint
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    if fingerprint is not None and (st.st_size, st.st_mtime_ns) == (fingerprint.size, fingerprint.mtime_ns):
+        return document, None
+    
+    if cache is None and use_cache:
+        cache = get_default_cache()
+    
+    try:
+        with open_file_buffer(path) as data:
+            content, encoding = decode_markdown_bytes(data)
+            new_fingerprint = fingerprint_file(path, data, st) if use_cache else None
+    except (IOError, OSError, PermissionError, ValueError):
+        return None, None
+    
+    if fingerprint is not None and new_fingerprint is not None and new_fingerprint.digest == fingerprint.digest:
+        # Solo cambió el mtime (p. ej. un 'touch'): misma entrada de caché con la huella nueva
+        cache.get(new_fingerprint)
+        return document._replace(fingerprint=new_fingerprint), OutlineChanges([], [], [], (0, 0))
+    
+    outline, changes = reparse_outline(document.outline, content)
+    # Solo se cuentan los segmentos que se volvieron a recorrer
+    stats = document_stats(outline)
+    if use_cache:
+        cache.put(new_fingerprint, {'title': outline.title, 'outline': outline.to_records(),
+                                    'stats': stats, 'segment_counts': outline.segment_counts})
+    updated = LoadedDocument(path, content, outline, stats, new_fingerprint, False, encoding)
+    return updated, changes
+
+
+class StreamedDocument(NamedTuple):
+    """Documento grande abierto en modo streaming: mmap + índice de encabezados."""
+    path: str
+    outline: Outline
+    encoding: str
+    size: int
+    from_cache: bool
+    
+    def close(self):
+        """Libera el mapeo en memoria del archivo."""
+        if isinstance(self.outline.buffer, mmap.mmap):
+            self.outline.buffer.close()
+
+
+def is_large_markdown(path: str) -> bool:
+    """Indica si un archivo debe abrirse en modo streaming por su tamaño."""
+    try:
+        return os.path.getsize(path) >= STREAMING_THRESHOLD
+    except OSError:
+        return False
+
+
+def open_markdown_stream(path: str, cache: Optional[ParseCache] = None,
+                         use_cache: bool = True) -> Optional[StreamedDocument]:
+    """
+    Abre un documento muy grande sin cargarlo entero en memoria.
+    
+    El archivo se mapea en memoria y en una primera pasada solo se construye
+    el índice de encabezados (con offsets en bytes), de modo que la barra
+    lateral se puede mostrar enseguida. El contenido de cada sección se
+    decodifica desde su rango de bytes cuando se pide. El índice también se
+    guarda en la caché en disco, así que reabrir el archivo no lo recorre de nuevo.
+    
+    Args:
+        path (str): Ruta al archivo Markdown
+        cache (Optional[ParseCache]): Caché a usar (por defecto la del proyecto)
+        use_cache (bool): Si es False, siempre recorre el archivo
         
-        for line in lines:
-            if not skip_first_title and title_pattern.match(line.strip()):
-                skip_first_title = True
-                continue
-            content_lines.append(line)
+    Returns:
+        Optional[StreamedDocument]: Documento abierto, o None si no se pudo mapear
+    """
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, PermissionError, ValueError):
+        return None
+    
+    encoding = detect_encoding(mapped)
+    if encoding not in _ASCII_COMPATIBLE_ENCODINGS:
+        # UTF-16/32 no se pueden recorrer byte a byte: se parsea el texto completo
+        mapped.close()
+        content, encoding = read_markdown_file(path)
+        return StreamedDocument(path, parse_outline(content), encoding, st.st_size, False)
+    
+    # El BOM de UTF-8 no forma parte del texto
+    start = len(codecs.BOM_UTF8) if encoding == 'utf-8-sig' else 0
+    if cache is None and use_cache:
+        cache = get_default_cache()
+    
+    payload = None
+    fingerprint = None
+    if use_cache:
+        payload = cache.lookup(path, st)
+        if payload is None or 'stream_outline' not in payload:
+            fingerprint = fingerprint_file(path, mapped, st)
+            payload = cache.get(fingerprint)
+    
+    if payload is not None and 'stream_outline' in payload:
+        outline = outline_from_records(mapped, payload['stream_title'], payload['stream_outline'], encoding)
+        return StreamedDocument(path, outline, encoding, st.st_size, True)
+    
+    outline = parse_outline_bytes(mapped, encoding, start)
+    if use_cache:
+        payload = payload or {}
+        payload.update(stream_title=outline.title, stream_outline=outline.to_records())
+        cache.put(fingerprint, payload)
+    return StreamedDocument(path, outline, encoding, st.st_size, False)
+
+
+def load_section_artifact(kind: str, key: bytes, cache: Optional[ParseCache] = None) -> Optional[Any]:
+    """
+    Busca en la caché en disco un artefacto calculado para una sección
+    (p. ej. su contenido ya limpio para renderizar).
+    
+    Args:
+        kind (str): Tipo de artefacto (p. ej. 'clean')
+        key (bytes): Hash del contenido de la sección (content_key)
+        cache (Optional[ParseCache]): Caché a usar (por defecto la del proyecto)
         
-        sections["Contenido"] = '\n'.join(content_lines).strip()
+    Returns:
+        Optional[Any]: Artefacto guardado, o None si no está
+    """
+    return (cache or get_default_cache()).get_artifact(kind, key)
+
+
+def save_section_artifact(kind: str, key: bytes, value: Any, cache: Optional[ParseCache] = None):
+    """
+    Guarda un artefacto de una sección en su propia entrada de la caché en disco.
+    
+    No reescribe la entrada del documento ni modifica el documento cargado,
+    que puede estar compartido entre sesiones.
     
-    return main_title, sections
+    Args:
+        kind (str): Tipo de artefacto
+        key (bytes): Hash del contenido de la sección (content_key)
+        value (Any): Valor a guardar (solo tipos básicos)
+        cache (Optional[ParseCache]): Caché a usar (por defecto la del proyecto)
+    """
+    (cache or get_default_cache()).put_artifact(kind, key, value)
 
 
-def discover_markdown_files(directory: str) -> List[str]:
+def index_markdown_sections(content: str) -> SectionIndex:
     """
-    Descubre automáticamente todos los archivos .md en un directorio.
+    Construye el índice de secciones (##) de un documento.
     
     Args:
-        directory (str): Directorio donde buscar archivos .md
+        content (str): Contenido completo del documento Markdown
         
     Returns:
-        List[str]: Lista de rutas a archivos .md encontrados
+        SectionIndex: Título principal y posiciones de cada sección
     """
-    markdown_files = []
-    
-    if not os.path.exists(directory) or not os.path.isdir(directory):
-        return markdown_files
+    return parse_outline(content).sections()
+
+
+def parse_markdown_sections(content, lazy: bool = False) -> Tuple[str, Mapping]:
+    """
+    Parsea un documento Markdown y extrae título principal y secciones.
     
-    md_extensions = {'.md', '.markdown', '.MD', '.Markdown'}
+    Args:
+        content (str | Outline): Contenido del documento o su árbol ya parseado
+        lazy (bool): Si es True devuelve un SectionIndex cuyas secciones se
+            materializan solo al acceder a ellas
+        
+    Returns:
+        Tuple[str, Dict[str, str]]: (titulo_principal, {nombre_seccion: contenido})
+    """
+    outline = content if isinstance(content, Outline) else parse_outline(content)
+    index = outline.sections()
+    if lazy:
+        return index.title, index
+    return index.title, index.to_dict()
+
+
+def update_search_index(index: SearchIndex, document, changes: OutlineChanges) -> SearchIndex:
+    """
+    Actualiza el índice de búsqueda tras recargar un documento editado.
     
-    try:
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            
-            if os.path.isfile(file_path):
-                _, ext = os.path.splitext(filename)
-                if ext in md_extensions:
-                    markdown_files.append(file_path)
+    Args:
+        index (SearchIndex): Índice de la versión anterior
+        document (Outline | Mapping[str, str]): Árbol o secciones de la versión nueva
+        changes (OutlineChanges): Cambios devueltos por reload_document
         
-        markdown_files.sort()
+    Returns:
+        SearchIndex: El mismo índice, con solo las secciones afectadas reindexadas
+    """
+    sections = document.sections() if isinstance(document, Outline) else document
+    index.update(sections, changes.affected)
+    return index
+
+
+def build_search_index(document) -> SearchIndex:
+    """
+    Construye el índice de búsqueda de un documento ya parseado.
+    
+    Args:
+        document (Outline | Mapping[str, str]): Árbol del documento o sus secciones
         
-    except (PermissionError, OSError):
-        pass
+    Returns:
+        SearchIndex: Índice con ranking BM25, frases, prefijos y fragmentos
+    """
+    sections = document.sections() if isinstance(document, Outline) else document
+    return SearchIndex(sections)
+
+
+def discover_markdown_files(directory: str, recursive: bool = True,
+                            exclude: Optional[List[str]] = None) -> List[str]:
+    """
+    Descubre automáticamente todos los archivos .md en un directorio.
     
-    return markdown_files
+    Args:
+        directory (str): Directorio donde buscar archivos .md
+        recursive (bool): Si también se buscan en las subcarpetas
+        exclude (Optional[List[str]]): Globs adicionales de archivos o carpetas a omitir
+        
+    Returns:
+        List[str]: Lista de rutas a archivos .md encontrados
+    """
+    return [entry.path for entry in _scan(directory, MARKDOWN_PATTERNS, exclude, recursive)]
 
 
-def discover_csv_files(directory: str) -> List[str]:
+def discover_csv_files(directory: str, recursive: bool = True,
+                       exclude: Optional[List[str]] = None) -> List[str]:
     """
     Descubre automáticamente todos los archivos .csv en un directorio.
     
     Args:
         directory (str): Directorio donde buscar archivos .csv
+        recursive (bool): Si también se buscan en las subcarpetas
+        exclude (Optional[List[str]]): Globs adicionales de archivos o carpetas a omitir
         
     Returns:
         List[str]: Lista de rutas a archivos .csv encontrados
     """
-    csv_files = []
-    
-    if not os.path.exists(directory) or not os.path.isdir(directory):
-        return csv_files
-    
-    try:
-        for filename in os.listdir(directory):
-            if filename.lower().endswith('.csv'):
-                file_path = os.path.join(directory, filename)
-                if os.path.isfile(file_path):
-                    csv_files.append(file_path)
-        
-        csv_files.sort()
-        
-    except (PermissionError, OSError):
-        pass
-    
-    return csv_files
+    return [entry.path for entry in _scan(directory, CSV_PATTERNS, exclude, recursive)]
+
+
+def _scan(directory: str, include, exclude, recursive: bool) -> List[FileEntry]:
+    # Las exclusiones del usuario se suman a las de siempre (carpetas ocultas, cachés)
+    return scan_files(directory, include, DEFAULT_EXCLUDES + tuple(exclude or ()), recursive)
+
+
+def format_file_size(size_bytes: int) -> str:
+    """Convierte un tamaño en bytes a un texto legible (bytes, KB o MB)."""
+    if size_bytes < 1024:
+        return f"{size_bytes} bytes"
+    elif size_bytes < 1024 * 1024:
+        return f"{size_bytes / 1024:.1f} KB"
+    return f"{size_bytes / (1024 * 1024):.1f} MB"
 
 
 def get_file_info(path: str) -> Dict[str, str]:
     """
     Obtiene información básica de un archivo.
     
+    El tamaño sale de os.stat (una sola llamada, para el archivo elegido):
+    la foto del descubrimiento no guarda tamaños porque no se entera de las
+    ediciones en el lugar.
+    
     Args:
         path (str): Ruta al archivo
         
@@ -213,24 +586,14 @@ def get_file_info(path: str) -> Dict[str, str]:
         'exists': 'No'
     }
     
-    if not os.path.exists(path):
-        return info
-    
     try:
-        info['name'] = os.path.basename(path)
-        info['exists'] = 'Sí'
-        
-        size_bytes = os.path.getsize(path)
-        if size_bytes < 1024:
-            info['size'] = f"{size_bytes} bytes"
-        elif size_bytes < 1024 * 1024:
-            info['size'] = f"{size_bytes / 1024:.1f} KB"
-        else:
-            info['size'] = f"{size_bytes / (1024 * 1024):.1f} MB"
-            
+        st = os.stat(path)
     except (OSError, PermissionError):
-        pass
+        return info
     
+    info['name'] = os.path.basename(path)
+    info['exists'] = 'Sí'
+    info['size'] = format_file_size(st.st_size)
     return info
 
 
@@ -278,27 +641,22 @@ def clean_markdown_content(content: str, max_length: Optional[int] = None) -> st
     return cleaned_content
 
 
-def get_markdown_stats(content: str) -> Dict[str, int]:
+def get_markdown_stats(content) -> Dict[str, Any]:
     """
-    Calcula estadísticas básicas de un documento Markdown.
+    Calcula estadísticas de un documento Markdown.
+    
+    Los conteos se hacen por segmento sobre el mismo árbol que usan las
+    secciones; si se pasa un Outline ya parseado no se vuelve a recorrer el texto.
     
     Args:
-        content (str): Contenido del documento
+        content (str | Outline): Contenido del documento o su árbol ya parseado
         
     Returns:
-        Dict[str, int]: Estadísticas del documento
+        Dict[str, Any]: words, lines, characters, sections, headings (por nivel),
+            code_blocks, tables, images y reading_time (minutos)
     """
-    if not content:
-        return {'words': 0, 'lines': 0, 'characters': 0, 'sections': 0}
-    
-    lines = content.split('\n')
-    words = len(content.split())
-    characters = len(content)
-    sections = len(re.findall(r'^##\s+', content, re.MULTILINE))
-    
-    return {
-        'words': words,
-        'lines': len(lines),
-        'characters': characters,
-        'sections': sections
-    }
\ No newline at end of file
+    # Un Outline sin encabezados tiene len() == 0, pero su texto puede no estar vacío
+    if not isinstance(content, Outline) and not content:
+        return empty_stats()
+    outline = content if isinstance(content, Outline) else parse_outline(content)
+    return document_stats(outline)